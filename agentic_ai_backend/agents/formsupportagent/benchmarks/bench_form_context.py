@@ -0,0 +1,83 @@
+"""
+Benchmark for the form context put in the form support agent's instructions.
+
+For every step definition in formdefinitions/, compares the size of:
+- lines: get_form_context, one lower-cased line per "properties" entry (empty
+  for steps that use "formfields" or "sections")
+- json.dumps: the whole definition as the server injected it on every request
+- json: compile_form_context's minified JSON
+- table: compile_form_context's field table
+
+Tokens are counted with tiktoken (o200k_base, the GPT-4o encoding) when it is
+available, otherwise estimated as characters / 4. Also reported: the time to
+build a step's context on every request against a lookup in the compiled cache.
+
+Usage (from agents/formsupportagent):
+    python -m benchmarks.bench_form_context --repeat 1000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from utils.formutils import compile_form_context, get_compiled_form_context, get_form_context
+
+DEFINITIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "formdefinitions")
+
+
+def token_counter():
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # Not installed, or the encoding file cannot be downloaded
+        return "chars/4", lambda text: (len(text) + 3) // 4
+    return "o200k_base", lambda text: len(encoding.encode(text))
+
+
+def main(args):
+    encoding, count = token_counter()
+    builders = {
+        "lines": get_form_context,
+        "json.dumps": lambda path: json.dumps(json.load(open(path, encoding="utf-8"))),
+        "json": lambda path: compile_form_context(path, "json"),
+        "table": lambda path: compile_form_context(path, "table"),
+    }
+    names = sorted(name for name in os.listdir(DEFINITIONS_DIR) if name.endswith(".json"))
+    paths = [os.path.join(DEFINITIONS_DIR, name) for name in names]
+    print(f"definitions={len(names)} tokens={encoding}")
+    print(f"{'step':<58}" + "".join(f"{name:>12}" for name in builders))
+    totals = dict.fromkeys(builders, 0)
+    for name, path in zip(names, paths):
+        row = {builder: count(build(path)) for builder, build in builders.items()}
+        for builder, tokens in row.items():
+            totals[builder] += tokens
+        if args.per_step:
+            print(f"{name[:-5]:<58}" + "".join(f"{row[builder]:>12}" for builder in builders))
+    print(f"{'total':<58}" + "".join(f"{totals[builder]:>12}" for builder in builders))
+    baseline = totals["json.dumps"]
+    print(f"{'vs json.dumps':<58}" + "".join(f"{totals[b] / baseline:>12.2f}" for b in builders))
+
+    print(f"\nper request, all {len(names)} steps, mean of {args.repeat} rounds")
+    for name, build in (
+        ("json.dumps", builders["json.dumps"]),
+        ("table build", builders["table"]),
+        ("table cached", lambda path: get_compiled_form_context(path, "table")),
+    ):
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            for path in paths:
+                build(path)
+        elapsed = (time.perf_counter() - started) / args.repeat / len(paths)
+        print(f"{name:<14}{elapsed * 1e6:>10.1f} us/step")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--per-step", action="store_true", help="print every step, not only the totals")
+    main(parser.parse_args())
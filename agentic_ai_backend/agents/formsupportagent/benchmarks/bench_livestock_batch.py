@@ -0,0 +1,71 @@
+"""
+Benchmark for the livestock water calculator at `--entries` entries.
+
+Runs:
+- multiple: calculate_multiple_water_consumption, which validates, looks up the
+  rate and builds a full result dict (description and assumptions included) for
+  every entry in a Python loop
+- batch: calculate_water_consumption_batch on columnar inputs
+
+Reported per run: wall time (best of `--repeat`), the size of the result as
+JSON (what a tool call returns), and the combined total, which must agree.
+
+Usage (from agents/formsupportagent):
+    python -m benchmarks.bench_livestock_batch --entries 100000
+"""
+import argparse
+import json
+import random
+import time
+
+from local_mcp.livestock.calculator import (
+    PERIOD_MULTIPLIERS,
+    calculate_multiple_water_consumption,
+    calculate_water_consumption_batch,
+    get_supported_livestock,
+)
+
+
+def best_of(repeat, run):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(args):
+    rng = random.Random(0)
+    livestock_types = get_supported_livestock()
+    entries = [
+        {
+            "livestock_type": rng.choice(livestock_types),
+            "livestock_count": rng.randint(1, 5000),
+            "period_type": rng.choice(list(PERIOD_MULTIPLIERS)),
+            "period_count": rng.randint(1, 24),
+        }
+        for _ in range(args.entries)
+    ]
+    columns = [[entry[key] for entry in entries] for key in ("livestock_type", "livestock_count", "period_type", "period_count")]
+
+    print(f"entries={args.entries} repeat={args.repeat}")
+    print(f"{'run':<20}{'wall_s':>9}{'us/entry':>10}{'json_mb':>9}{'combined_m3':>18}")
+    for name, run in (
+        ("multiple", lambda: calculate_multiple_water_consumption(entries)),
+        ("batch", lambda: calculate_water_consumption_batch(*columns)),
+    ):
+        seconds, result = best_of(args.repeat, run)
+        size = len(json.dumps(result)) / 1e6
+        print(
+            f"{name:<20}{seconds:>9.3f}{seconds / args.entries * 1e6:>10.2f}{size:>9.1f}"
+            f"{result['combined_total_water_consumption_m3']:>18.6f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    main(parser.parse_args())
@@ -0,0 +1,177 @@
+"""
+Benchmark for the livestock tools, in-process versus the livestock MCP server.
+
+Starts local_mcp/livestock/server.py as a streamable HTTP server on `--port` and
+makes `--calls` single-entry calculations through each of:
+- in-process: the agent's in-process tools (LIVESTOCK_TOOLS_MODE=inprocess)
+- mcp, connect per call: a new MCP session (and HTTP connection) for every call,
+  as an agent that opens its own MCP tool for each run would
+- mcp, shared session: the process-wide tool from mcp_client.py
+  (LIVESTOCK_TOOLS_MODE=mcp), connected once, calls made one after another
+- mcp, shared concurrent: the same tool with `--concurrency` calls in flight over
+  its pooled keep-alive connections
+
+Then calculates one large farm of `--entries` entries with the multiple-entry
+tool (one object per entry) and with the batch tool (one list per field), both
+in-process and over MCP.
+
+Reported: latency per call (mean, p50, p95), calls per second, and for the large
+farm the wall time and the size of the result the model gets back.
+
+Usage (from agents/formsupportagent):
+    python -m benchmarks.bench_livestock_mcp --calls 500 --concurrency 16 --entries 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+from agent_framework import MCPStreamableHTTPTool
+
+from local_mcp.livestock import mcp_client
+from local_mcp.livestock.calculator import PERIOD_MULTIPLIERS, get_supported_livestock
+from local_mcp.livestock.inprocess_client import LIVESTOCK_WATER_CONSUMPTION_TOOLS
+
+IN_PROCESS_TOOLS = {tool.name: tool for tool in LIVESTOCK_WATER_CONSUMPTION_TOOLS}
+
+
+def start_server(port):
+    env = dict(os.environ, LIVESTOCK_MCP_TRANSPORT="streamable-http", LIVESTOCK_MCP_PORT=str(port))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "local_mcp.livestock.server"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/mcp", timeout=1)
+            return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"The livestock MCP server did not start on port {port}")
+
+
+def result_size(result):
+    return len(result) if isinstance(result, str) else sum(len(content.text or "") for content in result)
+
+
+async def in_process_call(name, arguments):
+    return await IN_PROCESS_TOOLS[name].invoke(arguments=arguments)
+
+
+async def timed(call, name, arguments, latencies):
+    started = time.perf_counter()
+    result = await call(name, arguments)
+    latencies.append(time.perf_counter() - started)
+    return result
+
+
+async def run_calls(call, requests, concurrency):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(name, arguments):
+        async with semaphore:
+            await timed(call, name, arguments, latencies)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(name, arguments) for name, arguments in requests))
+    return time.perf_counter() - started, latencies
+
+
+def report(label, wall, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(
+        f"{label:<26}{statistics.mean(latencies) * 1e3:>9.2f}{statistics.median(latencies) * 1e3:>9.2f}"
+        f"{p95 * 1e3:>9.2f}{len(latencies) / wall:>10.0f}"
+    )
+
+
+async def main(args):
+    rng = random.Random(0)
+    livestock_types = get_supported_livestock()
+    periods = list(PERIOD_MULTIPLIERS)
+
+    def entry():
+        return {
+            "livestock_type": rng.choice(livestock_types),
+            "livestock_count": rng.randint(1, 5000),
+            "period_type": rng.choice(periods),
+            "period_count": rng.randint(1, 24),
+        }
+
+    requests = []
+    for _ in range(args.calls):
+        item = entry()
+        period = item["period_type"]
+        requests.append((
+            f"calculate_livestock_water_consumption_{period}",
+            {"livestock_type": item["livestock_type"], "livestock_count": item["livestock_count"], period: item["period_count"]},
+        ))
+
+    url = f"http://127.0.0.1:{args.port}/mcp"
+    server = start_server(args.port)
+    try:
+        shared = mcp_client.get_livestock_mcp_tool(url)
+        await shared.connect()
+
+        async def shared_call(name, arguments):
+            return await shared.call_tool(name, **arguments)
+
+        async def connect_per_call(name, arguments):
+            async with MCPStreamableHTTPTool(name="livestock-water-consumption", url=url, load_prompts=False) as tool:
+                return await tool.call_tool(name, **arguments)
+
+        print(f"calls={args.calls} concurrency={args.concurrency}")
+        print(f"{'run':<26}{'mean_ms':>9}{'p50_ms':>9}{'p95_ms':>9}{'calls/s':>10}")
+        report("in-process", *await run_calls(in_process_call, requests, 1))
+        report("mcp, connect per call", *await run_calls(connect_per_call, requests[: max(1, args.calls // 10)], 1))
+        report("mcp, shared session", *await run_calls(shared_call, requests, 1))
+        report("mcp, shared concurrent", *await run_calls(shared_call, requests, args.concurrency))
+
+        farm = [entry() for _ in range(args.entries)]
+        multiple = ("calculate_multiple_livestock_water_consumption", {"livestock_entries_json": json.dumps(farm)})
+        batch = (
+            "calculate_livestock_water_consumption_batch",
+            {
+                "livestock_types": [item["livestock_type"] for item in farm],
+                "livestock_counts": [item["livestock_count"] for item in farm],
+                "period_types": [item["period_type"] for item in farm],
+                "period_counts": [item["period_count"] for item in farm],
+            },
+        )
+        print(f"\nlarge farm, entries={args.entries}")
+        print(f"{'run':<26}{'wall_ms':>9}{'result_kb':>11}")
+        for label, call, (name, arguments) in (
+            ("in-process multiple", in_process_call, multiple),
+            ("in-process batch", in_process_call, batch),
+            # The MCP server takes the entries as a list rather than a JSON string
+            ("mcp multiple", shared_call, (multiple[0], {"livestock_entries": farm})),
+            ("mcp batch", shared_call, batch),
+        ):
+            started = time.perf_counter()
+            result = await call(name, arguments)
+            print(f"{label:<26}{(time.perf_counter() - started) * 1e3:>9.1f}{result_size(result) / 1e3:>11.1f}")
+    finally:
+        await mcp_client.close_livestock_tools()
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=500, help="single-entry calculations per run")
+    parser.add_argument("--concurrency", type=int, default=16, help="calls in flight on the shared session")
+    parser.add_argument("--entries", type=int, default=2000, help="entries of the large farm")
+    parser.add_argument("--port", type=int, default=8101)
+    asyncio.run(main(parser.parse_args()))
@@ -6,6 +6,7 @@ import asyncio
 import json
 import os
 import sys
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from agent_framework import AgentSession
 from dotenv import load_dotenv
@@ -15,11 +16,19 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.
 
 from agents.formsupportagent.formsupportagent import (
     FormSupportAgent, 
+    PROMPT_CACHE_STATS,
     extract_step_from_query, 
-    resolve_agent_assets
+    resolve_agent_assets,
+    resolve_form_context
 )
 from agents.formsupportagent.models.formsupportmodel import InvokeRequest, InvokeResponse
-from utils.formutils import get_form_context
+# Same module path as formsupportagent.py, so both share the one livestock MCP tool
+from local_mcp.livestock.mcp_client import (
+    close_livestock_tools,
+    connect_livestock_tools,
+    livestock_tools_status,
+)
+from utils.formutils import precompile_form_contexts
 from typing import Union
 from services.formdefinitionservice import FormDefinitionService
 from services.prompttemplateservice import PromptTemplateService
@@ -27,11 +36,22 @@ from utils.blobservice import BlobService
 
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # In "mcp" mode, open the livestock MCP session once for every request to share
+    try:
+        await connect_livestock_tools()
+    except Exception as e:
+        print(f"Failed to connect to the livestock MCP server: {e}")
+    yield
+    await close_livestock_tools()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Form Support Agent A2A Server",
     description="Agent-to-Agent API Server for BC Government's Permit Application Form Support Agent",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Initialize Blob Services
@@ -49,6 +69,13 @@ if blob_connection_string and blob_container:
     except Exception as e:
         print(f"Failed to initialize Blob Services: {e}")
 
+# Build the form context of every local step definition once, at startup
+try:
+    compiled_definitions = precompile_form_contexts(os.path.join(os.path.dirname(__file__), "formdefinitions"))
+    print(f"Compiled form context for {len(compiled_definitions)} form definitions")
+except Exception as e:
+    print(f"Failed to compile form definitions: {e}")
+
 # Cache of agent instances per step number (step_number -> agent_instance)
 # _agent_cache = {}
 # Per-session history storage keyed on (session_id, step_identifier)
@@ -92,8 +119,8 @@ def get_agent(step_identifier: Union[int, str]):
             raise FileNotFoundError(f"Form definition not found for identifier: {step_key}")
 
         
-        #form_context_str = get_form_context(form_definition)
-        form_context_str = json.dumps(form_definition)
+        # Compiled once per definition, not formatted on every request
+        form_context_str = resolve_form_context(form_definition, step_key, form_def_service)
         
         if not custom_instructions:
             raise FileNotFoundError(f"No prompt template found for step: {step_key}. A specialized prompt is required.")
@@ -174,7 +201,9 @@ async def health_check():
     return {
         "status": "healthy",
         "agent": "FormSupportAgent",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "prompt_cache": PROMPT_CACHE_STATS.summary(),
+        "livestock_tools": livestock_tools_status()
     }
 
 @app.get("/")
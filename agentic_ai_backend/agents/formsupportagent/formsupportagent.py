@@ -4,7 +4,9 @@ from agent_framework.openai import OpenAIChatCompletionClient
 from dotenv import load_dotenv
 import os
 import sys
-from utils.formutils import get_form_context
+import time
+from utils.formutils import get_compiled_form_context
+from utils.promptcache import PromptCacheStats, agent_cache_usage
 
 load_dotenv()
 
@@ -46,9 +48,7 @@ def extract_step_from_query(query):
 from services.formdefinitionservice import FormDefinitionService
 from services.prompttemplateservice import PromptTemplateService
 from utils.blobservice import BlobService
-from local_mcp.livestock.inprocess_client import (
-    LIVESTOCK_WATER_CONSUMPTION_TOOLS,
-)
+from local_mcp.livestock.mcp_client import get_livestock_tools
 
 def resolve_agent_assets(step_identifier, form_definition_service=None, prompt_template_service=None):
     """
@@ -78,6 +78,63 @@ def resolve_agent_assets(step_identifier, form_definition_service=None, prompt_t
     return resolved_json, resolved_prompt, step_key
 
 
+def resolve_form_context(form_definition, step_key, form_definition_service=None):
+    """
+    Returns the compiled form context of a definition from resolve_agent_assets.
+
+    A definition fetched by the form definition service (a dict) is looked up by
+    its name there; a local definition file by its path (see formutils).
+    """
+    if form_definition_service is not None and isinstance(form_definition, dict):
+        form_context = form_definition_service.fetch_form_context(f"{step_key}.json")
+        if form_context is not None:
+            return form_context
+    return get_compiled_form_context(form_definition)
+
+
+
+# Rules appended to every step's instructions. They are constants so the
+# instructions of a step are byte-identical on every request.
+JSON_ENFORCEMENT_RULE = (
+    "\n\nCRITICAL INSTRUCTION: Your response MUST be valid JSON only. "
+    "NEVER wrap your response in markdown code blocks like ```json ... ```. "
+    "Output raw JSON that can be parsed directly by JSON.parse()."
+)
+LIVESTOCK_TOOL_RULE = (
+    "\n\n CRITICAL INSTRUCTION: If the user provides livestock type, livestock count, and a time period "
+    "(days, weeks, months, or years), use the livestock water consumption tools "
+    "to calculate water demand in cubic meters (m3) and application fees. "
+    "For many livestock entries, use the batch tool once for all of them."
+)
+
+# Prompt cache totals for the agent runs of this process
+PROMPT_CACHE_STATS = PromptCacheStats("FormSupportAgent")
+
+
+def build_instructions(instructions, form_context_str):
+    """
+    Builds the agent instructions for a step from its prompt template and form context.
+
+    The instructions hold only content that is the same for every request of the
+    step (the template, the step's compiled form context and the constant rules),
+    so with the tool definitions before them they form a stable prefix that Azure
+    OpenAI can serve from its prompt cache. The conversation history and the user
+    query, which change per request, follow as messages.
+    """
+    try:
+        # Inject the form context into the template if the placeholder exists
+        if "{form_context_str}" in instructions:
+            final_instructions = instructions.replace("{form_context_str}", form_context_str)
+        else:
+            # If it's a completely custom prompt without the placeholder,
+            # we should probably still append the context so the AI knows the fields
+            final_instructions = f"{instructions}\n\nHere is the form context:\n{form_context_str}"
+    except Exception as e:
+        final_instructions = f"{instructions}\n\nHere is the form context:\n{form_context_str}"
+        print(f"Error processing instructions template: {e}")
+
+    return final_instructions + JSON_ENFORCEMENT_RULE + LIVESTOCK_TOOL_RULE
+
 
 class FormSupportAgent():
     def __init__(self, endpoint, api_key, deployment_name, api_version, form_context_str, instructions):
@@ -88,35 +145,7 @@ class FormSupportAgent():
             with open(instructions, "r", encoding="utf-8") as handle:
                 instructions = handle.read()
 
-        final_instructions = instructions
-        
-        try:
-            # Inject the form context into the template if the placeholder exists
-            if "{form_context_str}" in final_instructions :                     
-                final_instructions = final_instructions.replace("{form_context_str}", form_context_str)               
-            else:
-                # If it's a completely custom prompt without the placeholder, 
-                # we should probably still append the context so the AI knows the fields
-                final_instructions = f"{final_instructions}\n\nHere is the form context:\n{form_context_str}"
-                
-        except Exception as e:
-            final_instructions = f"{final_instructions}\n\nHere is the form context:\n{form_context_str}"
-            print(f"Error processing instructions template: {e}")
-        
-
-        # Append strict JSON formatting rule
-        json_enforcement_rule = (
-                "\n\nCRITICAL INSTRUCTION: Your response MUST be valid JSON only. "
-                "NEVER wrap your response in markdown code blocks like ```json ... ```. "
-                "Output raw JSON that can be parsed directly by JSON.parse()."
-            )
-        
-        final_instructions += json_enforcement_rule
-        final_instructions += (
-                "\n\n CRITICAL INSTRUCTION: If the user provides livestock type, livestock count, and a time period "
-                "(days, weeks, months, or years), use the livestock water consumption tools "
-                "to calculate water demand in cubic meters (m3) and application fees."
-            )
+        final_instructions = build_instructions(instructions, form_context_str)
 
         client = AzureOpenAIChatClient(
             model=deployment_name,
@@ -126,7 +155,7 @@ class FormSupportAgent():
         )
         agent_kwargs = {
             "instructions": final_instructions,
-            "tools": LIVESTOCK_WATER_CONSUMPTION_TOOLS,
+            "tools": get_livestock_tools(),
             "name": "FormSupportAgent",
         }
         self.agent = client.as_agent(
@@ -136,7 +165,10 @@ class FormSupportAgent():
 
     async def run(self, userquery, session=None, thread=None):
         active_session = session or thread
+        started = time.perf_counter()
         result = await self.agent.run(userquery, session=active_session)
+        prompt_tokens, cached_tokens = agent_cache_usage(result.usage_details)
+        PROMPT_CACHE_STATS.record(prompt_tokens, cached_tokens, time.perf_counter() - started)
         return result.text
 
 
@@ -183,7 +215,7 @@ async def dryrun(query):
         return        
 
     print(f"Using form schema: {step_key}.json")
-    form_context_str = get_form_context(step_form_definition)  
+    form_context_str = resolve_form_context(step_form_definition, step_key, form_def_service)
 
     if not custom_instructions:
         print(f"WARNING: No prompt template (.md) found for step: {step_identifier}. Step is required to have a specialized prompt.")
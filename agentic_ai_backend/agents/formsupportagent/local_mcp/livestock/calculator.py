@@ -2,9 +2,12 @@ from __future__ import annotations
 
 import json
 from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
 
 CALC_DATA_PATH = Path(__file__).with_name("calc.json")
 PERIOD_MULTIPLIERS = {
@@ -54,6 +57,137 @@ def _validate_period_type(period_type: str) -> None:
         )
 
 
+@lru_cache(maxsize=1)
+def load_rate_table() -> tuple[dict[str, int], np.ndarray, np.ndarray]:
+    """Livestock rates as arrays: (index by livestock name, daily rates, fees)."""
+    livestock_rates = load_livestock_rates()
+    names = list(livestock_rates)
+    daily_rates = np.array(
+        [livestock_rates[name]["water_consumption_m3_per_day"] for name in names],
+        dtype=np.float64,
+    )
+    application_fees = np.array(
+        [_get_application_fee(livestock_rates[name]) for name in names],
+        dtype=np.int64,
+    )
+    return {name: index for index, name in enumerate(names)}, daily_rates, application_fees
+
+
+def _codes(values: Any, lookup: dict[str, int], validate) -> np.ndarray:
+    """Map a column of names to table indexes, validating each distinct unknown name once."""
+    codes = np.fromiter(map(lookup.get, values, repeat(-1)), dtype=np.intp, count=len(values))
+    unknown = np.flatnonzero(codes < 0)
+    if unknown.size:
+        # Names that need normalizing (case, whitespace), or are invalid
+        resolved = {}
+        for index in unknown.tolist():
+            value = values[index]
+            if value not in resolved:
+                resolved[value] = lookup[validate(value)]
+            codes[index] = resolved[value]
+    return codes
+
+
+def _period_code(period_type: str) -> str:
+    _validate_period_type(period_type)
+    return period_type
+
+
+def _as_number_column(values: Any, name: str) -> np.ndarray:
+    column = np.asarray(values)
+    if column.ndim != 1 or not (
+        np.issubdtype(column.dtype, np.integer) or np.issubdtype(column.dtype, np.floating)
+    ):
+        raise ValueError(f"{name} must be a list of numbers.")
+    return column
+
+
+def calculate_water_consumption_batch(
+    livestock_types: Any,
+    livestock_counts: Any,
+    period_types: Any,
+    period_counts: Any,
+) -> dict[str, Any]:
+    """Calculate water consumption for many entries given as columns.
+
+    Entry i is (livestock_types[i], livestock_counts[i], period_types[i],
+    period_counts[i]). Each distinct livestock and period type is validated
+    once and the totals are computed with NumPy in one pass. The result is
+    columnar: one list per field, one item per entry, with the description,
+    daily rate and fee of each livestock type present given once under
+    "livestock".
+
+    Totals and the combined total are those calculate_multiple_water_consumption
+    returns for the same entries. Unlike it, counts must be int or float columns
+    (not bools, nor ints beyond 64 bits), and every type is validated before any
+    count.
+    """
+    counts = _as_number_column(livestock_counts, "livestock_counts")
+    period_counts_column = _as_number_column(period_counts, "period_counts")
+    entry_count = len(counts)
+    if entry_count == 0:
+        raise ValueError("livestock_entries must contain at least one item.")
+    if not len(livestock_types) == len(period_types) == len(period_counts_column) == entry_count:
+        raise ValueError(
+            "livestock_types, livestock_counts, period_types, and period_counts "
+            "must have the same length."
+        )
+
+    name_index, daily_rates, application_fees = load_rate_table()
+    livestock_codes = _codes(livestock_types, name_index, _validate_livestock_type)
+    period_names = list(PERIOD_MULTIPLIERS)
+    period_codes = _codes(
+        period_types, {name: index for index, name in enumerate(period_names)}, _period_code
+    )
+
+    if (counts <= 0).any():
+        raise ValueError("livestock_count must be greater than 0.")
+    invalid_periods = np.flatnonzero(period_counts_column <= 0)
+    if invalid_periods.size:
+        period_type = period_names[period_codes[invalid_periods[0]]]
+        raise ValueError(f"{period_type[:-1]}_count must be greater than 0.")
+
+    # Same operations, in the same order, as the per-entry calculation. Totals are
+    # rounded with Python's round, which rounds the exact binary value; np.round
+    # scales by 10**6 first and differs from it in the last digit now and then
+    total_period_days = np.array(list(PERIOD_MULTIPLIERS.values()))[period_codes] * period_counts_column
+    total_water_consumption = [
+        round(total, 6) for total in (daily_rates[livestock_codes] * counts * total_period_days).tolist()
+    ]
+    # Summed one entry after another like calculate_multiple_water_consumption (sum()
+    # compensates for rounding error since Python 3.12, so it can differ)
+    combined_total = 0.0
+    for total in total_water_consumption:
+        combined_total += total
+
+    livestock_rates = load_livestock_rates()
+    names = list(name_index)
+    present = np.unique(livestock_codes).tolist()
+    return {
+        "entry_count": entry_count,
+        "livestock_type": np.array(names, dtype=object)[livestock_codes].tolist(),
+        "livestock_count": counts.tolist(),
+        "period_type": np.array(period_names, dtype=object)[period_codes].tolist(),
+        "period_count": period_counts_column.tolist(),
+        "total_period_days": total_period_days.tolist(),
+        "total_water_consumption_m3": total_water_consumption,
+        "combined_total_water_consumption_m3": round(combined_total, 6),
+        "application_fee": int(application_fees[livestock_codes[0]]),
+        "livestock": {
+            names[code]: {
+                "description": livestock_rates[names[code]]["description"],
+                "daily_water_consumption_m3_per_animal": float(daily_rates[code]),
+                "application_fee": int(application_fees[code]),
+            }
+            for code in present
+        },
+        "assumptions": {
+            "month_days": PERIOD_MULTIPLIERS["months"],
+            "year_days": PERIOD_MULTIPLIERS["years"],
+        },
+    }
+
+
 def calculate_water_consumption(
     livestock_type: str,
     livestock_count: int | float,
@@ -7,6 +7,7 @@ from agent_framework import tool
 from .calculator import (
     calculate_multiple_water_consumption,
     calculate_water_consumption,
+    calculate_water_consumption_batch,
     get_supported_livestock,
 )
 
@@ -103,11 +104,36 @@ def calculate_multiple_livestock_water_consumption(livestock_entries_json: str)
     return json.dumps(calculate_multiple_water_consumption(livestock_entries))
 
 
+@tool(
+    name="calculate_livestock_water_consumption_batch",
+    description=(
+        "Calculate livestock water consumption in cubic meters (m3) for many "
+        "livestock entries in one call, for large farms. Entry i is "
+        "livestock_types[i], livestock_counts[i], period_types[i] (days, weeks, "
+        "months, or years), and period_counts[i]. Returns one list per field with "
+        "one item per entry, and the combined total."
+    ),
+)
+def calculate_livestock_water_consumption_batch(
+    livestock_types: list[str],
+    livestock_counts: list[int | float],
+    period_types: list[str],
+    period_counts: list[int | float],
+) -> str:
+    return json.dumps(
+        calculate_water_consumption_batch(
+            livestock_types, livestock_counts, period_types, period_counts
+        ),
+        separators=(",", ":"),
+    )
+
+
 LIVESTOCK_WATER_CONSUMPTION_TOOLS = [
     calculate_livestock_water_consumption_days,
     calculate_livestock_water_consumption_weeks,
     calculate_livestock_water_consumption_months,
     calculate_livestock_water_consumption_years,
     calculate_multiple_livestock_water_consumption,
+    calculate_livestock_water_consumption_batch,
     list_supported_livestock_types,
 ]
@@ -0,0 +1,94 @@
+import asyncio
+import os
+
+import httpx
+from agent_framework import MCPStreamableHTTPTool
+
+from .inprocess_client import LIVESTOCK_WATER_CONSUMPTION_TOOLS
+
+# Where the agent's livestock tools run:
+# - "inprocess" (default): in the agent process, see inprocess_client.py
+# - "mcp": on a long-lived livestock MCP server at LIVESTOCK_MCP_URL (server.py run
+#   with LIVESTOCK_MCP_TRANSPORT=streamable-http), through one connected MCP session
+#   per agent process whose HTTP connections are pooled and kept alive
+LIVESTOCK_TOOLS_MODES = ("inprocess", "mcp")
+LIVESTOCK_TOOLS_MODE = os.getenv("LIVESTOCK_TOOLS_MODE", "inprocess")
+LIVESTOCK_MCP_URL = os.getenv("LIVESTOCK_MCP_URL", "http://127.0.0.1:8101/mcp")
+LIVESTOCK_MCP_MAX_CONNECTIONS = int(os.getenv("LIVESTOCK_MCP_MAX_CONNECTIONS", "20"))
+LIVESTOCK_MCP_TIMEOUT = float(os.getenv("LIVESTOCK_MCP_TIMEOUT", "30"))
+
+_mcp_tool: MCPStreamableHTTPTool | None = None
+_http_client: httpx.AsyncClient | None = None
+
+
+def get_livestock_mcp_tool(url: str | None = None) -> MCPStreamableHTTPTool:
+    """The process-wide livestock MCP tool, created (not connected) on first use.
+
+    Every agent of the process shares it. Agents only connect an MCP tool that is
+    not connected yet, so once connected, by connect_livestock_tools or the first
+    agent run, later runs reuse its session and concurrent tool calls share it.
+    """
+    global _mcp_tool, _http_client
+    if _mcp_tool is None:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(LIVESTOCK_MCP_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=LIVESTOCK_MCP_MAX_CONNECTIONS,
+                max_keepalive_connections=LIVESTOCK_MCP_MAX_CONNECTIONS,
+            ),
+        )
+        _mcp_tool = MCPStreamableHTTPTool(
+            name="livestock-water-consumption",
+            url=url or LIVESTOCK_MCP_URL,
+            load_prompts=False,
+            request_timeout=int(LIVESTOCK_MCP_TIMEOUT),
+            http_client=_http_client,
+        )
+    return _mcp_tool
+
+
+def get_livestock_tools() -> list:
+    """The livestock tools to give the agent for LIVESTOCK_TOOLS_MODE."""
+    if LIVESTOCK_TOOLS_MODE not in LIVESTOCK_TOOLS_MODES:
+        raise ValueError(
+            f"Unknown LIVESTOCK_TOOLS_MODE {LIVESTOCK_TOOLS_MODE!r}, expected one of {LIVESTOCK_TOOLS_MODES}"
+        )
+    if LIVESTOCK_TOOLS_MODE == "mcp":
+        return [get_livestock_mcp_tool()]
+    return LIVESTOCK_WATER_CONSUMPTION_TOOLS
+
+
+async def connect_livestock_tools() -> None:
+    """Connects the livestock MCP tool ahead of the first request, in "mcp" mode."""
+    if LIVESTOCK_TOOLS_MODE != "mcp":
+        return
+    tool = get_livestock_mcp_tool()
+    if tool.is_connected:
+        return
+    try:
+        await tool.connect()
+    except asyncio.CancelledError as exc:
+        # The MCP transport reports a server it cannot reach by cancelling its
+        # task group; only a cancellation of this task is passed on as one
+        if asyncio.current_task().cancelling():
+            raise
+        raise ConnectionError(f"Could not connect to the livestock MCP server at {tool.url}") from exc
+
+
+async def close_livestock_tools() -> None:
+    """Closes the livestock MCP session and its HTTP connections, if opened."""
+    global _mcp_tool, _http_client
+    if _mcp_tool is None:
+        return
+    tool, http_client = _mcp_tool, _http_client
+    _mcp_tool = _http_client = None
+    await tool.close()
+    # The MCP transport leaves a client it was given open
+    await http_client.aclose()
+
+
+def livestock_tools_status() -> dict:
+    return {
+        "mode": LIVESTOCK_TOOLS_MODE,
+        "connected": _mcp_tool is not None and _mcp_tool.is_connected,
+    }
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import json
+import os
+
 from local_mcp.livestock.calculator import (
     calculate_multiple_water_consumption,
     calculate_water_consumption,
+    calculate_water_consumption_batch,
     get_supported_livestock,
 )
 
@@ -15,7 +19,21 @@ except ImportError as exc:  # pragma: no cover
     ) from exc
 
 
-mcp = FastMCP("livestock-water-consumption")
+# "stdio" (default): one server per client process, started by the client
+# "streamable-http": a long-lived server on LIVESTOCK_MCP_HOST:LIVESTOCK_MCP_PORT
+# shared by every agent process, see mcp_client.py
+LIVESTOCK_MCP_TRANSPORTS = ("stdio", "streamable-http")
+LIVESTOCK_MCP_TRANSPORT = os.getenv("LIVESTOCK_MCP_TRANSPORT", "stdio")
+
+mcp = FastMCP(
+    "livestock-water-consumption",
+    host=os.getenv("LIVESTOCK_MCP_HOST", "127.0.0.1"),
+    port=int(os.getenv("LIVESTOCK_MCP_PORT", "8101")),
+    # The tools keep no state, so any pooled connection can serve any call, and
+    # each result comes back as a single JSON response rather than an SSE stream
+    stateless_http=True,
+    json_response=True,
+)
 
 
 @mcp.tool(
@@ -120,8 +138,41 @@ def calculate_multiple_livestock_water_consumption(
     return calculate_multiple_water_consumption(livestock_entries)
 
 
+@mcp.tool(
+    name="calculate_livestock_water_consumption_batch",
+    description=(
+        "Calculate livestock water consumption in cubic meters (m3) for many "
+        "livestock entries in one call, for large farms. Entry i is "
+        "livestock_types[i], livestock_counts[i], period_types[i] (days, weeks, "
+        "months, or years), and period_counts[i]. Returns one list per field with "
+        "one item per entry, and the combined total."
+    ),
+    # Returned as minified JSON text: a dict result would be sent twice, as
+    # structured content and as indented JSON text, which for thousands of
+    # entries is mostly whitespace
+    structured_output=False,
+)
+def calculate_livestock_water_consumption_batch(
+    livestock_types: list[str],
+    livestock_counts: list[int | float],
+    period_types: list[str],
+    period_counts: list[int | float],
+) -> str:
+    return json.dumps(
+        calculate_water_consumption_batch(
+            livestock_types, livestock_counts, period_types, period_counts
+        ),
+        separators=(",", ":"),
+    )
+
+
 def main() -> None:
-    mcp.run()
+    if LIVESTOCK_MCP_TRANSPORT not in LIVESTOCK_MCP_TRANSPORTS:
+        raise ValueError(
+            f"Unknown LIVESTOCK_MCP_TRANSPORT {LIVESTOCK_MCP_TRANSPORT!r}, "
+            f"expected one of {LIVESTOCK_MCP_TRANSPORTS}"
+        )
+    mcp.run(transport=LIVESTOCK_MCP_TRANSPORT)
 
 
 if __name__ == "__main__":
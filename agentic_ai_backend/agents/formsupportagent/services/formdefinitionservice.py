@@ -1,8 +1,9 @@
 
 import os
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from utils.blobservice import BlobService
+from utils.formutils import FORM_CONTEXT_FORMAT, get_compiled_form_context
 
 class FormDefinitionService:
     def __init__(self, blob_service: BlobService, container_name: str, directory_path: str = "formdefinitions"):
@@ -10,6 +11,9 @@ class FormDefinitionService:
         self.container_name = container_name
         self.directory_path = directory_path
         self.cache: Dict[str, Any] = {}
+        # Compiled form context per (definition name, format), so a request finds it
+        # by name instead of hashing the definition again
+        self.contexts: Dict[Tuple[str, str], str] = {}
 
     def fetch_form_definition(self, definition_name: str) -> Optional[Dict[str, Any]]:
 
@@ -22,12 +26,29 @@ class FormDefinitionService:
             
             json_content = self.blob_service.read_blob_text(self.container_name, blob_name)
             form_data = json.loads(json_content)            
+            # Compile the form context as the definition is loaded, not on a request
+            self.contexts[(definition_name, FORM_CONTEXT_FORMAT)] = get_compiled_form_context(form_data)
             self.cache[definition_name] = form_data
             return form_data
         except Exception as e:
             print(f"Error fetching form definition {definition_name}: {e}")
             return None
 
+    def fetch_form_context(self, definition_name: str, fmt: Optional[str] = None) -> Optional[str]:
+        """
+        Returns the compiled form context of a definition (see formutils), or None
+        if the definition cannot be fetched.
+        """
+        key = (definition_name, fmt or FORM_CONTEXT_FORMAT)
+        if key not in self.contexts:
+            # Fetching a definition compiles it in the default format
+            form_data = self.fetch_form_definition(definition_name)
+            if form_data is None:
+                return None
+            if key not in self.contexts:
+                self.contexts[key] = get_compiled_form_context(form_data, key[1])
+        return self.contexts[key]
+
     def list_available_definitions(self) -> list[str]:
         try:
             blobs = self.blob_service.list_blobs(self.container_name, name_starts_with=self.directory_path)
@@ -1,9 +1,11 @@
 
 import unittest
+import unittest.mock
 import os
 import json
 from dotenv import load_dotenv
 from services.formdefinitionservice import FormDefinitionService
+from utils import formutils
 from utils.blobservice import BlobService
 
 load_dotenv()
@@ -42,5 +44,43 @@ class TestFormDefinitionServiceIntegration(unittest.TestCase):
         if "step1-Introduction.json" in definitions:
              self.assertIn("step1-Introduction.json", definitions)
 
+class FakeBlobService:
+    def __init__(self, blobs):
+        self.blobs = blobs
+        self.reads = 0
+
+    def read_blob_text(self, container_name, blob_name):
+        self.reads += 1
+        return self.blobs[blob_name]
+
+
+class TestFormDefinitionServiceContext(unittest.TestCase):
+    def setUp(self):
+        definition = {"formName": "Water Licence Application", "properties": {"Name": {"id": "Name", "type": "string"}}}
+        self.blob_service = FakeBlobService({"formdefinitions/step7.json": json.dumps(definition)})
+        self.service = FormDefinitionService(self.blob_service, "container")
+
+    def test_fetch_form_context_compiles_once_per_name(self):
+        hashes = []
+        hash_real = formutils.form_definition_hash
+        formutils.form_definition_hash = lambda data: hashes.append(1) or hash_real(data)
+        try:
+            first = self.service.fetch_form_context("step7.json")
+            # Later requests find the context by name, without hashing the definition again
+            self.assertIs(self.service.fetch_form_context("step7.json"), first)
+        finally:
+            formutils.form_definition_hash = hash_real
+        self.assertEqual(len(hashes), 1)
+        self.assertEqual(self.blob_service.reads, 1)
+        self.assertIn("Name | string", first)
+        self.assertEqual(self.service.fetch_form_context("step7.json", "json"), formutils.compile_form_context(
+            self.service.fetch_form_definition("step7.json"), "json"
+        ))
+
+    def test_fetch_form_context_of_a_missing_definition(self):
+        with unittest.mock.patch("builtins.print"):
+            self.assertIsNone(self.service.fetch_form_context("step8.json"))
+
+
 if __name__ == '__main__':
     unittest.main()
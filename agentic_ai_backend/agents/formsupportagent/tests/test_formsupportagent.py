@@ -14,7 +14,11 @@ from formsupportagent import (
     extract_step_from_query,
     resolve_agent_assets,
     dryrun,
-    FormSupportAgent
+    build_instructions,
+    FormSupportAgent,
+    JSON_ENFORCEMENT_RULE,
+    LIVESTOCK_TOOL_RULE,
+    PROMPT_CACHE_STATS,
 )
 
 # --- Test extract_step_from_query ---
@@ -99,8 +103,8 @@ def test_resolve_agent_assets_not_found(tmp_path):
 # --- Test dryrun ---
 # Mock the FormSupportAgent class to avoid creating real OpenAI clients during testing
 @patch("formsupportagent.FormSupportAgent")
-# Mock get_form_context to avoid reading real YAML/JSON form definitions
-@patch("formsupportagent.get_form_context")
+# Mock get_compiled_form_context to avoid reading real JSON form definitions
+@patch("formsupportagent.get_compiled_form_context")
 # Mock resolve_agent_assets to avoid actual file system checks in this flow test
 @patch("formsupportagent.resolve_agent_assets")
 # Provide mock environment variables required by the dryrun function
@@ -133,7 +137,7 @@ async def test_dryrun_success(mock_resolve, mock_get_context, mock_agent_class):
         
     # Assert that the asset resolver was called with the correct step ID
     mock_resolve.assert_called_once_with("step3")
-    # Assert that get_form_context was called with the path returned by the resolver
+    # Assert that get_compiled_form_context was called with the path returned by the resolver
     mock_get_context.assert_called_once_with("/path/to/step3.json")
     # Assert that the FormSupportAgent was instantiated
     mock_agent_class.assert_called_once()
@@ -173,3 +177,46 @@ async def test_dryrun_no_assets(mock_resolve, capsys):
     captured = capsys.readouterr()
     # Verify the error message indicating the missing form definition
     assert "Form definition file not found for identifier: step3" in captured.out
+
+# --- Test build_instructions ---
+# The instructions must be byte-identical for every request of a step so they can be served from the prompt cache
+def test_build_instructions_is_stable_per_step():
+    template = "# Context\nAvailable fields:\n{form_context_str}\n\n# Rules\n- Return JSON."
+    context = "Field1 | string | Name | yes |  |"
+
+    first = build_instructions(template, context)
+    # Building the same step again gives exactly the same instructions
+    assert build_instructions(template, context) == first
+    # The form context replaces the placeholder and the constant rules come last
+    assert "Available fields:\n" + context + "\n\n# Rules" in first
+    assert first.endswith(JSON_ENFORCEMENT_RULE + LIVESTOCK_TOOL_RULE)
+
+
+def test_build_instructions_appends_context_without_placeholder():
+    instructions = build_instructions("# Role\nForm assistant.", "Field1 | string | Name | yes |  |")
+    assert instructions.startswith("# Role\nForm assistant.\n\nHere is the form context:\nField1")
+
+
+# --- Test prompt cache reporting ---
+@patch("formsupportagent.AzureOpenAIChatClient")
+@pytest.mark.asyncio
+async def test_run_records_cached_tokens(mock_client_class):
+    # The agent framework reports cached prompt tokens in the response's usage details
+    mock_agent = MagicMock()
+    mock_agent.run = AsyncMock(return_value=MagicMock(
+        text="No Match",
+        usage_details={"input_token_count": 2048, "output_token_count": 5, "prompt/cached_tokens": 1920},
+    ))
+    mock_client_class.return_value.as_agent.return_value = mock_agent
+    agent = FormSupportAgent("http://mock-endpoint", "mock-key", "mock-deployment", "2024-10-21", "context", "# Role")
+
+    before = PROMPT_CACHE_STATS.summary()
+    with patch("builtins.print"):
+        assert await agent.run("hello") == "No Match"
+    after = PROMPT_CACHE_STATS.summary()
+
+    # The query goes to the agent as a message, not into its instructions
+    assert "hello" not in mock_client_class.return_value.as_agent.call_args.kwargs["instructions"]
+    assert after["requests"] == before["requests"] + 1
+    assert after["cache_hits"] == before["cache_hits"] + 1
+    assert after["cached_tokens"] == before["cached_tokens"] + 1920
@@ -0,0 +1,139 @@
+import json
+import os
+
+import pytest
+
+from utils import formutils
+from utils.formutils import (
+    compile_form_context,
+    form_definition_hash,
+    get_compiled_form_context,
+    get_form_context,
+    precompile_form_contexts,
+)
+
+FORM_DEFINITIONS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "formdefinitions"))
+
+DEFINITION = {
+    "formName": "Water Licence Application",
+    "formDescription": "Step 7 - Individual",
+    "properties": {
+        "LastName": {"type": "string", "id": "LastName", "title": "Last Name", "required": True, "maxLength": 100},
+        "Country": {
+            "type": "select",
+            "id": "Country",
+            "title": "Country:",
+            "required": False,
+            "options": [{"label": "(None)"}, {"label": "Canada", "selected": True}, {"label": "Chad"}],
+        },
+        "Housing": {"type": "radio", "id": "Housing", "title": "Housing | units?", "enum": ["Yes", "No"]},
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_compiled_contexts():
+    # Each test starts with empty caches
+    formutils._compiled_contexts.clear()
+    formutils._definition_files.clear()
+
+
+# --- Test compile_form_context ---
+def test_compile_table_has_one_row_per_field():
+    context = compile_form_context(DEFINITION, "table")
+    lines = context.splitlines()
+
+    assert lines[0] == "formName: Water Licence Application"
+    assert lines[1] == "formDescription: Step 7 - Individual"
+    # Titles keep their case and the column separator cannot appear inside a cell
+    assert "LastName | string | Last Name | yes |  | maxLength=100" in lines
+    assert 'Housing | radio | Housing / units? |  |  | enum=["Yes","No"]' in lines
+    # Lists of objects become a sub-table with one header
+    assert "  options (label | selected):" in lines
+    assert "  - Canada | True" in lines
+
+
+def test_compile_table_keeps_fields_outside_properties():
+    # get_form_context only reads "properties", so these steps had no context at all
+    for name in ("step1-Introduction.json", "step2-Eligibility.json", "step4-Location_consolidated.json"):
+        path = os.path.join(FORM_DEFINITIONS_DIR, name)
+        assert get_form_context(path) == ""
+        context = compile_form_context(path, "table")
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+        container = data.get("formfields") or data["sections"]
+        for field_id in _field_ids(container):
+            assert field_id in context
+
+
+def test_compile_json_is_minified_and_lossless():
+    context = compile_form_context(DEFINITION, "json")
+    assert json.loads(context) == DEFINITION
+    assert ": " not in context.replace("Housing | units?", "")
+
+
+def test_compile_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        compile_form_context(DEFINITION, "yaml")
+
+
+def test_table_is_smaller_than_json_for_every_step():
+    for name in os.listdir(FORM_DEFINITIONS_DIR):
+        path = os.path.join(FORM_DEFINITIONS_DIR, name)
+        with open(path, encoding="utf-8") as handle:
+            dumped = json.dumps(json.load(handle))
+        assert len(compile_form_context(path, "table")) < len(dumped), name
+
+
+# --- Test the compiled context cache ---
+def test_hash_ignores_key_order_and_layout():
+    reordered = json.loads(json.dumps(DEFINITION, indent=4, sort_keys=True))
+    assert form_definition_hash(reordered) == form_definition_hash(DEFINITION)
+    changed = json.loads(json.dumps(DEFINITION))
+    changed["properties"]["LastName"]["title"] = "Surname"
+    assert form_definition_hash(changed) != form_definition_hash(DEFINITION)
+
+
+def test_compiled_context_is_built_once_per_content(monkeypatch):
+    calls = []
+    compile_real = formutils.compile_form_context
+    monkeypatch.setattr(formutils, "compile_form_context", lambda data, fmt: calls.append(fmt) or compile_real(data, fmt))
+
+    first = get_compiled_form_context(DEFINITION, "table")
+    # The same content from another fetch reuses the compiled string
+    assert get_compiled_form_context(json.loads(json.dumps(DEFINITION)), "table") is first
+    assert calls == ["table"]
+    get_compiled_form_context(DEFINITION, "json")
+    assert calls == ["table", "json"]
+
+
+def test_compiled_context_rereads_a_file_only_when_it_changes(tmp_path):
+    path = tmp_path / "step7-Individual.json"
+    path.write_text(json.dumps(DEFINITION), encoding="utf-8")
+
+    first = get_compiled_form_context(str(path), "table")
+    assert get_compiled_form_context(str(path), "table") is first
+
+    edited = json.loads(json.dumps(DEFINITION))
+    edited["properties"]["LastName"]["title"] = "Surname of the applicant"
+    path.write_text(json.dumps(edited), encoding="utf-8")
+    os.utime(path, ns=(0, 1))
+    assert "Surname of the applicant" in get_compiled_form_context(str(path), "table")
+
+
+def test_precompile_form_contexts():
+    compiled = precompile_form_contexts(FORM_DEFINITIONS_DIR, "table")
+
+    assert len(compiled) == len([name for name in os.listdir(FORM_DEFINITIONS_DIR) if name.endswith(".json")])
+    assert len(formutils._compiled_contexts) == len(set(compiled.values()))
+
+
+def _field_ids(node):
+    if isinstance(node, dict):
+        if isinstance(node.get("id"), str) and "type" in node:
+            yield node["id"]
+        for value in node.values():
+            yield from _field_ids(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _field_ids(item)
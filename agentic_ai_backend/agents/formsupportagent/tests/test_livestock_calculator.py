@@ -0,0 +1,143 @@
+import random
+
+import numpy as np
+import pytest
+
+from local_mcp.livestock.calculator import (
+    PERIOD_MULTIPLIERS,
+    calculate_multiple_water_consumption,
+    calculate_water_consumption,
+    calculate_water_consumption_batch,
+    get_supported_livestock,
+)
+
+COLUMNS = ("livestock_type", "livestock_count", "period_type", "period_count")
+
+
+# --- Test calculate_water_consumption_batch ---
+def test_batch_matches_per_entry_results():
+    livestock_types = ["beef", " Poultry_Broiler ", "dairy_calf", "beef"]
+    livestock_counts = [10, 20, 3, 2.5]
+    period_types = ["years", "months", "weeks", "days"]
+    period_counts = [1, 10, 2, 4]
+
+    batch = calculate_water_consumption_batch(livestock_types, livestock_counts, period_types, period_counts)
+
+    assert batch["entry_count"] == 4
+    # Livestock types come back normalized
+    assert batch["livestock_type"] == ["beef", "poultry_broiler", "dairy_calf", "beef"]
+    for index in range(4):
+        single = calculate_water_consumption(
+            livestock_types[index], livestock_counts[index], period_types[index], period_counts[index]
+        )
+        assert batch["total_water_consumption_m3"][index] == single["total_water_consumption_m3"]
+        assert batch["total_period_days"][index] == single["total_period_days"]
+    assert batch["combined_total_water_consumption_m3"] == pytest.approx(sum(batch["total_water_consumption_m3"]))
+
+
+def test_batch_totals_match_multiple_on_random_entries():
+    rng = random.Random(0)
+    livestock_types = get_supported_livestock()
+
+    def number(high):
+        return rng.choice([rng.randint(1, high), round(rng.uniform(0.5, high), rng.randint(1, 3))])
+
+    for _ in range(100):
+        entries = [
+            {
+                "livestock_type": rng.choice(livestock_types),
+                "livestock_count": number(5000),
+                "period_type": rng.choice(list(PERIOD_MULTIPLIERS)),
+                "period_count": number(24),
+            }
+            for _ in range(rng.randint(1, 200))
+        ]
+        multiple = calculate_multiple_water_consumption(entries)
+        batch = calculate_water_consumption_batch(*[[entry[key] for entry in entries] for key in COLUMNS])
+
+        # Exactly equal: rounded with round() and summed in entry order
+        assert batch["total_water_consumption_m3"] == [
+            calculation["total_water_consumption_m3"] for calculation in multiple["calculations"]
+        ]
+        assert batch["combined_total_water_consumption_m3"] == multiple["combined_total_water_consumption_m3"]
+
+
+def test_batch_rounds_like_round():
+    # np.round(0.0020825, 6) gives 0.002082
+    batch = calculate_water_consumption_batch(["poultry_broiler"], [3.5], ["weeks"], [0.5])
+    assert batch["total_water_consumption_m3"] == [0.002083]
+    assert calculate_water_consumption("poultry_broiler", 3.5, "weeks", 0.5)["total_water_consumption_m3"] == 0.002083
+
+
+def test_batch_result_is_columnar():
+    batch = calculate_water_consumption_batch(["beef"] * 3, [1, 2, 3], ["days"] * 3, [1, 1, 1])
+
+    # Descriptions and rates are given once per livestock type, not per entry
+    assert list(batch["livestock"]) == ["beef"]
+    assert batch["livestock"]["beef"]["daily_water_consumption_m3_per_animal"] == 0.05
+    assert batch["total_water_consumption_m3"] == [0.05, 0.1, 0.15]
+    assert batch["application_fee"] == 250
+
+
+def test_batch_accepts_numpy_columns():
+    batch = calculate_water_consumption_batch(
+        np.array(["beef", "bison"]), np.array([10, 20]), np.array(["years", "weeks"]), np.array([1.0, 2.0])
+    )
+    assert batch["total_water_consumption_m3"] == [182.5, 14.0]
+
+
+@pytest.mark.parametrize("columns, message", [
+    ((["beef", "cat"], [1, 1], ["days", "days"], [1, 1]), "Unsupported livestock_type 'cat'"),
+    ((["beef", "beef"], [1, 1], ["days", "hours"], [1, 1]), "Unsupported period_type 'hours'"),
+    ((["beef", "beef"], [1, 0], ["days", "days"], [1, 1]), "livestock_count must be greater than 0."),
+    ((["beef", "beef"], [1, 1], ["days", "weeks"], [1, -2]), "week_count must be greater than 0."),
+    ((["beef"], [1, 1], ["days", "days"], [1, 1]), "must have the same length"),
+    (([], [], [], []), "must contain at least one item"),
+    ((["beef"], ["many"], ["days"], [1]), "livestock_counts must be a list of numbers."),
+])
+def test_batch_validation(columns, message):
+    with pytest.raises(ValueError, match=message):
+        calculate_water_consumption_batch(*columns)
+
+
+# --- Test the per-entry API ---
+def test_calculate_water_consumption_keeps_its_format():
+    result = calculate_water_consumption("Beef", 10, "years", 1)
+    assert result == {
+        "livestock_type": "beef",
+        "livestock_description": "Beef cattle used for milk, meat production",
+        "livestock_count": 10,
+        "period_type": "years",
+        "period_count": 1,
+        "daily_water_consumption_m3_per_animal": 0.05,
+        "total_period_days": 365,
+        "total_water_consumption_m3": 182.5,
+        "application_fee": 250,
+        "assumptions": {"month_days": 30, "year_days": 365},
+    }
+
+
+def test_calculate_multiple_water_consumption_keeps_its_format():
+    result = calculate_multiple_water_consumption([
+        {"livestock_type": "beef", "livestock_count": 10, "period_type": "years", "period_count": 1},
+        {"livestock_type": "dairy_calf", "livestock_count": 4, "period_type": "months", "period_count": 1.5},
+    ])
+
+    assert result["entry_count"] == 2
+    assert [calculation["entry_index"] for calculation in result["calculations"]] == [1, 2]
+    assert result["calculations"][0]["total_period_days"] == 365
+    assert isinstance(result["calculations"][0]["total_period_days"], int)
+    assert result["calculations"][1]["total_water_consumption_m3"] == 4.5
+    assert result["combined_total_water_consumption_m3"] == 187.0
+    assert result["application_fee"] == 250
+
+
+def test_per_entry_api_accepts_any_number():
+    # The batch API only takes int and float columns
+    assert calculate_water_consumption("beef", True, "days", 2)["total_water_consumption_m3"] == 0.1
+    assert calculate_water_consumption("beef", 10**20, "days", 1)["total_water_consumption_m3"] == 5e18
+
+
+def test_calculate_multiple_water_consumption_requires_all_keys():
+    with pytest.raises(ValueError, match="Each livestock entry must include"):
+        calculate_multiple_water_consumption([{"livestock_type": "beef", "livestock_count": 1}])
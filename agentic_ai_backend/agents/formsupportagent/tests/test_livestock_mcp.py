@@ -0,0 +1,99 @@
+import json
+
+import pytest
+from agent_framework import MCPStreamableHTTPTool
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from local_mcp.livestock import mcp_client
+from local_mcp.livestock.calculator import calculate_water_consumption_batch
+from local_mcp.livestock.inprocess_client import (
+    LIVESTOCK_WATER_CONSUMPTION_TOOLS,
+    calculate_livestock_water_consumption_batch,
+)
+from local_mcp.livestock.server import mcp
+
+BATCH = {
+    "livestock_types": ["beef", "poultry_broiler", "beef"],
+    "livestock_counts": [10, 20, 5],
+    "period_types": ["years", "months", "days"],
+    "period_counts": [1, 10, 3],
+}
+
+
+@pytest.fixture(autouse=True)
+def reset_livestock_tools(monkeypatch):
+    # Each test starts without a shared MCP tool, none of them connects one
+    monkeypatch.setattr(mcp_client, "_mcp_tool", None)
+    monkeypatch.setattr(mcp_client, "_http_client", None)
+
+
+# --- Test get_livestock_tools ---
+def test_inprocess_mode_uses_the_inprocess_tools(monkeypatch):
+    monkeypatch.setattr(mcp_client, "LIVESTOCK_TOOLS_MODE", "inprocess")
+    assert mcp_client.get_livestock_tools() is LIVESTOCK_WATER_CONSUMPTION_TOOLS
+    assert calculate_livestock_water_consumption_batch in LIVESTOCK_WATER_CONSUMPTION_TOOLS
+
+
+def test_mcp_mode_shares_one_tool_per_process(monkeypatch):
+    monkeypatch.setattr(mcp_client, "LIVESTOCK_TOOLS_MODE", "mcp")
+    monkeypatch.setattr(mcp_client, "LIVESTOCK_MCP_URL", "http://livestock-mcp:8101/mcp")
+
+    tools = mcp_client.get_livestock_tools()
+    assert len(tools) == 1
+    assert isinstance(tools[0], MCPStreamableHTTPTool)
+    assert tools[0].url == "http://livestock-mcp:8101/mcp"
+    # Every agent gets the same tool, so a connected session is reused
+    assert mcp_client.get_livestock_tools()[0] is tools[0]
+
+
+def test_unknown_mode_raises(monkeypatch):
+    monkeypatch.setattr(mcp_client, "LIVESTOCK_TOOLS_MODE", "remote")
+    with pytest.raises(ValueError):
+        mcp_client.get_livestock_tools()
+
+
+@pytest.mark.asyncio
+async def test_connect_is_a_no_op_in_inprocess_mode(monkeypatch):
+    monkeypatch.setattr(mcp_client, "LIVESTOCK_TOOLS_MODE", "inprocess")
+    await mcp_client.connect_livestock_tools()
+    assert mcp_client.livestock_tools_status() == {"mode": "inprocess", "connected": False}
+    assert mcp_client._mcp_tool is None
+
+
+@pytest.mark.asyncio
+async def test_connect_to_an_unreachable_server_raises_connection_error(monkeypatch):
+    monkeypatch.setattr(mcp_client, "LIVESTOCK_TOOLS_MODE", "mcp")
+    monkeypatch.setattr(mcp_client, "LIVESTOCK_MCP_URL", "http://127.0.0.1:1/mcp")
+    with pytest.raises(ConnectionError):
+        await mcp_client.connect_livestock_tools()
+    assert mcp_client.livestock_tools_status() == {"mode": "mcp", "connected": False}
+
+
+@pytest.mark.asyncio
+async def test_close_drops_the_shared_tool(monkeypatch):
+    monkeypatch.setattr(mcp_client, "LIVESTOCK_TOOLS_MODE", "mcp")
+    first = mcp_client.get_livestock_mcp_tool()
+    await mcp_client.close_livestock_tools()
+    assert mcp_client._mcp_tool is None
+    assert mcp_client.get_livestock_mcp_tool() is not first
+
+
+# --- Test the batch tool ---
+@pytest.mark.asyncio
+async def test_inprocess_batch_tool_returns_minified_batch():
+    result = await calculate_livestock_water_consumption_batch.invoke(arguments=BATCH)
+    text = result[0].text
+    assert json.loads(text) == calculate_water_consumption_batch(*BATCH.values())
+    assert ": " not in text
+
+
+@pytest.mark.asyncio
+async def test_server_batch_tool_matches_inprocess():
+    async with create_connected_server_and_client_session(mcp._mcp_server) as session:
+        names = [listed.name for listed in (await session.list_tools()).tools]
+        assert "calculate_livestock_water_consumption_batch" in names
+
+        result = await session.call_tool("calculate_livestock_water_consumption_batch", BATCH)
+        assert not result.isError
+        assert result.structuredContent is None
+        assert json.loads(result.content[0].text) == calculate_water_consumption_batch(*BATCH.values())
@@ -0,0 +1,42 @@
+from unittest.mock import patch
+from types import SimpleNamespace
+
+from utils.promptcache import PromptCacheStats, agent_cache_usage, completion_cache_usage
+
+
+# --- Test reading cached tokens from usage ---
+def test_completion_cache_usage():
+    usage = SimpleNamespace(prompt_tokens=1500, prompt_tokens_details=SimpleNamespace(cached_tokens=1280))
+    assert completion_cache_usage(usage) == (1500, 1280)
+    # Older API versions and gateways may leave out the prompt token details
+    assert completion_cache_usage(SimpleNamespace(prompt_tokens=900, prompt_tokens_details=None)) == (900, 0)
+    assert completion_cache_usage(None) == (0, 0)
+
+
+def test_agent_cache_usage():
+    assert agent_cache_usage({"input_token_count": 1500, "prompt/cached_tokens": 1024}) == (1500, 1024)
+    # No cached tokens key when nothing was served from the cache
+    assert agent_cache_usage({"input_token_count": 800}) == (800, 0)
+    assert agent_cache_usage(None) == (0, 0)
+
+
+# --- Test PromptCacheStats ---
+def test_prompt_cache_stats_summary():
+    stats = PromptCacheStats("Test")
+    assert stats.summary()["cached_token_rate"] == 0.0
+
+    with patch("builtins.print") as mock_print:
+        stats.record(1200, 0, 2.0)
+        stats.record(1200, 1024, 1.0)
+        stats.record(1200, 1152, 0.5)
+
+    summary = stats.summary()
+    assert summary["requests"] == 3
+    assert summary["cache_hits"] == 2
+    assert summary["prompt_tokens"] == 3600
+    assert summary["cached_tokens"] == 2176
+    assert summary["cached_token_rate"] == round(2176 / 3600, 3)
+    assert summary["mean_latency_hit_s"] == 0.75
+    assert summary["mean_latency_miss_s"] == 2.0
+    # Every call is logged with its prompt and cached tokens
+    assert "prompt_tokens=1200 cached_tokens=1024" in mock_print.call_args_list[1].args[0]
@@ -9,6 +9,7 @@ from fastapi import FastAPI, HTTPException
 from dotenv import load_dotenv
 from typing import Any, List, Optional
 from orchestratoragent import orchestrate_a2a
+from workflowcomponents.aggregator import PROMPT_CACHE_STATS
 
 load_dotenv()
 
@@ -95,7 +96,7 @@ async def invoke_agent(request: InvokeRequest):
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "OrchestratorAgent"}
+    return {"status": "healthy", "service": "OrchestratorAgent", "prompt_cache": PROMPT_CACHE_STATS.summary()}
 
 if __name__ == "__main__":
     host = os.getenv("HOST", "0.0.0.0")
@@ -2,7 +2,68 @@ from agent_framework import Executor, WorkflowContext, handler
 from typing import Any
 from typing_extensions import Never
 import os
+import time
 from openai import AsyncAzureOpenAI
+from utils.promptcache import PromptCacheStats, completion_cache_usage
+
+#TODO: ABIN, need to pull from Blob Store for more flexible prompts??? 
+# Everything that is the same for every request. It goes first, as the system
+# message, and the sub-agent responses follow in the user message. Azure OpenAI
+# only caches a prefix of 1024 tokens or more, and this one is shorter (about 880
+# tokens with the user message header), so the aggregator gets no cache hits until
+# the instructions grow past that; PROMPT_CACHE_STATS shows when they do.
+AGGREGATOR_SYSTEM_PROMPT = """You are a helpful assistant for the applicants of BC Permit Application. Your goal is to curate the responses from Form Support Agent and Conversation Agent and provide a single response to the user. When including URLs or web links in your response, never append punctuation (such as a period, comma, or parenthesis) immediately after the URL. Always ensure the URL is the last character before a space or end of line. For example, write 'visit www.bceid.ca/aboutbceid for more info' not 'visit www.bceid.ca/aboutbceid. for more info'.
+
+You will receive information from two sub agents:
+
+1. Conversation Agent (General Info comes from Azure AI Search)
+
+2. Form Support Agent (Form Specific Info for the current step of the form)
+
+Your task:
+- Synthesize a single, natural, and helpful response for the user. 
+- Synthesized response content of Conversation Agent will come first, then the response content of Form Support Agent.
+- If the conversation agent has "Not found" in response, then you must rely on the Form Support Agent's response.                
+  I'll guide you step by step and let you know when something from the Act is relevant, so you can focus on completing the application without needing to interpret the legislation on your own" **. Do NOT tell the user to read any documents, and do NOT mention you do not have any information.
+- If the Form Support Agent suggests a specific action, YOU MUST PRIORITIZE this action in your response. Guide the user to take that action.
+- For e.g. if the `type` is "button" and `title` is "Apply without BCeID", then you must guide the user "If you'd like to proceed without a BCeID, please click the "Apply without BCeID" button on the form to start your application".
+- On step 3 - Technical Information, If there are any calculations involved, DO NOT use LATEX to display those calculations. Just write it out as a simple text.
+- *Strict*: if the suggestion from Form Support Agent has `type` is "radio" or `type` is "select" then the response should indicate like "AI Assistant has selected the option for you."
+- *Strict*: if the suggestion from Form Support Agent has `type` is "string" then the response should acknowledge that the information has been filled in for the user (e.g., "AI Assistant has filled in your supporting information details for you.")
+- If the Form Support Agent says "no match" or implies no specific form action is needed right now, rely primarily on the Conversation Agent's information if there are any response from Conversation Agent.
+- Do not mention "Conversation Agent" or "Form Support Agent" by name. Speak as a single entity ("I" or "we").                
+- Do not send a JSON in the aggregated response; Only the original results can contain the respective responses from Conversation Agent and Form Support Agent.
+- *Strict*: if the conversation agent's response is NOT FOUND, and there is valid 'suggestedvalue' in JSON response from Form Support agent, then response should indicate the action taken by AI Bot's suggestion, rather than directing the user to take action.
+- *Strict*: Preserve all Markdown links exactly as they appear in the sub-agent responses. If a sub-agent provides a link in the format [text](url), you MUST keep it in that exact format in your response. Never convert a Markdown link into a bare URL. If you introduce any new URLs yourself, also format them as Markdown links using [descriptive text](url).
+- **Strict*: If the user queries like "Does the water sustainability act apply to me ?" or "applicability of water sustainability act with the application", IGNORE responses from Conversation Agent(ConversationAgentA2A)  and Form Support Agent(FormSupportAgentA2A) , ** AI Assistant SHOULD ALWAYS answer like "For the purposes of your application, you don't need to review the entire Water Sustainability Act right now. As you move through the application, AI Assistant automatically consider any relevant impacts, implications, or interactions with the water sustainility act that apply to your situation.
+"""
+
+# Prompt cache totals for the aggregator calls of this process
+PROMPT_CACHE_STATS = PromptCacheStats("Aggregator")
+
+_client = None
+
+
+def get_client(api_key, endpoint, deployment, api_version):
+    """Returns the Azure OpenAI client, created once so its connections are reused."""
+    global _client
+    if _client is None:
+        _client = AsyncAzureOpenAI(
+            api_key=api_key,
+            api_version=api_version,
+            azure_endpoint=endpoint,
+            azure_deployment=deployment,
+        )
+    return _client
+
+
+def build_user_prompt(conversation_text, form_text, form_step):
+    """The part of the aggregator prompt that changes per request: the sub-agent responses."""
+    return (
+        "You have received information from two sub agents:\n\n"
+        f"1. Conversation Agent (General Info comes from Azure AI Search):\n{conversation_text}\n\n"
+        f"2. Form Support Agent (Form Specific Info for step '{form_step}'):\n{form_text}\n"
+    )
 
 class Aggregator(Executor):
     """Aggregate the results from the different tasks and yield the final output."""
@@ -29,12 +90,7 @@ class Aggregator(Executor):
 
         if api_key and endpoint and deployment and api_version:
             try:
-                client = AsyncAzureOpenAI(
-                    api_key=api_key,
-                    api_version=api_version,
-                    azure_endpoint=endpoint,
-                    azure_deployment=deployment,
-                )
+                client = get_client(api_key, endpoint, deployment, api_version)
                 
                 # Extract information from results
                 conversation_text = ""
@@ -53,49 +109,19 @@ class Aggregator(Executor):
                             form_step = res.get("step_number", "")
                 
                
-                system_prompt = (
-                    "You are a helpful assistant for the applicants of BC Permit Application. "
-                    "Your goal is to curate the responses from Form Support Agent and Conversation Agent and provide a single response to the user. "
-                    "When including URLs or web links in your response, never append punctuation (such as a period, comma, or parenthesis) immediately after the URL. "
-                    "Always ensure the URL is the last character before a space or end of line. For example, write 'visit www.bceid.ca/aboutbceid for more info' not 'visit www.bceid.ca/aboutbceid. for more info'."
-                )
-                
-                #TODO: ABIN, need to pull from Blob Store for more flexible prompts??? 
-                user_prompt = f"""
-                You have received information from two sub agents:
-                
-                1. Conversation Agent (General Info comes from Azure AI Search): 
-                {conversation_text}
-                
-                2. Form Support Agent (Form Specific Info for step '{form_step}'): 
-                {form_text}
-                
-                Your task:
-                - Synthesize a single, natural, and helpful response for the user. 
-                - Synthesized response content of Conversation Agent will come first, then the response content of Form Support Agent.
-                - If the conversation agent has "Not found" in response, then you must rely on the Form Support Agent's response.                
-                  I'll guide you step by step and let you know when something from the Act is relevant, so you can focus on completing the application without needing to interpret the legislation on your own" **. Do NOT tell the user to read any documents, and do NOT mention you do not have any information.
-                - If the Form Support Agent suggests a specific action, YOU MUST PRIORITIZE this action in your response. Guide the user to take that action.
-                - For e.g. if the `type` is "button" and `title` is "Apply without BCeID", then you must guide the user "If you'd like to proceed without a BCeID, please click the "Apply without BCeID" button on the form to start your application".
-                - On step 3 - Technical Information, If there are any calculations involved, DO NOT use LATEX to display those calculations. Just write it out as a simple text.
-                - *Strict*: if the suggestion from Form Support Agent has `type` is "radio" or `type` is "select" then the response should indicate like "AI Assistant has selected the option for you."
-                - *Strict*: if the suggestion from Form Support Agent has `type` is "string" then the response should acknowledge that the information has been filled in for the user (e.g., "AI Assistant has filled in your supporting information details for you.")
-                - If the Form Support Agent says "no match" or implies no specific form action is needed right now, rely primarily on the Conversation Agent's information if there are any response from Conversation Agent.
-                - Do not mention "Conversation Agent" or "Form Support Agent" by name. Speak as a single entity ("I" or "we").                
-                - Do not send a JSON in the aggregated response; Only the original results can contain the respective responses from Conversation Agent and Form Support Agent.
-                - *Strict*: if the conversation agent's response is NOT FOUND, and there is valid 'suggestedvalue' in JSON response from Form Support agent, then response should indicate the action taken by AI Bot's suggestion, rather than directing the user to take action.
-                - *Strict*: Preserve all Markdown links exactly as they appear in the sub-agent responses. If a sub-agent provides a link in the format [text](url), you MUST keep it in that exact format in your response. Never convert a Markdown link into a bare URL. If you introduce any new URLs yourself, also format them as Markdown links using [descriptive text](url).
-                - **Strict*: If the user queries like "Does the water sustainability act apply to me ?" or "applicability of water sustainability act with the application", IGNORE responses from Conversation Agent(ConversationAgentA2A)  and Form Support Agent(FormSupportAgentA2A) , ** AI Assistant SHOULD ALWAYS answer like "For the purposes of your application, you don't need to review the entire Water Sustainability Act right now. As you move through the application, AI Assistant automatically consider any relevant impacts, implications, or interactions with the water sustainility act that apply to your situation.
-                """
-                
+                # Static instructions first and the sub-agent responses last, so the
+                # system prompt is a prefix shared by every request
+                started = time.perf_counter()
                 completion = await client.chat.completions.create(
                     model=deployment,
                     temperature=0.1,
                     messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
+                        {"role": "system", "content": AGGREGATOR_SYSTEM_PROMPT},
+                        {"role": "user", "content": build_user_prompt(conversation_text, form_text, form_step)}
                     ],
                 )
+                prompt_tokens, cached_tokens = completion_cache_usage(completion.usage)
+                PROMPT_CACHE_STATS.record(prompt_tokens, cached_tokens, time.perf_counter() - started)
                 
                 final_text = completion.choices[0].message.content
                 
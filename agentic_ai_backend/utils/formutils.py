@@ -1,41 +1,271 @@
-
+import hashlib
 import json
+import os
+import threading
 
-def get_form_context(form_data):
+# Formats accepted by compile_form_context:
+# - "table": a header with the form name and description, then one row per field
+#   (id | type | title | required | description | other attributes), with group
+#   lines for the sections a field sits in
+# - "json": the definition as minified JSON, nothing dropped
+FORM_CONTEXT_FORMATS = ("table", "json")
+FORM_CONTEXT_FORMAT = os.getenv("FORM_CONTEXT_FORMAT", "table")
+
+# Field attributes that have their own column in the table format
+_FIELD_COLUMNS = ("id", "type", "title", "required", "description")
+
+_compiled_contexts: dict[tuple[str, str], str] = {}
+_definition_files: dict[str, tuple[int, int, dict, str]] = {}
+_cache_lock = threading.Lock()
+
+
+def load_form_definition(form_data):
     """
-    Reads the JSON form definition and returns a structured string of fields
-    for the LLM context.
-    
+    Returns the form definition as a dictionary.
+
     Args:
         form_data: Either a file path (str) or a dictionary containing the form definition
     """
     if isinstance(form_data, str):
         # It's a file path
         with open(form_data, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    elif isinstance(form_data, dict):
+            return json.load(f)
+    if isinstance(form_data, dict):
         # It's already a dictionary
-        data = form_data
-    else:
-        raise ValueError("form_data must be either a file path (str) or a dictionary")
-        
+        return form_data
+    raise ValueError("form_data must be either a file path (str) or a dictionary")
+
+
+def get_form_context(form_data):
+    """
+    Reads the JSON form definition and returns a structured string of fields
+    for the LLM context.
+
+    Args:
+        form_data: Either a file path (str) or a dictionary containing the form definition
+    """
+    data = load_form_definition(form_data)
+
     # Handle both list and dictionary structures for properties
     properties_raw = data.get('properties', [])
     if isinstance(properties_raw, dict):
         properties = list(properties_raw.values())
     else:
         properties = properties_raw
-    
+
     context_lines = []
     for prop in properties:
         # Some schemas use 'id', others might use 'ID' or just be objects
         p_id = prop.get('id') or prop.get('ID', 'unknown')
         p_title = str(prop.get('title', '')).lower()
         p_desc = str(prop.get('description', '')).lower()
-        
+
         # Options can be in 'SuggestedValues' or 'enum'
         p_suggested_values = prop.get('SuggestedValues') or prop.get('enum', [])
-        
+
         context_lines.append(f"ID: {p_id} | Title: {p_title} | Description: {p_desc} | Options: {p_suggested_values}")
-        
-    return "\n".join(context_lines)
\ No newline at end of file
+
+    return "\n".join(context_lines)
+
+
+def form_definition_hash(data):
+    """
+    Returns the SHA-256 of the form definition's canonical JSON (sorted keys, no
+    whitespace), so the same definition hashes the same whatever its file layout.
+    """
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _minified(value):
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def _cell(value):
+    # Keep one field per line and the column separator unambiguous
+    return " ".join(str(value).split()).replace("|", "/")
+
+
+def _is_field(node):
+    return isinstance(node, dict) and isinstance(node.get("id"), str) and "type" in node
+
+
+def _is_records(value):
+    return isinstance(value, list) and bool(value) and all(isinstance(item, dict) for item in value)
+
+
+def _attributes(node, prefix=""):
+    # Objects holding other objects or lists are flattened into dotted keys, and
+    # lists of objects are written as indented sub-tables by _sub_tables
+    attributes = {}
+    for key, value in node.items():
+        if isinstance(value, dict) and any(isinstance(item, (dict, list)) for item in value.values()):
+            attributes.update(_attributes(value, f"{prefix}{key}."))
+        elif isinstance(value, dict) or (isinstance(value, list) and not _is_records(value)):
+            attributes[f"{prefix}{key}"] = _minified(value)
+        elif not isinstance(value, list):
+            attributes[f"{prefix}{key}"] = _cell(value)
+    return attributes
+
+
+def _joined(attributes):
+    return "; ".join(f"{key}={value}" for key, value in attributes.items())
+
+
+def _sub_tables(node, indent):
+    for key, value in node.items():
+        if isinstance(value, dict):
+            yield from _sub_tables(value, indent)
+        elif _is_records(value):
+            rows = [_attributes(item) for item in value]
+            if len(rows) == 1:
+                yield f"{indent}{key}: {_joined(rows[0])}"
+                yield from _sub_tables(value[0], indent + "  ")
+                continue
+            # One header for the rows, and values every row has written once
+            columns = list(dict.fromkeys(column for row in rows for column in row))
+            shared = {
+                column: rows[0][column]
+                for column in columns
+                if all(row.get(column) == rows[0].get(column) for row in rows)
+            }
+            varying = [column for column in columns if column not in shared]
+            header = f"{indent}{key} ({' | '.join(varying)})"
+            yield f"{header}, all with {_joined(shared)}:" if shared else f"{header}:"
+            for item, row in zip(value, rows):
+                yield f"{indent}- {' | '.join(row.get(column, '') for column in varying)}"
+                yield from _sub_tables(item, indent + "  ")
+
+
+def _field_lines(field):
+    required = field.get("required")
+    extras = {key: value for key, value in field.items() if key not in _FIELD_COLUMNS}
+    yield " | ".join([
+        _cell(field["id"]),
+        _cell(field.get("type", "")),
+        _cell(field.get("title", "")),
+        "yes" if required is True else "no" if required is False else "",
+        _cell(field.get("description", "")),
+        _joined(_attributes(extras)),
+    ])
+    yield from _sub_tables(extras, "  ")
+
+
+def _table_lines(node, path):
+    if _is_field(node):
+        yield from _field_lines(node)
+    elif isinstance(node, dict):
+        scalars = {key: value for key, value in node.items() if not isinstance(value, (dict, list))}
+        if scalars and path:
+            details = "; ".join(f"{key}={_cell(value)}" for key, value in scalars.items())
+            yield f"[{'/'.join(path)}] {details}"
+        for key, value in node.items():
+            if isinstance(value, (dict, list)):
+                # Field mappings are keyed by the field id, which the row already has
+                yield from _table_lines(value, path if _is_field(value) else path + [str(key)])
+    elif isinstance(node, list):
+        for index, item in enumerate(node):
+            if _is_field(item):
+                yield from _table_lines(item, path)
+            elif isinstance(item, (dict, list)):
+                name = item.get("name") if isinstance(item, dict) else None
+                yield from _table_lines(item, path + [str(name or index)])
+            else:
+                yield f"[{'/'.join(path)}] {_cell(item)}"
+
+
+def _compile_table(data):
+    lines = []
+    for key in ("formName", "formDescription"):
+        if data.get(key):
+            lines.append(f"{key}: {_cell(data[key])}")
+    lines.append("Fields (id | type | title | required | description | other attributes):")
+    for key, value in data.items():
+        if key in ("formName", "formDescription"):
+            continue
+        if isinstance(value, (dict, list)):
+            # The top-level container ("properties", "formfields", "sections") adds no context
+            lines.extend(_table_lines(value, []))
+        else:
+            lines.append(f"{key}: {_cell(value)}")
+    return "\n".join(line.rstrip() for line in lines)
+
+
+def compile_form_context(form_data, fmt=None):
+    """
+    Builds the compact form context string for the LLM from a form definition.
+
+    Unlike get_form_context, every field in the definition is kept (including
+    fields under "formfields" and nested "sections") along with its options and
+    other attributes, and titles and descriptions keep their case.
+
+    Args:
+        form_data: Either a file path (str) or a dictionary containing the form definition
+        fmt: One of FORM_CONTEXT_FORMATS, FORM_CONTEXT_FORMAT by default
+    """
+    fmt = fmt or FORM_CONTEXT_FORMAT
+    if fmt not in FORM_CONTEXT_FORMATS:
+        raise ValueError(f"Unknown form context format {fmt!r}, expected one of {FORM_CONTEXT_FORMATS}")
+    data = load_form_definition(form_data)
+    if fmt == "json":
+        return _minified(data)
+    return _compile_table(data)
+
+
+def _definition_and_hash(form_data):
+    if not isinstance(form_data, str):
+        data = load_form_definition(form_data)
+        return data, form_definition_hash(data)
+    # Re-read a definition file only when it changed on disk
+    stat = os.stat(form_data)
+    with _cache_lock:
+        cached = _definition_files.get(form_data)
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2], cached[3]
+    data = load_form_definition(form_data)
+    digest = form_definition_hash(data)
+    with _cache_lock:
+        _definition_files[form_data] = (stat.st_mtime_ns, stat.st_size, data, digest)
+    return data, digest
+
+
+def get_compiled_form_context(form_data, fmt=None):
+    """
+    Returns the compiled form context for a definition, building it only the first
+    time a definition with that content is seen.
+
+    Compiled contexts are cached by the definition's content hash and format, so
+    a definition fetched again (from disk or blob storage) reuses its compiled
+    string, and an edited definition gets a new one.
+
+    Args:
+        form_data: Either a file path (str) or a dictionary containing the form definition
+        fmt: One of FORM_CONTEXT_FORMATS, FORM_CONTEXT_FORMAT by default
+    """
+    fmt = fmt or FORM_CONTEXT_FORMAT
+    data, digest = _definition_and_hash(form_data)
+    key = (digest, fmt)
+    with _cache_lock:
+        compiled = _compiled_contexts.get(key)
+    if compiled is None:
+        compiled = compile_form_context(data, fmt)
+        with _cache_lock:
+            _compiled_contexts[key] = compiled
+    return compiled
+
+
+def precompile_form_contexts(directory, fmt=None):
+    """
+    Compiles the context of every form definition (*.json) in a directory, so
+    requests find them already built.
+
+    Returns a dictionary of definition file name to content hash.
+    """
+    compiled = {}
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".json"):
+            continue
+        data, digest = _definition_and_hash(os.path.join(directory, name))
+        get_compiled_form_context(data, fmt)
+        compiled[name] = digest
+    return compiled
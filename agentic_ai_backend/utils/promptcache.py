@@ -0,0 +1,71 @@
+import threading
+
+# Azure OpenAI caches prompt prefixes of 1024 tokens or more, so a prompt only
+# gets cache hits when its first 1024+ tokens are byte-identical to an earlier
+# request's. Usage reports the cached part as prompt_tokens_details.cached_tokens.
+
+
+def completion_cache_usage(usage):
+    """
+    Returns (prompt_tokens, cached_tokens) from an OpenAI chat completion's usage.
+    """
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    if not isinstance(prompt_tokens, int):
+        return 0, 0
+    cached_tokens = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None)
+    return prompt_tokens, cached_tokens if isinstance(cached_tokens, int) else 0
+
+
+def agent_cache_usage(usage_details):
+    """
+    Returns (prompt_tokens, cached_tokens) from an agent framework response's
+    usage_details, summed over every model call the run made.
+    """
+    if not isinstance(usage_details, dict):
+        return 0, 0
+    return usage_details.get("input_token_count") or 0, usage_details.get("prompt/cached_tokens") or 0
+
+
+class PromptCacheStats:
+    """
+    Running prompt cache totals for one caller: prompt tokens, how many of them
+    were served from the prompt cache, and latency with and without a cache hit.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hits = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.hit_seconds = 0.0
+        self.miss_seconds = 0.0
+
+    def record(self, prompt_tokens, cached_tokens, seconds):
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.cached_tokens += cached_tokens
+            if cached_tokens:
+                self.hits += 1
+                self.hit_seconds += seconds
+            else:
+                self.miss_seconds += seconds
+        print(
+            f"{self.name} prompt cache: prompt_tokens={prompt_tokens} cached_tokens={cached_tokens} "
+            f"latency={seconds:.2f}s"
+        )
+
+    def summary(self):
+        with self._lock:
+            misses = self.requests - self.hits
+            return {
+                "requests": self.requests,
+                "cache_hits": self.hits,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "cached_token_rate": round(self.cached_tokens / self.prompt_tokens, 3) if self.prompt_tokens else 0.0,
+                "mean_latency_hit_s": round(self.hit_seconds / self.hits, 3) if self.hits else None,
+                "mean_latency_miss_s": round(self.miss_seconds / misses, 3) if misses else None,
+            }
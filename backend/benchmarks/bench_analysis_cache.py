@@ -0,0 +1,115 @@
+"""
+Benchmark for the Document Intelligence result cache.
+
+Analyzes a corpus against the local fake service in fake_document_intelligence.py,
+where `--duplicates` of the documents are byte-identical copies stored under other
+names (re-uploads, renamed files). Each document goes through the same
+cache-then-analyze path as process_document_with_intelligence.
+
+Runs:
+- no cache: every document is submitted to Document Intelligence
+- cold: an empty disk cache; copies of documents analyzed earlier in the run hit
+- warm: the same corpus again, e.g. a re-index after the manifest was lost
+- evicting: a cold run with the cache capped at half the size of the corpus's
+  entries, so older entries are evicted as the run goes
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_analysis_cache --docs 60 --duplicates 0.25
+"""
+import argparse
+import logging
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from azure.core.credentials import AzureKeyCredential
+
+from backend.benchmarks.fake_document_intelligence import FakeDocumentIntelligence
+from backend.search_indexer.analysis_cache import AnalysisCache, DiskCacheBackend
+from backend.search_indexer.analyzer import CONTENT_FORMAT, DocumentAnalyzer
+from backend.search_indexer.manifest import content_hash
+
+
+def build_analyzer(server):
+    def build_client(**kwargs):
+        from azure.ai.documentintelligence.aio import DocumentIntelligenceClient
+
+        return DocumentIntelligenceClient(server.endpoint, AzureKeyCredential("fake"), **kwargs)
+
+    return DocumentAnalyzer(build_client, max_in_flight=8)
+
+
+def run(analyzer, cache, documents, workers):
+    def process(data):
+        digest = content_hash(data)
+        cached = cache.get(digest) if cache else None
+        if cached is not None:
+            return cached["content"]
+        result = analyzer.analyze(data)
+        if cache:
+            cache.put(digest, result.content, result.pages, result.seconds)
+        return result.content
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        results = list(pool.map(process, documents))
+    assert all(results)
+    return time.perf_counter() - started
+
+
+def main(args):
+    logging.disable(logging.WARNING)
+    rng = random.Random(0)
+    originals = [
+        bytes(rng.getrandbits(8) for _ in range(256)) * (args.doc_kb * 4) for _ in range(args.docs)
+    ]
+    copies = [rng.choice(originals) for _ in range(int(args.docs * args.duplicates))]
+    documents = originals + copies
+    rng.shuffle(documents)
+    cache_dir = tempfile.mkdtemp(prefix="di-cache-")
+
+    with FakeDocumentIntelligence(capacity=args.capacity, base_seconds=args.seconds) as server:
+        analyzer = build_analyzer(server)
+        print(
+            f"docs={len(documents)} ({len(copies)} duplicates) doc_kb={args.doc_kb} "
+            f"seconds/analysis={args.seconds} price=${args.price}/1000 pages"
+        )
+        print(
+            f"{'run':<12}{'wall_s':>8}{'submitted':>11}{'hits':>6}{'hit_rate':>10}"
+            f"{'pages_saved':>13}{'cost_saved':>12}{'evictions':>11}"
+        )
+        try:
+            for name in ("no cache", "cold", "warm", "evicting"):
+                backend = None
+                if name == "evicting":
+                    max_bytes = DiskCacheBackend(cache_dir, 0)._scan_total() // 2
+                    shutil.rmtree(cache_dir, ignore_errors=True)
+                    backend = DiskCacheBackend(cache_dir, max_bytes)
+                elif name != "no cache":
+                    backend = DiskCacheBackend(cache_dir, 1 << 30)
+                server.reset()
+                cache = backend and AnalysisCache(backend, analyzer.model_id, CONTENT_FORMAT, args.price)
+                elapsed = run(analyzer, cache, documents, args.workers)
+                stats = cache.report(cache.snapshot()) if cache else {}
+                print(
+                    f"{name:<12}{elapsed:>8.2f}{server.counts['submitted']:>11}{stats.get('hits', '-'):>6}"
+                    f"{stats.get('hit_rate', '-'):>10}{stats.get('pages_saved', '-'):>13}"
+                    f"{stats.get('cost_saved', '-'):>12}{stats.get('evictions', '-'):>11}"
+                )
+        finally:
+            analyzer.close()
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=60)
+    parser.add_argument("--duplicates", type=float, default=0.25, help="extra copies, as a fraction of --docs")
+    parser.add_argument("--doc-kb", type=int, default=128)
+    parser.add_argument("--capacity", type=int, default=8, help="analyses the fake service runs in parallel")
+    parser.add_argument("--seconds", type=float, default=1.0, help="fake analysis time per document")
+    parser.add_argument("--workers", type=int, default=8, help="pipeline analyze threads")
+    parser.add_argument("--price", type=float, default=1.5, help="price per 1000 pages")
+    main(parser.parse_args())
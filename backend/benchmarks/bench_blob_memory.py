@@ -0,0 +1,126 @@
+"""
+Peak memory benchmark for downloading and analyzing large documents.
+
+Each mode runs in a fresh process so its peak RSS is its own, against the local
+fake Document Intelligence service (fake_document_intelligence.py), which runs
+in another process. Blobs are generated chunk by chunk, as the storage SDK
+streams them.
+
+Compared:
+- readall: the previous path, download_blob().readall() into bytes, then sent to
+  Document Intelligence base64-encoded in a JSON body
+- spooled: download_spooled() into a spooled temporary file under a memory
+  budget, then streamed to Document Intelligence as the raw request body
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_blob_memory --docs 16 --doc-mb 32
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MB = 1024 * 1024
+CHUNK = 4 * MB
+
+
+class FakeDownloader:
+    def __init__(self, size):
+        self.size = size
+
+    def chunks(self):
+        block = os.urandom(CHUNK)
+        for offset in range(0, self.size, CHUNK):
+            yield block[:min(CHUNK, self.size - offset)]
+
+    def readall(self):
+        return b"".join(self.chunks())
+
+
+class FakeBlobClient:
+    def __init__(self, blob_name, size):
+        self.blob_name = blob_name
+        self.size = size
+
+    def download_blob(self):
+        return FakeDownloader(self.size)
+
+
+def serve(ready, capacity, seconds):
+    from backend.benchmarks.fake_document_intelligence import FakeDocumentIntelligence
+
+    server = FakeDocumentIntelligence(capacity=capacity, base_seconds=seconds, submit_rps=0, poll_rps=0)
+    ready.put(server.endpoint)
+    server.serve_forever()
+
+
+def run_mode(mode, endpoint, args):
+    from azure.core.credentials import AzureKeyCredential
+
+    from backend.search_indexer.analyzer import DocumentAnalyzer
+    from backend.search_indexer.memory import MemoryBudget, RssSampler, download_spooled
+
+    logging.disable(logging.WARNING)
+
+    def build_client(**kwargs):
+        from azure.ai.documentintelligence.aio import DocumentIntelligenceClient
+
+        return DocumentIntelligenceClient(endpoint, AzureKeyCredential("fake"), **kwargs)
+
+    analyzer = DocumentAnalyzer(build_client, max_in_flight=args.workers, submit_rate=0, poll_rate=0)
+    budget = MemoryBudget(args.memory_limit_mb * MB)
+    sizes = [args.doc_mb * MB] * args.docs
+
+    def process(index):
+        client = FakeBlobClient(f"doc-{index}.pdf", sizes[index])
+        if mode == "readall":
+            data = client.download_blob().readall()
+            return analyzer.analyze(data).pages
+        with download_spooled(client, args.spool_mb * MB, budget) as blob:
+            return analyzer.analyze(blob.stream()).pages
+
+    with RssSampler() as rss:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(args.workers) as pool:
+            pages = sum(pool.map(process, range(args.docs)))
+        elapsed = time.perf_counter() - started
+    analyzer.close()
+    return {"mode": mode, "wall_s": elapsed, "pages": pages, **rss.as_dict(), **budget.as_dict()}
+
+
+def main(args):
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    server = context.Process(target=serve, args=(ready, args.workers, args.seconds), daemon=True)
+    server.start()
+    endpoint = ready.get()
+    print(
+        f"docs={args.docs} x {args.doc_mb} MB, {args.workers} workers, "
+        f"spool {args.spool_mb} MB, memory limit {args.memory_limit_mb} MB"
+    )
+    print(f"{'mode':<10}{'wall_s':>8}{'pages':>7}{'start_rss_mb':>14}{'peak_rss_mb':>13}{'budget_peak_mb':>16}")
+    try:
+        for mode in ("readall", "spooled"):
+            # A fresh process per mode, so the peak RSS is not carried over
+            with context.Pool(1) as pool:
+                result = pool.apply(run_mode, (mode, endpoint, args))
+            budget_peak = result["peak_reserved_mb"] if mode == "spooled" else "-"
+            print(
+                f"{mode:<10}{result['wall_s']:>8.2f}{result['pages']:>7}{result['start_rss_mb']:>14}"
+                f"{result['process_peak_rss_mb']:>13}{budget_peak:>16}"
+            )
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=16)
+    parser.add_argument("--doc-mb", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=8, help="concurrent downloads and analyses")
+    parser.add_argument("--spool-mb", type=int, default=16)
+    parser.add_argument("--memory-limit-mb", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=0.5, help="fake analysis time per document")
+    main(parser.parse_args())
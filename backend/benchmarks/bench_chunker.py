@@ -0,0 +1,193 @@
+"""
+Benchmark for splitting analyzed documents into search chunks.
+
+Chunks a corpus of Document Intelligence style markdown (headings, paragraphs,
+HTML tables, page header/footer/number comments and page breaks). By default the
+corpus is synthetic and every paragraph sentence and table row is a "fact"
+with a query; `--cache-dir` chunks the real markdown in a disk analysis cache
+(INDEXER_DI_CACHE_PATH) instead, without the retrieval measures.
+
+Compared:
+- RecursiveCharacterTextSplitter(512 characters, 50 overlap), the previous splitter
+- MarkdownChunker with the default token limits
+
+Reported per splitter:
+- chunks, mean tokens per chunk, and the tokens embedded (overlap included)
+- index size: chunks x a 3072-dimension float32 vector, plus the chunk text
+- throughput in MB of markdown per second
+- tables kept whole in a single chunk
+- hit@k and MRR for the fact queries, ranked with BM25 over the chunks; a chunk
+  counts as a hit only if it holds the whole sentence, or the table row with
+  its header row (a row without its header does not say what the values are)
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_chunker --docs 40 --k 3
+"""
+import argparse
+import glob
+import gzip
+import json
+import math
+import os
+import random
+import re
+import time
+from collections import Counter
+
+from backend.search_indexer.chunker import TABLE, MarkdownChunker, count_tokens_batch, parse_blocks
+
+DIMENSIONS = 3072
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "ta", "vo", "si", "pe", "da", "go", "fu", "ri", "an", "el", "on"]
+_WORD = re.compile(r"\w+")
+
+
+def word(rng, syllables=3):
+    return "".join(rng.choice(SYLLABLES) for _ in range(syllables))
+
+
+def synthetic_document(rng, index):
+    """Markdown in the shape Document Intelligence returns, and its (query, evidence) facts."""
+    lines, facts = [f"# {word(rng).title()} Application Guide {index}", ""], []
+    for page in range(rng.randint(3, 6)):
+        if page:
+            lines += ["<!-- PageBreak -->", ""]
+        lines += [f"<!-- PageHeader=\"Guide {index}\" -->", ""]
+        for _ in range(rng.randint(1, 3)):
+            lines += [f"## {word(rng).title()} {word(rng).title()}", ""]
+            for _ in range(rng.randint(1, 4)):
+                sentences = []
+                for _ in range(rng.randint(2, 8)):
+                    term, subject, value = word(rng), word(rng), word(rng, 2)
+                    sentence = f"The {term} of the {subject} is {value}."
+                    sentences.append(sentence)
+                    facts.append((f"{term} {subject}", [sentence]))
+                lines += [" ".join(sentences), ""]
+            if rng.random() < 0.5:
+                columns = [word(rng).title() for _ in range(3)]
+                header = "<tr>" + "".join(f"<th>{c}</th>" for c in columns) + "</tr>"
+                rows = []
+                for _ in range(rng.randint(3, 30)):
+                    label = word(rng)
+                    rows.append(f"<tr><td>{label}</td>" + "".join(
+                        f"<td>{rng.randint(1, 999)}.{rng.randint(0, 99):02d}</td>" for _ in columns[1:]
+                    ) + "</tr>")
+                    facts.append((f"{label} {columns[1]}", [header, rows[-1]]))
+                lines += ["<table>", header, *rows, "</table>", ""]
+        lines += [f"<!-- PageNumber=\"{page + 1}\" -->", ""]
+    return "\n".join(lines), facts
+
+
+def load_cache(directory):
+    documents = []
+    for path in glob.glob(os.path.join(directory, "**", "*.json.gz"), recursive=True):
+        with open(path, "rb") as f:
+            documents.append(json.loads(gzip.decompress(f.read()))["content"])
+    return documents
+
+
+class BM25:
+    def __init__(self, texts, k1=1.2, b=0.75):
+        self.docs = [Counter(_WORD.findall(text.lower())) for text in texts]
+        self.lengths = [sum(doc.values()) for doc in self.docs]
+        self.average = sum(self.lengths) / max(1, len(self.docs))
+        frequency = Counter(term for doc in self.docs for term in doc)
+        n = len(self.docs)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in frequency.items()}
+        self.k1, self.b = k1, b
+
+    def rank(self, query, k):
+        terms = _WORD.findall(query.lower())
+        scores = []
+        for i, doc in enumerate(self.docs):
+            score = 0.0
+            for term in terms:
+                tf = doc.get(term)
+                if tf:
+                    norm = self.k1 * (1 - self.b + self.b * self.lengths[i] / self.average)
+                    score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            if score:
+                scores.append((score, i))
+        return [i for _, i in sorted(scores, reverse=True)[:k]]
+
+
+def retrieval(chunks, facts, k):
+    index = BM25(chunks)
+    hits, reciprocal = 0, 0.0
+    for query, evidence in facts:
+        for rank, i in enumerate(index.rank(query, k), 1):
+            if all(part in chunks[i] for part in evidence):
+                hits += 1
+                reciprocal += 1 / rank
+                break
+    return hits / len(facts), reciprocal / len(facts)
+
+
+def measure(name, split, documents, facts, k):
+    started = time.perf_counter()
+    per_document = [split(text) for text in documents]
+    elapsed = time.perf_counter() - started
+    chunks = [chunk for document in per_document for chunk in document]
+    tokens = sum(count_tokens_batch(chunks))
+    tables = intact = 0
+    for text, document_chunks in zip(documents, per_document):
+        for block in parse_blocks(text):
+            if block.kind == TABLE:
+                tables += 1
+                intact += any(block.text in chunk for chunk in document_chunks)
+    result = {
+        "splitter": name,
+        "chunks": len(chunks),
+        "mean_tokens": tokens / max(1, len(chunks)),
+        "tokens": tokens,
+        "index_mb": (len(chunks) * DIMENSIONS * 4 + sum(len(c.encode("utf-8")) for c in chunks)) / 2**20,
+        "mb_per_s": sum(len(text) for text in documents) / 2**20 / elapsed,
+        "tables_intact": f"{intact}/{tables}",
+    }
+    if facts:
+        result["hit_at_k"], result["mrr"] = retrieval(chunks, facts, k)
+    return result
+
+
+def main(args):
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    if args.cache_dir:
+        documents, facts = load_cache(args.cache_dir), []
+        if not documents:
+            raise SystemExit(f"No analysis cache entries under {args.cache_dir}")
+    else:
+        rng = random.Random(0)
+        documents, facts = [], []
+        for index in range(args.docs):
+            text, document_facts = synthetic_document(rng, index)
+            documents.append(text)
+            facts += document_facts
+        facts = rng.sample(facts, min(args.queries, len(facts)))
+
+    characters = RecursiveCharacterTextSplitter(chunk_size=512, chunk_overlap=50)
+    chunker = MarkdownChunker()
+    splitters = [
+        ("recursive-512-chars", characters.split_text),
+        ("markdown-512-tokens", lambda text: [chunk.text for chunk in chunker.split_text(text)]),
+    ]
+    print(f"docs={len(documents)} MB={sum(map(len, documents)) / 2**20:.2f} queries={len(facts)} k={args.k}")
+    print(
+        f"{'splitter':<22}{'chunks':>8}{'mean_tok':>10}{'tokens':>9}{'index_mb':>10}"
+        f"{'mb_per_s':>10}{'tables':>9}{'hit@k':>8}{'mrr':>7}"
+    )
+    for name, split in splitters:
+        r = measure(name, split, documents, facts, args.k)
+        quality = f"{r['hit_at_k']:>8.3f}{r['mrr']:>7.3f}" if facts else f"{'-':>8}{'-':>7}"
+        print(
+            f"{name:<22}{r['chunks']:>8}{r['mean_tokens']:>10.0f}{r['tokens']:>9}{r['index_mb']:>10.2f}"
+            f"{r['mb_per_s']:>10.2f}{r['tables_intact']:>9}{quality}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=40)
+    parser.add_argument("--queries", type=int, default=500, help="fact queries sampled from the corpus")
+    parser.add_argument("--k", type=int, default=3, help="chunks retrieved per query")
+    parser.add_argument("--cache-dir", help="chunk the markdown in this disk analysis cache instead")
+    main(parser.parse_args())
@@ -0,0 +1,93 @@
+"""
+Benchmark for the web crawler against the local fixture site (fake_website.py).
+
+Runs:
+- webbaseloader: the previous path, WebBaseLoader fetching a fixed list of URLs
+  (here every page of the site) one after another, with no conditional GET
+  and no duplicate detection
+- crawl cold: AsyncCrawler from the first page, discovering the rest by links
+- crawl warm: the same crawl with the validators recorded by the cold one,
+  after `--edited` of the pages changed, as a scheduled re-index would run
+
+Reported per run: wall time, requests and body bytes served, pages fetched
+(to be chunked), 304s, near-duplicates skipped, and the peak number of
+requests the site saw in flight at once.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_crawler --pages 100 --latency 0.1
+"""
+import argparse
+import logging
+import random
+import time
+
+from backend.benchmarks.fake_website import FakeWebsite
+from backend.search_indexer.crawler import DUPLICATE, FETCHED, AsyncCrawler
+
+
+def crawl(site, args, known=None):
+    crawler = AsyncCrawler(
+        [site.url("/page/0")],
+        max_pages=args.pages * 2,
+        max_depth=args.pages,
+        concurrency=args.concurrency,
+        host_rate=args.host_rps,
+        host_concurrency=args.host_concurrency,
+        known=known,
+    )
+    pages = list(crawler.iter_pages())
+    fetched = sum(page.status == FETCHED for page in pages)
+    duplicates = sum(page.status == DUPLICATE for page in pages)
+    known = {page.url: page.validators() for page in pages if page.status != DUPLICATE}
+    return fetched, duplicates, known
+
+
+def main(args):
+    from langchain_community.document_loaders import WebBaseLoader
+
+    logging.disable(logging.WARNING)
+    with FakeWebsite(pages=args.pages, latency=args.latency) as site:
+        print(
+            f"pages={args.pages} latency={args.latency}s host_rps={args.host_rps} "
+            f"host_concurrency={args.host_concurrency} edited={args.edited}"
+        )
+        print(
+            f"{'run':<15}{'wall_s':>8}{'requests':>10}{'kb_sent':>9}{'fetched':>9}"
+            f"{'304s':>6}{'duplicates':>12}{'peak_in_flight':>16}"
+        )
+
+        def report(name, started, fetched, duplicates):
+            counts = site.counts
+            print(
+                f"{name:<15}{time.perf_counter() - started:>8.2f}{counts['requests']:>10}"
+                f"{counts['bytes'] / 1024:>9.0f}{fetched:>9}{counts['not_modified']:>6}{duplicates:>12}"
+                f"{counts['peak_in_flight']:>16}"
+            )
+
+        site.reset()
+        started = time.perf_counter()
+        documents = WebBaseLoader([site.url(f"/page/{n}") for n in range(args.pages)]).load()
+        report("webbaseloader", started, len(documents), "-")
+
+        site.reset()
+        started = time.perf_counter()
+        fetched, duplicates, known = crawl(site, args)
+        report("crawl cold", started, fetched, duplicates)
+
+        for n in random.Random(0).sample(range(args.pages), int(args.pages * args.edited)):
+            site.edit(n)
+        site.reset()
+        started = time.perf_counter()
+        fetched, duplicates, _ = crawl(site, args, known)
+        report("crawl warm", started, fetched, duplicates)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds the site takes per request")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--host-rps", type=float, default=20, help="requests per second per host")
+    parser.add_argument("--host-concurrency", type=int, default=4, help="requests in flight per host")
+    parser.add_argument("--edited", type=float, default=0.1, help="fraction of pages changed before the warm crawl")
+    main(parser.parse_args())
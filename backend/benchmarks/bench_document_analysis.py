@@ -0,0 +1,96 @@
+"""
+Throughput benchmark for Document Intelligence analysis.
+
+Runs against the local fake service in fake_document_intelligence.py, which
+processes `--capacity` analyses in parallel and rate-limits submissions and
+polls like the real one.
+
+Compared:
+- sync: the previous path, one blocking begin_analyze_document(...).result()
+  per pipeline thread (1 thread = serial; 2 = the former INDEXER_ANALYZE_WORKERS)
+- async: DocumentAnalyzer with N analyses in flight, pollers multiplexed on one
+  event loop
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_document_analysis --docs 48 --seconds 1.0
+"""
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from azure.core.credentials import AzureKeyCredential
+
+from backend.benchmarks.fake_document_intelligence import FakeDocumentIntelligence
+from backend.search_indexer.analyzer import DocumentAnalyzer
+
+
+def sync_analyze(server):
+    from azure.ai.documentintelligence import DocumentIntelligenceClient
+    from azure.ai.documentintelligence.models import AnalyzeDocumentRequest, DocumentContentFormat
+
+    client = DocumentIntelligenceClient(server.endpoint, AzureKeyCredential("fake"))
+
+    def analyze(data):
+        poller = client.begin_analyze_document(
+            "prebuilt-read",
+            AnalyzeDocumentRequest(bytes_source=data),
+            output_content_format=DocumentContentFormat.MARKDOWN,
+        )
+        return poller.result().content
+
+    return analyze
+
+
+def async_analyzer(server, max_in_flight):
+    def build_client(**kwargs):
+        from azure.ai.documentintelligence.aio import DocumentIntelligenceClient
+
+        return DocumentIntelligenceClient(server.endpoint, AzureKeyCredential("fake"), **kwargs)
+
+    return DocumentAnalyzer(build_client, max_in_flight=max_in_flight, submit_rate=15, poll_rate=50)
+
+
+def run(analyze, documents, threads):
+    with ThreadPoolExecutor(threads) as pool:
+        started = time.perf_counter()
+        results = list(pool.map(analyze, documents))
+    assert all(results)
+    return time.perf_counter() - started
+
+
+def main(args):
+    logging.disable(logging.WARNING)
+    documents = [f"document {i} ".encode() * (args.doc_kb * 100) for i in range(args.docs)]
+    with FakeDocumentIntelligence(capacity=args.capacity, base_seconds=args.seconds) as server:
+        print(f"docs={args.docs} service capacity={args.capacity} seconds/analysis={args.seconds}")
+        print(f"{'mode':<22}{'wall_s':>8}{'docs/s':>8}{'peak_running':>14}{'polls':>7}{'429':>6}")
+
+        def report(name, elapsed):
+            counts = server.counts
+            print(
+                f"{name:<22}{elapsed:>8.2f}{args.docs / elapsed:>8.2f}"
+                f"{counts['peak_running']:>14}{counts['polls']:>7}{counts['throttled']:>6}"
+            )
+
+        for threads in (1, 2):
+            server.reset()
+            elapsed = run(sync_analyze(server), documents, threads)
+            report(f"sync x{threads}", elapsed)
+
+        for in_flight in (2, 4, 8, 16):
+            server.reset()
+            analyzer = async_analyzer(server, in_flight)
+            # Pipeline threads only wait; submitting and polling happen on the analyzer's loop
+            elapsed = run(analyzer.analyze, documents, in_flight)
+            report(f"async in_flight={in_flight}", elapsed)
+            analyzer.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=48)
+    parser.add_argument("--doc-kb", type=int, default=64)
+    parser.add_argument("--capacity", type=int, default=16, help="analyses the fake service runs in parallel")
+    parser.add_argument("--seconds", type=float, default=1.0, help="fake analysis time per document")
+    main(parser.parse_args())
@@ -0,0 +1,104 @@
+"""
+Benchmark for the search indexer's embedding cache.
+
+Embeds a synthetic corpus the way AzureSearch.add_texts does during indexing
+(one embedding request per upload batch) with a fake embedding model that
+sleeps per call and per text. Every document shares a header and footer, as the
+BC government PDFs do, and the corpus is indexed twice to model a re-index.
+
+Compared:
+- per-chunk embed_query, the previous wiring of get_vector_store
+- embed_documents per upload batch, without the cache
+- CachedEmbeddings on a cold cache, then on the warm cache for the re-index
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_embedding_cache --docs 200 --chunks-per-doc 12
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from langchain_core.embeddings import Embeddings
+
+from backend.search_indexer.embedding_cache import CachedEmbeddings, SQLiteEmbeddingStore
+
+DIMENSIONS = 3072
+
+
+class FakeEmbeddings(Embeddings):
+    def __init__(self, call_latency, text_latency):
+        self.call_latency = call_latency
+        self.text_latency = text_latency
+        self.calls = 0
+        self.texts = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        self.texts += len(texts)
+        time.sleep(self.call_latency + self.text_latency * len(texts))
+        return [[float(len(text) % 7)] * DIMENSIONS for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def corpus(docs, chunks_per_doc):
+    header = "Province of British Columbia | Ministry of Water, Land and Resource Stewardship"
+    footer = "This information is provided for general guidance only.  Page footer."
+    chunks = []
+    for d in range(docs):
+        chunks.append(header)
+        chunks.extend(f"Document {d} section {c}: water licence details" for c in range(chunks_per_doc - 2))
+        # Same footer with different whitespace still hits after normalization
+        chunks.append(footer if d % 2 else footer.replace("  ", " \n"))
+    return chunks
+
+
+def index(embed_batch, chunks, batch_size):
+    for i in range(0, len(chunks), batch_size):
+        embed_batch(chunks[i:i + batch_size])
+
+
+def main(args):
+    chunks = corpus(args.docs, args.chunks_per_doc)
+    latencies = (args.call_latency, args.text_latency)
+    print(f"chunks={len(chunks)} upload_batch={args.upload_batch} latency call/text={latencies}")
+    print(f"{'strategy':<28}{'calls':>8}{'texts':>8}{'wall_s':>8}{'hit_rate':>10}{'calls_saved':>13}")
+
+    def report(name, model, elapsed, stats=None):
+        hit_rate = f"{stats['hit_rate']:.2f}" if stats else "-"
+        saved = stats["embedding_calls_saved"] if stats else "-"
+        print(f"{name:<28}{model.calls:>8}{model.texts:>8}{elapsed:>8.2f}{hit_rate:>10}{saved:>13}")
+
+    model = FakeEmbeddings(*latencies)
+    started = time.perf_counter()
+    index(lambda batch: [model.embed_query(text) for text in batch], chunks, args.upload_batch)
+    report("embed_query per chunk", model, time.perf_counter() - started)
+
+    model = FakeEmbeddings(*latencies)
+    started = time.perf_counter()
+    index(model.embed_documents, chunks, args.upload_batch)
+    report("embed_documents, no cache", model, time.perf_counter() - started)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteEmbeddingStore(os.path.join(tmp, "embedding_cache.sqlite"))
+        for run in ("cold", "warm (re-index)"):
+            model = FakeEmbeddings(*latencies)
+            cached = CachedEmbeddings(model, store, model="fake", batch_size=args.upload_batch)
+            started = time.perf_counter()
+            index(cached.embed_documents, chunks, args.upload_batch)
+            report(f"cached, {run}", model, time.perf_counter() - started, cached.stats.as_dict())
+        size_mb = os.path.getsize(store.path) / 2**20
+        print(f"\ncache: {len(store)} vectors, {size_mb:.1f} MB")
+        store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--chunks-per-doc", type=int, default=12)
+    parser.add_argument("--upload-batch", type=int, default=10, help="INDEXER_UPLOAD_BATCH_SIZE")
+    parser.add_argument("--call-latency", type=float, default=0.02, help="seconds per embedding request")
+    parser.add_argument("--text-latency", type=float, default=0.001, help="seconds per embedded text")
+    main(parser.parse_args())
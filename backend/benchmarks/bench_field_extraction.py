@@ -0,0 +1,110 @@
+"""
+Wall-clock benchmark for the process_field_input extraction modes.
+
+Replaces the LLM executors with fakes that sleep for a configurable latency, so the
+numbers reflect how each mode schedules calls rather than model speed.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_field_extraction --fields 20 --latency 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+# The graph module builds LLM clients lazily, but still reads these at import time
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://benchmark.invalid")
+os.environ.setdefault("AZURE_OPENAI_DEPLOYMENT_NAME", "benchmark")
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "benchmark")
+
+from backend.formfiller import graph  # noqa: E402
+
+
+class FakeFieldExecutor:
+    """Stands in for process_field_executor: answers every field after `latency` seconds."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def ainvoke(self, inputs):
+        await asyncio.sleep(self.latency)
+        return {"text": json.dumps({
+            "current_field_details": {"data_id": inputs["data_id"], "fieldValue": "yes"},
+            "success": True,
+        })}
+
+
+class FakeBatchExecutor:
+    """Stands in for batch_field_executor: answers all fields after `latency` seconds."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def ainvoke(self, inputs):
+        await asyncio.sleep(self.latency)
+        fields = json.loads(inputs["fields"])
+        return {"text": json.dumps({
+            "fields": [{"data_id": f["data_id"], "fieldValue": "yes", "success": True} for f in fields],
+            "message": "",
+        })}
+
+
+def make_fields(count: int, dependency_every: int = 0):
+    fields = []
+    for i in range(count):
+        field = {
+            "data_id": f"field-{i}",
+            "fieldLabel": f"Question {i}",
+            "fieldType": "radio",
+            "fieldValue": "",
+            "is_required": True,
+            "options": [{"key": "yes", "value": "Yes"}, {"key": "no", "value": "No"}],
+        }
+        if dependency_every and i and i % dependency_every == 0:
+            field["depends_on"] = [f"field-{i - 1}"]
+        fields.append(field)
+    return fields
+
+
+async def run_mode(mode: str, fields, concurrency: int = 1):
+    graph.FIELD_MODE = mode
+    graph.FIELD_CONCURRENCY = concurrency
+    state = {
+        "user_message": "yes to everything",
+        "missing_fields": fields,
+        "filled_fields": [],
+        "metrics": graph._new_metrics(),
+    }
+    started = time.perf_counter()
+    result = await graph.process_field_input(state)
+    elapsed = time.perf_counter() - started
+    assert result["status"] == "completed", result["status"]
+    metrics = result["metrics"]
+    return elapsed, metrics["llm_calls"], metrics["llm_latency_ms"] / 1000, metrics["llm_latency_ms_total"] / 1000
+
+
+async def main(field_count: int, latency: float, dependency_every: int):
+    graph.process_field_executor = FakeFieldExecutor(latency)
+    graph.batch_field_executor = FakeBatchExecutor(latency)
+    fields = make_fields(field_count, dependency_every)
+
+    rows = [("sequential", 1, *await run_mode("sequential", fields))]
+    for concurrency in (1, 2, 5, 10, 20):
+        rows.append(("concurrent", concurrency, *await run_mode("concurrent", fields, concurrency)))
+    rows.append(("batch", 1, *await run_mode("batch", fields)))
+
+    print(f"fields={field_count} latency={latency}s dependency_every={dependency_every or '-'}")
+    print(f"{'mode':<12}{'concurrency':>12}{'llm_calls':>11}{'wall_s':>9}{'llm_s':>8}{'llm_total_s':>13}")
+    for mode, concurrency, elapsed, calls, llm, llm_total in rows:
+        print(f"{mode:<12}{concurrency:>12}{calls:>11}{elapsed:>9.2f}{llm:>8.2f}{llm_total:>13.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fields", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM latency per call in seconds")
+    parser.add_argument("--dependency-every", type=int, default=0,
+                        help="make every Nth field depend on the previous one (0 = independent)")
+    args = parser.parse_args()
+    asyncio.run(main(args.fields, args.latency, args.dependency_every))
@@ -0,0 +1,97 @@
+"""
+Benchmark for merging filled fields into synthetic forms with FormState.
+
+Compares the previous list-scan implementation (a next(...) search over
+filled_fields for every form field, and id sets rebuilt from the lists on every
+step) with the id-indexed FormState used by the graph and API.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_form_state --fields 500 --repeat 50
+"""
+import argparse
+import time
+
+from backend.formfiller.form_state import FormState, is_field_filled
+
+
+def make_form(count: int, filled_every: int = 2):
+    form_fields, filled_fields = [], []
+    for i in range(count):
+        form_fields.append({
+            "data_id": f"field-{i}",
+            "fieldLabel": f"Question {i}",
+            "fieldType": "text",
+            "fieldValue": "",
+            "is_required": True,
+        })
+        if i % filled_every == 0:
+            filled_fields.append({"data_id": f"field-{i}", "fieldValue": f"value {i}"})
+    missing_fields = [f for i, f in enumerate(form_fields) if i % filled_every]
+    return form_fields, filled_fields, missing_fields
+
+
+def list_scan_merge(form_fields, filled_fields):
+    """The former chat_endpoint merge: O(n*m)."""
+    updated = []
+    for field in form_fields:
+        data_id = field.get("data_id") or field.get("field_id")
+        match = next((f for f in filled_fields if (f.get("data_id") or f.get("field_id")) == data_id), None)
+        updated.append({**field, **match} if data_id and match else field)
+    return updated
+
+
+def list_scan_fill(form_fields, filled_fields, missing_fields):
+    """The former per-step bookkeeping: id sets rebuilt from the lists for every filled field."""
+    filled_fields = list(filled_fields)
+    remaining = list(missing_fields)
+    for field in missing_fields:
+        existing_ids = {f.get("data_id") for f in filled_fields if isinstance(f, dict)}
+        filled_data_ids = {f["data_id"] for f in form_fields if is_field_filled(f.get("fieldValue"))}
+        if field["data_id"] not in existing_ids and field["data_id"] not in filled_data_ids:
+            filled_fields.append({**field, "fieldValue": "x"})
+        remaining = [f for f in remaining if f["data_id"] != field["data_id"]]
+    return filled_fields, remaining
+
+
+def form_state_merge(form_fields, filled_fields):
+    return FormState(form_fields, filled_fields).merged_form_fields()
+
+
+def form_state_fill(form_fields, filled_fields, missing_fields):
+    form = FormState(form_fields, filled_fields, missing_fields)
+    for data_id, field in list(form.missing.items()):
+        form.add_filled({**field, "fieldValue": "x"})
+    return form.filled_fields(), form.missing_fields()
+
+
+def timed(fn, repeat, *args):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(*args)
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def main(field_count: int, repeat: int):
+    form_fields, filled_fields, missing_fields = make_form(field_count)
+
+    old_merge_ms, old_merged = timed(list_scan_merge, repeat, form_fields, filled_fields)
+    new_merge_ms, new_merged = timed(form_state_merge, repeat, form_fields, filled_fields)
+    assert old_merged == new_merged
+
+    old_fill_ms, old_filled = timed(list_scan_fill, repeat, form_fields, filled_fields, missing_fields)
+    new_fill_ms, new_filled = timed(form_state_fill, repeat, form_fields, filled_fields, missing_fields)
+    assert [f["data_id"] for f in old_filled[0]] == [f["data_id"] for f in new_filled[0]]
+    assert old_filled[1] == new_filled[1] == []
+
+    print(f"fields={field_count} filled={len(filled_fields)} missing={len(missing_fields)} repeat={repeat}")
+    print(f"{'operation':<10}{'list_scan_ms':>14}{'form_state_ms':>15}{'speedup':>9}")
+    print(f"{'merge':<10}{old_merge_ms:>14.3f}{new_merge_ms:>15.3f}{old_merge_ms / new_merge_ms:>8.1f}x")
+    print(f"{'fill':<10}{old_fill_ms:>14.3f}{new_fill_ms:>15.3f}{old_fill_ms / new_fill_ms:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fields", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    main(args.fields, args.repeat)
@@ -0,0 +1,142 @@
+"""
+Throughput and memory benchmark for the search indexer pipeline.
+
+Runs web_crawler.start_indexing against in-process fakes for Blob Storage,
+Document Intelligence and Azure AI Search. Each fake sleeps for a configurable
+latency, so the numbers show how the stages overlap and scale with workers, not
+how fast the services are. Peak memory is measured with tracemalloc over a
+growing corpus to show that it stays flat.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_indexing_pipeline --blobs 60 --doc-kb 512
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+
+from langchain.schema import Document
+
+from backend.search_indexer import web_crawler
+
+
+class FakeBlob:
+    def __init__(self, name):
+        self.name = name
+        self.etag = f"etag-{name}"
+
+
+class FakeDownload:
+    def __init__(self, size, latency):
+        self.size = size
+        self.latency = latency
+
+    def chunks(self):
+        time.sleep(self.latency)
+        yield b"x" * self.size
+
+    def readall(self):
+        return b"".join(self.chunks())
+
+
+class FakeBlobClient:
+    def __init__(self, name, size, latency):
+        self.blob_name = name
+        self.size = size
+        self.latency = latency
+
+    def download_blob(self):
+        return FakeDownload(self.size, self.latency)
+
+
+class FakeContainer:
+    def __init__(self, blobs, size, latency):
+        self.blobs = blobs
+        self.size = size
+        self.latency = latency
+
+    def list_blobs(self):
+        return (FakeBlob(f"doc-{i}.pdf") for i in range(self.blobs))
+
+    def get_blob_client(self, name):
+        return FakeBlobClient(name, self.size, self.latency)
+
+
+class FakeVectorStore:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def add_documents(self, docs):
+        time.sleep(self.latency)
+
+    def delete(self, ids):
+        time.sleep(self.latency)
+
+
+def install_fakes(blobs, doc_kb, download_latency, analyze_latency, upload_latency):
+    container = FakeContainer(blobs, doc_kb * 1024, download_latency)
+
+    def analyze(blob_name, blob_data):
+        time.sleep(analyze_latency)
+        # About 8 distinct chunks of extracted text per document
+        text = " ".join(f"{blob_name} word {i}" for i in range(600))
+        return Document(page_content=text, metadata={"source": blob_name})
+
+    web_crawler.get_container_client = lambda: container
+    web_crawler.process_document_with_intelligence = analyze
+    web_crawler.get_vector_store = lambda: FakeVectorStore(upload_latency)
+    web_crawler.verify_indexing = lambda **kwargs: {"success": True}
+    web_crawler.INDEXER_WEB_PAGES = []
+
+
+def run(workers, queue_size=8):
+    download, analyze, upload = workers
+    web_crawler.INDEXER_DOWNLOAD_WORKERS = download
+    web_crawler.INDEXER_ANALYZE_WORKERS = analyze
+    web_crawler.INDEXER_UPLOAD_WORKERS = upload
+    web_crawler.INDEXER_QUEUE_SIZE = queue_size
+    # Start from an empty manifest so every run indexes the whole corpus
+    web_crawler.INDEXER_MANIFEST_STORE = "local"
+    web_crawler.INDEXER_MANIFEST_PATH = os.path.join(tempfile.mkdtemp(), "index_manifest.json")
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = web_crawler.start_indexing()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert "error" not in result, result
+    return elapsed, peak, result
+
+
+def main(args):
+    logging.disable(logging.WARNING)
+    latencies = (args.download_latency, args.analyze_latency, args.upload_latency)
+
+    install_fakes(args.blobs, args.doc_kb, *latencies)
+    print(f"blobs={args.blobs} doc_kb={args.doc_kb} latency download/analyze/upload={latencies}")
+    print(f"{'workers d/a/u':<16}{'docs':>6}{'chunks':>8}{'wall_s':>8}{'docs/s':>8}{'peak_mb':>9}")
+    for workers in ((1, 1, 1), (2, 2, 1), (4, 4, 2), (8, 8, 4)):
+        elapsed, peak, result = run(workers)
+        print(
+            f"{'/'.join(map(str, workers)):<16}{result['documents_processed']:>6}{result['chunks_created']:>8}"
+            f"{elapsed:>8.2f}{result['documents_processed'] / elapsed:>8.1f}{peak / 2**20:>9.1f}"
+        )
+
+    print("\nmemory vs corpus size (workers 4/4/2)")
+    print(f"{'blobs':<8}{'wall_s':>8}{'peak_mb':>9}")
+    for blobs in (args.blobs // 2, args.blobs, args.blobs * 2):
+        install_fakes(blobs, args.doc_kb, *latencies)
+        elapsed, peak, _ = run((4, 4, 2))
+        print(f"{blobs:<8}{elapsed:>8.2f}{peak / 2**20:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blobs", type=int, default=60)
+    parser.add_argument("--doc-kb", type=int, default=512, help="size of each fake blob")
+    parser.add_argument("--download-latency", type=float, default=0.05)
+    parser.add_argument("--analyze-latency", type=float, default=0.2)
+    parser.add_argument("--upload-latency", type=float, default=0.05)
+    main(parser.parse_args())
@@ -0,0 +1,97 @@
+"""
+Benchmark for extracting JSON from form-filler LLM outputs.
+
+Runs the previous extractor (greedy DOTALL regex, then json.loads, then
+ast.literal_eval) and the current single-pass parser over the corpus in
+data/llm_outputs.jsonl, plus two generated 500-field analyze outputs. The corpus
+samples follow the formats the prompts request and reproduce the usual
+deviations: code fences, "Final Answer:" prefixes, trailing prose, comments
+copied from the prompt, trailing commas and Python dict syntax.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_output_parsing --repeat 200
+"""
+import argparse
+import ast
+import json
+import re
+import time
+from pathlib import Path
+
+from backend.formfiller.output_parsing import extract_json_from_output
+
+CORPUS_PATH = Path(__file__).parent / "data" / "llm_outputs.jsonl"
+
+
+def legacy_extract_json_from_output(output: str):
+    """The extractor used before the single-pass parser."""
+    output = output.strip().strip("`").strip()
+    if output.startswith("Final Answer:"):
+        output = output.replace("Final Answer:", "", 1).strip()
+    match = re.search(r"({.*})", output, re.DOTALL)
+    if not match:
+        return {"error": "No valid JSON found."}
+    json_str = match.group(1).strip()
+    try:
+        return json.loads(json_str)
+    except json.JSONDecodeError:
+        pass
+    try:
+        return ast.literal_eval(json_str)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def large_cases(field_count: int = 500):
+    def field(i, value=""):
+        return {"data_id": f"field-{i}", "fieldLabel": f"Question {i}", "fieldType": "text",
+                "fieldValue": value, "is_required": True}
+
+    output = json.dumps({
+        "message": "Thanks, most fields are filled.",
+        "formFields": [field(i, f"v{i}") for i in range(field_count)],
+        "filled_fields": [field(i, f"v{i}") for i in range(0, field_count, 2)],
+        "missing_fields": [{**field(i), "validation_message": "Required"} for i in range(1, field_count, 2)],
+    }, indent=2)
+    return [
+        {"name": f"analyze_{field_count}_fields", "expect_parse": True, "output": output},
+        {"name": f"analyze_{field_count}_fields_trailing_prose", "expect_parse": True,
+         "output": output + "\nAll remaining fields {field-1}, {field-3}, ... need answers."},
+    ]
+
+
+def load_corpus():
+    with open(CORPUS_PATH) as f:
+        cases = [json.loads(line) for line in f if line.strip()]
+    return cases + large_cases()
+
+
+def timed(fn, text, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(text)
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def main(repeat: int):
+    totals = {"legacy": [0.0, 0], "current": [0.0, 0]}
+    print(f"{'case':<36}{'bytes':>8}{'legacy_ms':>11}{'ok':>4}{'current_ms':>12}{'ok':>4}")
+    for case in load_corpus():
+        row = [f"{case['name']:<36}{len(case['output']):>8}"]
+        for label, fn in (("legacy", legacy_extract_json_from_output), ("current", extract_json_from_output)):
+            elapsed, result = timed(fn, case["output"], repeat)
+            ok = ("error" not in result) == case["expect_parse"]
+            totals[label][0] += elapsed
+            totals[label][1] += ok
+            row.append(f"{elapsed:>{11 if label == 'legacy' else 12}.3f}{'y' if ok else 'n':>4}")
+        print("".join(row))
+    cases = len(load_corpus())
+    for label, (elapsed, ok) in totals.items():
+        print(f"{label}: {ok}/{cases} correct, {elapsed:.3f} ms total per pass")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    main(args.repeat)
@@ -0,0 +1,108 @@
+"""
+Cold-start benchmark for the backend API.
+
+Imports backend.main in fresh interpreters with `python -X importtime` and reports
+the median import time and the slowest top-level imports. With --lifespan it
+also times the FastAPI lifespan startup (executor warm-up and graph compile),
+which runs before the app accepts requests. --max-ms fails the run when the
+median import time exceeds a budget, so it can be tracked in CI.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_startup --runs 5 --lifespan --max-ms 1500
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+LIFESPAN_SNIPPET = """
+import asyncio, time
+started = time.perf_counter()
+from backend.main import app
+imported = time.perf_counter()
+async def run():
+    async with app.router.lifespan_context(app):
+        pass
+asyncio.run(run())
+print(f"{(imported - started) * 1000:.1f} {(time.perf_counter() - imported) * 1000:.1f}")
+"""
+
+
+def _env():
+    env = dict(os.environ)
+    # Building the LLM client needs these, but nothing is sent over the network
+    env.setdefault("AZURE_OPENAI_ENDPOINT", "https://benchmark.invalid")
+    env.setdefault("AZURE_OPENAI_DEPLOYMENT_NAME", "benchmark")
+    env.setdefault("AZURE_OPENAI_API_KEY", "benchmark")
+    return env
+
+
+def import_profile():
+    """Return (total_ms, {top-level module: cumulative_ms}) for one cold import of backend.main."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        capture_output=True, text=True, env=_env(), check=True,
+    )
+    total_ms, modules, children = 0.0, {}, {}
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        cumulative_ms = int(match.group(2)) / 1000
+        depth = (len(match.group(3)) - 1) // 2
+        # importtime lists a module's imports (one level deeper) right before the module itself
+        if depth == 1:
+            children[match.group(4)] = cumulative_ms
+        elif depth == 0:
+            if match.group(4) == "backend.main":
+                total_ms, modules = cumulative_ms, children
+            children = {}
+    return total_ms, modules
+
+
+def lifespan_profile():
+    """Return (import_ms, lifespan_startup_ms) measured in a fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-c", LIFESPAN_SNIPPET],
+        capture_output=True, text=True, env=_env(), check=True,
+    )
+    import_ms, lifespan_ms = proc.stdout.strip().splitlines()[-1].split()
+    return float(import_ms), float(lifespan_ms)
+
+
+def main(runs: int, top: int, lifespan: bool, max_ms: float) -> int:
+    profiles = [import_profile() for _ in range(runs)]
+    totals = [total for total, _ in profiles]
+    median_ms = statistics.median(totals)
+    print(f"import backend.main: median {median_ms:.1f} ms, min {min(totals):.1f} ms over {runs} runs")
+
+    slowest = sorted(profiles[-1][1].items(), key=lambda item: item[1], reverse=True)[:top]
+    print(f"\n{'direct import of backend.main':<48}{'cumulative_ms':>14}")
+    for module, cumulative_ms in slowest:
+        print(f"{module:<48}{cumulative_ms:>14.1f}")
+
+    if lifespan:
+        startup = [lifespan_profile() for _ in range(runs)]
+        print(
+            f"\nlifespan startup: median {statistics.median(s[1] for s in startup):.1f} ms "
+            f"(after a {statistics.median(s[0] for s in startup):.1f} ms import)"
+        )
+
+    if max_ms and median_ms > max_ms:
+        print(f"\nFAIL: median import time {median_ms:.1f} ms exceeds the {max_ms:.0f} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="number of slowest direct imports to list")
+    parser.add_argument("--lifespan", action="store_true", help="also time the FastAPI lifespan startup")
+    parser.add_argument("--max-ms", type=float, default=0, help="fail if the median import time exceeds this")
+    args = parser.parse_args()
+    sys.exit(main(args.runs, args.top, args.lifespan, args.max_ms))
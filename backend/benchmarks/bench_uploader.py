@@ -0,0 +1,184 @@
+"""
+Throughput benchmark for search index uploads against a throttling endpoint.
+
+Starts a local HTTP server that mimics the Azure AI Search docs/index API with
+a fixed capacity: requests beyond `--max-in-flight` get 503, documents beyond
+`--docs-per-second` (token bucket) get 429 with Retry-After, and every request
+takes a base latency plus a per-document cost. Uploads go over real HTTP with
+httpx.
+
+Compared:
+- legacy: the previous add_documents_in_batches (serial batches of 10, 0.5 s
+  pause between batches, linear retry on 502 only)
+- fixed: 8 concurrent batches of 10 with the same jittered backoff, no AIMD
+- adaptive: AdaptiveUploader as start_indexing configures it
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_uploader --docs 2000
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from backend.search_indexer.uploader import AdaptiveLimiter, AdaptiveUploader
+
+
+class ThrottlingSearchServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, docs_per_second, max_in_flight, base_latency, doc_latency):
+        super().__init__(("127.0.0.1", 0), SearchHandler)
+        self.docs_per_second = docs_per_second
+        self.max_in_flight = max_in_flight
+        self.base_latency = base_latency
+        self.doc_latency = doc_latency
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.tokens = float(self.docs_per_second)
+        self.refilled = time.monotonic()
+        self.in_flight = 0
+        self.indexed = 0
+        self.responses = {}
+
+    def admit(self, docs):
+        """Return (status, retry_after_seconds) for a request carrying `docs` documents."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.docs_per_second, self.tokens + (now - self.refilled) * self.docs_per_second)
+            self.refilled = now
+            if self.in_flight >= self.max_in_flight:
+                return 503, None
+            if docs > self.tokens:
+                return 429, (docs - self.tokens) / self.docs_per_second
+            self.tokens -= docs
+            self.in_flight += 1
+            return 200, None
+
+
+class SearchHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        docs = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["value"]
+        status, retry_after = server.admit(len(docs))
+        if status == 200:
+            time.sleep(server.base_latency + server.doc_latency * len(docs))
+            with server.lock:
+                server.in_flight -= 1
+                server.indexed += len(docs)
+        with server.lock:
+            server.responses[status] = server.responses.get(status, 0) + 1
+        self.send_response(status)
+        if retry_after is not None:
+            self.send_header("Retry-After", str(max(1, round(retry_after))))
+            self.send_header("retry-after-ms", str(int(retry_after * 1000)))
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def make_upload_fn(url):
+    client = httpx.Client(timeout=30, limits=httpx.Limits(max_connections=32))
+
+    def upload(batch):
+        response = client.post(url, json={"value": batch})
+        # Raises httpx.HTTPStatusError, which carries the status and headers
+        response.raise_for_status()
+
+    return upload
+
+
+def legacy_upload(upload_fn, chunks, batch_size=10, max_retries=3):
+    """The uploader used before AdaptiveUploader, minus logging."""
+    successful = failed = 0
+    for i in range(0, len(chunks), batch_size):
+        batch = chunks[i:i + batch_size]
+        for attempt in range(max_retries):
+            try:
+                upload_fn(batch)
+                successful += len(batch)
+                break
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 502 and attempt < max_retries - 1:
+                    time.sleep((attempt + 1) * 2)
+                    continue
+                failed += len(batch)
+                break
+        if i + batch_size < len(chunks):
+            time.sleep(0.5)
+    return {"successful": successful, "failed": failed, "retries": "-", "limits": "-"}
+
+
+def fixed_upload(upload_fn, chunks, batch_size=10, concurrency=8):
+    limiter = AdaptiveLimiter(
+        batch_size=batch_size, max_batch_size=batch_size, batch_step=0,
+        concurrency=concurrency, max_concurrency=concurrency, target_latency=float("inf"),
+    )
+    # Never decrease: every congestion signal comes from a stale epoch
+    limiter.on_congestion = lambda epoch, reason, pause=None: None
+    return adaptive_upload(upload_fn, chunks, limiter)
+
+
+def adaptive_upload(upload_fn, chunks, limiter=None):
+    uploader = AdaptiveUploader(upload_fn, limiter or AdaptiveLimiter(), max_retries=8, base_delay=0.1)
+    try:
+        result = uploader.upload(chunks)
+    finally:
+        uploader.close()
+    limits = uploader.limiter.as_dict()
+    return {
+        "successful": result.successful,
+        "failed": result.failed,
+        "retries": result.retries,
+        "limits": f"{limits['batch_size']}x{limits['concurrency']}",
+    }
+
+
+def main(args):
+    import logging
+
+    logging.disable(logging.WARNING)
+    server = ThrottlingSearchServer(args.docs_per_second, args.max_in_flight, args.base_latency, args.doc_latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/indexes/bench/docs/index"
+    upload_fn = make_upload_fn(url)
+    chunks = [{"id": str(i), "content": f"chunk {i}", "content_vector": [0.1] * 32} for i in range(args.docs)]
+
+    print(
+        f"docs={args.docs} capacity={args.docs_per_second} docs/s, {args.max_in_flight} in flight, "
+        f"latency {args.base_latency}s + {args.doc_latency}s/doc"
+    )
+    print(f"{'strategy':<12}{'wall_s':>8}{'docs/s':>9}{'ok':>7}{'failed':>8}{'retries':>9}{'429':>6}{'503':>6}{'limits':>9}")
+    strategies = [("fixed", fixed_upload), ("adaptive", adaptive_upload)]
+    if not args.skip_legacy:
+        strategies.insert(0, ("legacy", legacy_upload))
+    for name, strategy in strategies:
+        server.reset()
+        started = time.perf_counter()
+        result = strategy(upload_fn, chunks)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{name:<12}{elapsed:>8.2f}{result['successful'] / elapsed:>9.1f}{result['successful']:>7}"
+            f"{result['failed']:>8}{result['retries']:>9}{server.responses.get(429, 0):>6}"
+            f"{server.responses.get(503, 0):>6}{result['limits']:>9}"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--docs-per-second", type=int, default=1500)
+    parser.add_argument("--max-in-flight", type=int, default=4)
+    parser.add_argument("--base-latency", type=float, default=0.05)
+    parser.add_argument("--doc-latency", type=float, default=0.001)
+    parser.add_argument("--skip-legacy", action="store_true", help="skip the slow serial baseline")
+    main(parser.parse_args())
@@ -0,0 +1,90 @@
+"""
+Benchmark for post-indexing verification.
+
+Runs web_crawler.verify_indexing against an in-process fake search index in which
+uploaded documents become searchable `--lag` seconds after upload (Azure AI Search
+makes documents visible after an index refresh, usually within a second or two).
+
+Compared:
+- fixed sleep: the previous verification, which always slept `--sleep` seconds and
+  then read the index statistics and a sample search
+- polling: verify_indexing polling the document count and looking up the uploaded
+  keys, with backoff, until they are visible
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_verify_indexing --keys 500 --lag 0.2 0.8 1.5
+"""
+import argparse
+import logging
+import re
+import time
+
+from backend.search_indexer import web_crawler
+
+
+class FakeSearchClient:
+    def __init__(self, lag):
+        self.lag = lag
+        self.visible_at = {}
+        self.requests = 0
+
+    def upload(self, keys):
+        at = time.monotonic() + self.lag
+        self.visible_at.update(dict.fromkeys(keys, at))
+
+    def _visible(self):
+        now = time.monotonic()
+        return {key for key, at in self.visible_at.items() if at <= now}
+
+    def get_document_count(self):
+        self.requests += 1
+        return len(self._visible())
+
+    def search(self, search_text="*", filter=None, select=None, top=50):
+        self.requests += 1
+        visible = self._visible()
+        if filter:
+            keys = re.search(r"'(.*?)'", filter).group(1).split(",")
+            return [{"id": key} for key in keys if key in visible][:top]
+        return [{"id": key} for key in sorted(visible)[:top]]
+
+
+class FakeSearchIndexClient:
+    def __init__(self, search_client):
+        self.search_client = search_client
+
+    def get_index_statistics(self, index_name):
+        self.search_client.requests += 1
+        return {"document_count": self.search_client.get_document_count(), "storage_size": 0}
+
+
+def main(args):
+    logging.disable(logging.WARNING)
+    keys = [f"{i:064x}" for i in range(args.keys)]
+    print(f"keys={args.keys} fixed sleep={args.sleep}s")
+    print(f"{'lag_s':<8}{'run':<14}{'wall_s':>8}{'requests':>10}{'verified':>10}")
+    for lag in args.lag:
+        for name in ("fixed sleep", "polling"):
+            client = FakeSearchClient(lag)
+            web_crawler.get_search_client = lambda index_name=None: client
+            web_crawler.get_search_index_client = lambda: FakeSearchIndexClient(client)
+            client.upload(keys)
+            started = time.perf_counter()
+            if name == "fixed sleep":
+                time.sleep(args.sleep)
+                FakeSearchIndexClient(client).get_index_statistics(web_crawler.SEARCH_INDEX_NAME)
+                verified = len(client.search(top=5)) > 0
+            else:
+                result = web_crawler.verify_indexing(expected_keys=keys, expected_count=len(keys))
+                verified = result["success"]
+            print(
+                f"{lag:<8}{name:<14}{time.perf_counter() - started:>8.2f}{client.requests:>10}{str(verified):>10}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=500, help="chunks uploaded by the run")
+    parser.add_argument("--lag", type=float, nargs="+", default=[0.2, 0.8, 1.5], help="seconds until searchable")
+    parser.add_argument("--sleep", type=float, default=3.0)
+    main(parser.parse_args())
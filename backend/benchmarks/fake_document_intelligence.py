@@ -0,0 +1,188 @@
+"""
+Local fake of the Azure Document Intelligence analyze API, for benchmarks and tests.
+
+Implements just enough of the REST surface for the SDK's begin_analyze_document
+and its long-running-operation poller:
+
+    POST /documentintelligence/documentModels/{model}:analyze  -> 202 + Operation-Location
+         (JSON with base64Source, or the raw document bytes)
+    GET  /documentintelligence/documentModels/{model}/analyzeResults/{id}
+         -> {"status": "running"} until done, then "succeeded" with analyzeResult
+
+The service model: `capacity` analyses are processed in parallel and the rest
+wait their turn; each takes `base_seconds` plus `seconds_per_kb` of input.
+Results report one page per `kb_per_page` of input.
+Submissions above `submit_rps` and polls above `poll_rps` get 429 with a
+Retry-After, as the real service does.
+
+Usage:
+    with FakeDocumentIntelligence(capacity=8) as server:
+        client = DocumentIntelligenceClient(server.endpoint, AzureKeyCredential("fake"))
+"""
+import base64
+import heapq
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+ANALYZE_PATH = re.compile(r"^/documentintelligence/documentModels/([^/:]+):analyze$")
+RESULT_PATH = re.compile(r"^/documentintelligence/documentModels/([^/]+)/analyzeResults/([^/]+)$")
+
+
+class _Bucket:
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+
+    def take(self):
+        """Return None if admitted, else the seconds until a token is available."""
+        if not self.rate:
+            return None
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return None
+        return (1 - self.tokens) / self.rate
+
+
+class FakeDocumentIntelligence(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, capacity=8, base_seconds=0.5, seconds_per_kb=0.0, submit_rps=15, poll_rps=50,
+                 retry_after_ms=100, kb_per_page=32):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.capacity = capacity
+        self.base_seconds = base_seconds
+        self.seconds_per_kb = seconds_per_kb
+        self.retry_after_ms = retry_after_ms
+        self.kb_per_page = kb_per_page
+        self.submit_bucket = _Bucket(submit_rps)
+        self.poll_bucket = _Bucket(poll_rps)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            # Times at which each of the `capacity` service workers becomes free
+            self.workers = [0.0] * self.capacity
+            self.operations = {}
+            self.counts = {"submitted": 0, "polls": 0, "throttled": 0, "peak_running": 0}
+
+    @property
+    def endpoint(self):
+        return f"http://127.0.0.1:{self.server_port}/"
+
+    def submit(self, size_bytes, content):
+        pages = max(1, -(-size_bytes // (self.kb_per_page * 1024)))
+        with self.lock:
+            wait = self.submit_bucket.take()
+            if wait is not None:
+                self.counts["throttled"] += 1
+                return None, wait
+            now = time.monotonic()
+            start = max(now, heapq.heappop(self.workers))
+            done = start + self.base_seconds + self.seconds_per_kb * size_bytes / 1024
+            heapq.heappush(self.workers, done)
+            operation_id = uuid.uuid4().hex
+            self.operations[operation_id] = (start, done, content, pages)
+            self.counts["submitted"] += 1
+            running = sum(1 for s, d, _, _ in self.operations.values() if s <= now < d)
+            self.counts["peak_running"] = max(self.counts["peak_running"], running)
+            return operation_id, None
+
+    def poll(self, operation_id):
+        with self.lock:
+            wait = self.poll_bucket.take()
+            if wait is not None:
+                self.counts["throttled"] += 1
+                return None, wait
+            self.counts["polls"] += 1
+            start, done, content, pages = self.operations[operation_id]
+            if time.monotonic() < done:
+                return {"status": "running" if time.monotonic() >= start else "notStarted"}, None
+            return {
+                "status": "succeeded",
+                "createdDateTime": "2024-01-01T00:00:00Z",
+                "lastUpdatedDateTime": "2024-01-01T00:00:00Z",
+                "analyzeResult": {
+                    "apiVersion": "2024-11-30",
+                    "modelId": "prebuilt-read",
+                    "stringIndexType": "textElements",
+                    "content": content,
+                    "contentFormat": "markdown",
+                    "pages": [{"pageNumber": n, "spans": []} for n in range(1, pages + 1)],
+                },
+            }, None
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self, status, body=None, headers=None):
+        payload = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _throttled(self, wait):
+        self._reply(
+            429,
+            {"error": {"code": "429", "message": "Rate limit exceeded"}},
+            {"Retry-After": str(max(1, round(wait))), "retry-after-ms": str(int(wait * 1000) + 1)},
+        )
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        match = ANALYZE_PATH.match(url.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not match:
+            return self._reply(404, {"error": {"code": "NotFound", "message": url.path}})
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            data = base64.b64decode(json.loads(body or b"{}").get("base64Source", ""))
+        else:
+            # Raw document bytes, as sent for file-object bodies
+            data = body
+        content = f"# Analyzed document\n\n{data[:200].decode('utf-8', 'replace')}"
+        operation_id, wait = self.server.submit(len(data), content)
+        if operation_id is None:
+            return self._throttled(wait)
+        location = (
+            f"{self.server.endpoint}documentintelligence/documentModels/{match.group(1)}"
+            f"/analyzeResults/{operation_id}?{url.query}"
+        )
+        self._reply(202, None, {
+            "Operation-Location": location,
+            "retry-after-ms": str(self.server.retry_after_ms),
+        })
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        match = RESULT_PATH.match(url.path)
+        if not match or match.group(2) not in self.server.operations:
+            return self._reply(404, {"error": {"code": "NotFound", "message": url.path}})
+        body, wait = self.server.poll(match.group(2))
+        if body is None:
+            return self._throttled(wait)
+        self._reply(200, body, {"retry-after-ms": str(self.server.retry_after_ms)})
+
+    def log_message(self, *args):
+        pass
@@ -0,0 +1,167 @@
+"""
+Local fixture web site for the crawler, for benchmarks and tests.
+
+Serves `pages` generated HTML pages under /page/{n}. Each page has a title,
+headings, paragraphs, sometimes a table, and links to `links_per_page` other
+pages, plus links the crawler must not follow (an external host, a PDF, a path
+disallowed by robots.txt, navigation). Every `duplicate_every`-th page links to
+a print view of itself, /page/{n}?print=1, whose content differs only in a
+"printed" line: a near-duplicate.
+
+Responses carry an ETag and Last-Modified per page version, and conditional
+requests for an unchanged page (If-None-Match, or If-Modified-Since without it)
+get 304 without a body. `edit(n)` makes a new version of page n. Each request
+takes `latency` seconds. robots.txt disallows /private/, and asks for
+`crawl_delay` seconds between requests if given.
+
+The server records requests, 304s, bytes sent, and the peak number of
+requests in flight at once, to check the crawler's per-host limits.
+
+Usage:
+    with FakeWebsite(pages=50) as site:
+        crawler = AsyncCrawler([site.url("/page/0")])
+"""
+import random
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+WORDS = (
+    "water licence application fee permit land use crown tenure river stream well groundwater "
+    "approval notice section change works diversion storage season volume authorization rights"
+).split()
+
+
+class FakeWebsite(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, pages=50, links_per_page=4, duplicate_every=5, latency=0.05, seed=0, crawl_delay=None):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.pages = pages
+        self.links_per_page = links_per_page
+        self.duplicate_every = duplicate_every
+        self.latency = latency
+        self.crawl_delay = crawl_delay
+        self.seed = seed
+        self.versions = [0] * pages
+        self.modified = [time.time() - 86400] * pages
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.in_flight = 0
+            self.counts = {"requests": 0, "not_modified": 0, "bytes": 0, "peak_in_flight": 0}
+
+    def url(self, path="/"):
+        return f"http://127.0.0.1:{self.server_port}{path}"
+
+    def edit(self, n):
+        """Publish a new version of page n."""
+        with self.lock:
+            self.versions[n] += 1
+            self.modified[n] = time.time()
+
+    def etag(self, n):
+        return f'"p{n}-v{self.versions[n]}"'
+
+    def render(self, n, printed=False):
+        rng = random.Random(self.seed * 100003 + n)
+        version = self.versions[n]
+        paragraphs = []
+        for _ in range(rng.randint(3, 6)):
+            paragraphs.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(30, 80))) + ".")
+        links = [f"/page/{rng.randrange(self.pages)}" for _ in range(self.links_per_page)]
+        if self.duplicate_every and n % self.duplicate_every == 0:
+            links.append(f"/page/{n}?print=1")
+        links += ["https://example.invalid/elsewhere", f"/files/form-{n}.pdf", "/private/admin"]
+        table = ""
+        if rng.random() < 0.4:
+            rows = "".join(
+                f"<tr><td>{rng.choice(WORDS)}</td><td>${rng.randint(1, 500)}.00</td></tr>" for _ in range(5)
+            )
+            table = f"<h2>Fees</h2><table><tr><th>Item</th><th>Fee</th></tr>{rows}</table>"
+        body = "".join(f"<p>{p}</p>" for p in paragraphs)
+        anchors = "".join(f'<li><a href="{href}">link</a></li>' for href in links)
+        return (
+            f"<html><head><title>Page {n}</title><script>var tracking = {n};</script></head><body>"
+            f'<nav><a href="/page/0">Home</a></nav>'
+            f"<main><h1>Page {n}</h1><p>Version {version}.</p>{body}{table}"
+            f"{'<p>Printed copy.</p>' if printed else ''}<ul>{anchors}</ul></main>"
+            f"<footer>Copyright</footer></body></html>"
+        )
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.lock:
+            self.server.counts["bytes"] += len(body)
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.counts["requests"] += 1
+            server.in_flight += 1
+            server.counts["peak_in_flight"] = max(server.counts["peak_in_flight"], server.in_flight)
+        try:
+            time.sleep(server.latency)
+            self._get()
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _get(self):
+        server = self.server
+        url = urlparse(self.path)
+        if url.path == "/robots.txt":
+            robots = "User-agent: *\nDisallow: /private/\n"
+            if server.crawl_delay:
+                robots += f"Crawl-delay: {server.crawl_delay}\n"
+            return self._reply(200, robots.encode("utf-8"), {"Content-Type": "text/plain"})
+        parts = url.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "page" or not parts[1].isdigit() or int(parts[1]) >= server.pages:
+            return self._reply(404, b"Not found", {"Content-Type": "text/plain"})
+        n = int(parts[1])
+        printed = "print" in parse_qs(url.query)
+        etag = server.etag(n) + ("-print" if printed else "")
+        headers = {"ETag": etag, "Last-Modified": formatdate(server.modified[n], usegmt=True)}
+        if self.headers.get("If-None-Match") is not None:
+            not_modified = self.headers["If-None-Match"] == etag
+        else:
+            not_modified = self._not_modified_since(server.modified[n])
+        if not_modified:
+            with server.lock:
+                server.counts["not_modified"] += 1
+            return self._reply(304, b"", headers)
+        body = server.render(n, printed).encode("utf-8")
+        self._reply(200, body, {**headers, "Content-Type": "text/html; charset=utf-8"})
+
+    def _not_modified_since(self, modified):
+        since = self.headers.get("If-Modified-Since")
+        if not since:
+            return False
+        try:
+            return int(modified) <= parsedate_to_datetime(since).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+    def log_message(self, *args):
+        pass
@@ -0,0 +1,124 @@
+"""
+Shared Azure OpenAI chat client provider for the whole backend package.
+
+Clients are created lazily (nothing touches the network at import time), one per
+deployment. Each deployment gets its own pooled httpx clients so keep-alive
+connections are reused across requests, and every client reports how many
+requests are currently in flight.
+"""
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+import httpx
+from dotenv import load_dotenv
+from langchain_core.callbacks import BaseCallbackHandler
+
+if TYPE_CHECKING:
+    from langchain_openai import AzureChatOpenAI
+
+load_dotenv()
+
+# Connection pool sizing per deployment
+LLM_POOL_MAX_CONNECTIONS = int(os.environ.get("LLM_POOL_MAX_CONNECTIONS", "20"))
+LLM_POOL_MAX_KEEPALIVE = int(os.environ.get("LLM_POOL_MAX_KEEPALIVE", "10"))
+LLM_REQUEST_TIMEOUT = float(os.environ.get("LLM_REQUEST_TIMEOUT", "60"))
+
+_lock = threading.Lock()
+_clients: Dict[str, "AzureChatOpenAI"] = {}
+_metrics: Dict[str, "InFlightTracker"] = {}
+
+
+class InFlightTracker(BaseCallbackHandler):
+    """Callback handler counting concurrent and total requests for one deployment."""
+
+    # Update counters on the calling thread instead of a callback executor
+    run_inline = True
+
+    def __init__(self, deployment: str):
+        self.deployment = deployment
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_requests = 0
+        self.errors = 0
+        self._active = set()
+        self._lock = threading.Lock()
+
+    def _start(self, run_id) -> None:
+        with self._lock:
+            self._active.add(run_id)
+            self.in_flight += 1
+            self.total_requests += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _finish(self, run_id, failed: bool = False) -> None:
+        with self._lock:
+            if run_id not in self._active:
+                return
+            self._active.discard(run_id)
+            self.in_flight -= 1
+            if failed:
+                self.errors += 1
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs: Any) -> None:
+        self._start(run_id)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs: Any) -> None:
+        self._start(run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs: Any) -> None:
+        self._finish(run_id, failed=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "total_requests": self.total_requests,
+                "errors": self.errors,
+            }
+
+
+def _build_client(deployment: str, tracker: InFlightTracker) -> "AzureChatOpenAI":
+    # langchain_openai is slow to import; load it with the first client (app startup warms it)
+    from langchain_openai import AzureChatOpenAI
+
+    limits = httpx.Limits(
+        max_connections=LLM_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_POOL_MAX_KEEPALIVE,
+    )
+    return AzureChatOpenAI(
+        azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+        azure_deployment=deployment,
+        openai_api_version=os.environ.get("AZURE_OPENAI_API_VERSION", "2024-12-01-preview"),
+        http_client=httpx.Client(limits=limits, timeout=LLM_REQUEST_TIMEOUT),
+        http_async_client=httpx.AsyncClient(limits=limits, timeout=LLM_REQUEST_TIMEOUT),
+        callbacks=[tracker],
+    )
+
+
+def get_llm(deployment: Optional[str] = None) -> "AzureChatOpenAI":
+    """
+    Return the shared chat client for a deployment, creating it on first use.
+
+    Args:
+        deployment: Azure OpenAI deployment name; defaults to AZURE_OPENAI_DEPLOYMENT_NAME
+    """
+    deployment = deployment or os.environ["AZURE_OPENAI_DEPLOYMENT_NAME"]
+    client = _clients.get(deployment)
+    if client is None:
+        with _lock:
+            client = _clients.get(deployment)
+            if client is None:
+                tracker = _metrics.setdefault(deployment, InFlightTracker(deployment))
+                client = _build_client(deployment, tracker)
+                _clients[deployment] = client
+    return client
+
+
+def get_llm_metrics() -> Dict[str, Dict[str, Any]]:
+    """Return in-flight and total request counts keyed by deployment."""
+    return {deployment: tracker.snapshot() for deployment, tracker in list(_metrics.items())}
@@ -1,2 +1,10 @@
-from .analyze_form_agent import analyze_form_executor
-from .process_field_agent import process_field_executor
\ No newline at end of file
+from .analyze_form_agent import analyze_form_executor, get_analyze_form_executor
+from .process_field_agent import process_field_executor, get_process_field_executor
+from .batch_field_agent import batch_field_executor, get_batch_field_executor
+
+
+def warm_executors():
+    """Build the LLM client and every cached executor up front, e.g. at app startup."""
+    get_analyze_form_executor()
+    get_process_field_executor()
+    get_batch_field_executor()
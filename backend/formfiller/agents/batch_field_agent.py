@@ -0,0 +1,31 @@
+from functools import lru_cache
+from ..llm_client import get_llm, CHAIN_VERBOSE, STRUCTURED_OUTPUT
+from ..schemas import BatchFieldResult
+from .structured_output import StructuredOutputExecutor
+from backend.formfiller.prompts.batch_field_prompt import batch_field_prompt
+
+# Build the executor lazily, once per process
+@lru_cache(maxsize=1)
+def get_batch_field_executor():
+    if STRUCTURED_OUTPUT:
+        return StructuredOutputExecutor(batch_field_prompt, BatchFieldResult)
+    from langchain.chains import LLMChain
+
+    return LLMChain(
+        llm=get_llm(),
+        prompt=batch_field_prompt,
+        verbose=CHAIN_VERBOSE
+    )
+
+# For backward compatibility, create a property-like access
+class BatchFieldExecutor:
+    def __getattr__(self, name):
+        # Introspection (e.g. LangGraph's compile) must not build the client at import
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(get_batch_field_executor(), name)
+
+    def __call__(self, *args, **kwargs):
+        return get_batch_field_executor()(*args, **kwargs)
+
+batch_field_executor = BatchFieldExecutor()
@@ -1,18 +1,28 @@
-from ..llm_client import get_llm
+from functools import lru_cache
+from ..llm_client import get_llm, CHAIN_VERBOSE, STRUCTURED_OUTPUT
+from ..schemas import ProcessFieldResult
+from .structured_output import StructuredOutputExecutor
 from backend.formfiller.prompts.process_field_prompt import process_field_prompt
-from langchain.chains import LLMChain
 
-# Create a function that returns the LLMChain lazily
+# Build the executor lazily, once per process
+@lru_cache(maxsize=1)
 def get_process_field_executor():
+    if STRUCTURED_OUTPUT:
+        return StructuredOutputExecutor(process_field_prompt, ProcessFieldResult)
+    from langchain.chains import LLMChain
+
     return LLMChain(
         llm=get_llm(),
         prompt=process_field_prompt,
-        verbose=True
+        verbose=CHAIN_VERBOSE
     )
 
 # For backward compatibility, create a property-like access
 class ProcessFieldExecutor:
     def __getattr__(self, name):
+        # Introspection (e.g. LangGraph's compile) must not build the client at import
+        if name.startswith("__"):
+            raise AttributeError(name)
         return getattr(get_process_field_executor(), name)
     
     def __call__(self, *args, **kwargs):
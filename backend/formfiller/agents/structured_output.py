@@ -0,0 +1,48 @@
+import json
+from typing import Any, Dict, Type
+
+from langchain_core.prompts import BasePromptTemplate
+from pydantic import BaseModel
+
+from ..llm_client import get_llm
+
+
+class StructuredOutputExecutor:
+    """
+    Drop-in replacement for the agents' LLMChain that asks the model for
+    function-calling output validated against a Pydantic schema.
+
+    ainvoke returns {"text": ..., "parsed": ...} like LLMChain's {"text": ...}.
+    "parsed" is the validated result as a dict, or None when validation failed,
+    in which case the graph falls back to parsing "text".
+    """
+
+    def __init__(self, prompt: BasePromptTemplate, schema: Type[BaseModel]):
+        self.prompt = prompt
+        self.schema = schema
+        self.runnable = prompt | get_llm().with_structured_output(
+            schema, method="function_calling", include_raw=True
+        )
+
+    @staticmethod
+    def _raw_text(raw) -> str:
+        tool_calls = getattr(raw, "tool_calls", None) or []
+        if tool_calls:
+            return json.dumps(tool_calls[0].get("args", {}))
+        content = getattr(raw, "content", "")
+        return content if isinstance(content, str) else json.dumps(content)
+
+    def _result(self, output: Dict[str, Any]) -> Dict[str, Any]:
+        parsed = output.get("parsed")
+        return {
+            "text": self._raw_text(output.get("raw")),
+            "parsed": parsed.model_dump() if parsed is not None else None,
+        }
+
+    async def ainvoke(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return self._result(await self.runnable.ainvoke(inputs))
+
+    def invoke(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return self._result(self.runnable.invoke(inputs))
+
+    __call__ = invoke
@@ -6,7 +6,8 @@ from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from uuid import UUID
-from .graph import FormField, chat_analyze_form
+from .graph import FormField, chat_analyze_form, chat_session_turn
+from .form_state import FormState
 
 router = APIRouter()
 
@@ -29,6 +30,24 @@ class ChatResponse(BaseModel):
     missing_fields: Optional[list] = None
     current_field: Optional[list] = None
     conversation_history: Optional[list] = None
+    metrics: Optional[Dict[str, Any]] = None
+
+class ChatSessionRequest(BaseModel):
+    """Stateful /chat/session request: the server keeps the form keyed by thread_id"""
+    user_message: str
+    thread_id: Optional[str] = None
+    form_fields: Optional[List[Dict[str, Any]]] = None  # first turn only
+    field_updates: Optional[List[Dict[str, Any]]] = None  # fields edited by the user since the last turn
+
+class ChatSessionResponse(BaseModel):
+    """Stateful /chat/session response: only the fields that changed this turn"""
+    thread_id: str
+    response_message: str
+    status: str
+    changed_fields: List[Dict[str, Any]] = []
+    missing_field_ids: List[str] = []
+    current_field: Optional[Dict[str, Any]] = None
+    metrics: Optional[Dict[str, Any]] = None
 
 # Request and response models
 class StartFormRequest(BaseModel):
@@ -83,20 +102,8 @@ async def chat_endpoint(request: ChatRequest):
         elif not isinstance(current_field, list):
             current_field = [current_field]
 
-        # Update form_fields with filled_fields if filled_fields is not empty
-        form_fields = result.get("form_fields", [])
-        if filled_fields:
-            # Update form_fields with values from filled_fields
-            updated_form_fields = []
-            for field in form_fields:
-                data_id = field.get("data_id") or field.get("field_id")
-                match = next((f for f in filled_fields if (f.get("data_id") or f.get("field_id")) == data_id), None)
-                if data_id and match:
-                    updated = {**field, **match}
-                    updated_form_fields.append(updated)
-                else:
-                    updated_form_fields.append(field)
-            form_fields = updated_form_fields
+        # Update form_fields with values from filled_fields (one dict lookup per field)
+        form_fields = FormState(result.get("form_fields", []), filled_fields).merged_form_fields()
 
         return ChatResponse(
             thread_id=result.get("thread_id", ""),
@@ -106,9 +113,34 @@ async def chat_endpoint(request: ChatRequest):
             missing_fields=result.get("missing_fields", []),
             current_field=current_field,
             conversation_history=result.get("conversation_history", []),
+            metrics=result.get("metrics"),
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error in /chat: {str(e)}")
+
+@router.post("/chat/session", response_model=ChatSessionResponse)
+async def chat_session_endpoint(request: ChatSessionRequest):
+    """
+    Session-based chat: send form_fields on the first turn only, then just the new
+    user_message and any field_updates. The response carries only changed fields.
+    """
+    try:
+        result = await chat_session_turn(
+            request.user_message,
+            thread_id=request.thread_id,
+            form_fields=request.form_fields,
+            field_updates=request.field_updates,
+        )
+        if "error" in result:
+            raise HTTPException(status_code=500, detail=f"Error in /chat/session: {result['error']}")
+        return ChatSessionResponse(**result)
+    except HTTPException:
+        raise
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error in /chat/session: {str(e)}")
+
 @router.get("/schema")
 def get_schema():
     """Get the expected schema for API requests"""
@@ -0,0 +1,172 @@
+"""
+Checkpointer selection for the form-filler LangGraph.
+
+FORM_FILLER_CHECKPOINTER picks the backend:
+- memory (default): in-process, bounded by TTL and an LRU cap on threads
+- sqlite: AsyncSqliteSaver on FORM_FILLER_CHECKPOINT_SQLITE_PATH
+- redis: AsyncRedisSaver on REDIS_URL, expiring keys after the same TTL
+
+Checkpoints are keyed by the client's thread_id, so a later request with the same
+thread_id resumes the previous turn's state.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
+
+CHECKPOINTER_BACKEND = os.environ.get("FORM_FILLER_CHECKPOINTER", "memory").lower()
+# Threads idle for longer than this are dropped (0 disables the TTL)
+CHECKPOINT_TTL_SECONDS = int(os.environ.get("FORM_FILLER_CHECKPOINT_TTL_SECONDS", "3600"))
+# Most threads kept in memory before the least recently used one is evicted
+CHECKPOINT_MAX_THREADS = int(os.environ.get("FORM_FILLER_CHECKPOINT_MAX_THREADS", "1000"))
+CHECKPOINT_SQLITE_PATH = os.environ.get("FORM_FILLER_CHECKPOINT_SQLITE_PATH", "checkpoints.sqlite")
+
+_active_checkpointer: Optional[BaseCheckpointSaver] = None
+_active_backend: str = CHECKPOINTER_BACKEND
+_closers: list = []
+
+
+class BoundedMemorySaver(MemorySaver):
+    """
+    MemorySaver that evicts whole threads once they are idle for `ttl_seconds`
+    or when more than `max_threads` threads are held (least recently used first).
+    """
+
+    def __init__(self, *, max_threads: int = CHECKPOINT_MAX_THREADS,
+                 ttl_seconds: int = CHECKPOINT_TTL_SECONDS, serde=None):
+        super().__init__(serde=serde)
+        self.max_threads = max_threads
+        self.ttl_seconds = ttl_seconds
+        self.evicted_ttl = 0
+        self.evicted_lru = 0
+        self._last_access: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _touch(self, thread_id: str) -> None:
+        with self._lock:
+            self._last_access[thread_id] = time.monotonic()
+            self._last_access.move_to_end(thread_id)
+
+    def evict(self) -> None:
+        """Drop expired threads, then the least recently used ones above max_threads."""
+        now = time.monotonic()
+        with self._lock:
+            while self._last_access:
+                thread_id, last_access = next(iter(self._last_access.items()))
+                if self.ttl_seconds and now - last_access > self.ttl_seconds:
+                    self.evicted_ttl += 1
+                elif len(self._last_access) > self.max_threads:
+                    self.evicted_lru += 1
+                else:
+                    break
+                self._last_access.popitem(last=False)
+                super().delete_thread(thread_id)
+
+    def get_tuple(self, config):
+        # Expire first so a stale thread is never resumed
+        self.evict()
+        result = super().get_tuple(config)
+        if result is not None:
+            self._touch(config["configurable"]["thread_id"])
+        return result
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        result = super().put(config, checkpoint, metadata, new_versions)
+        self._touch(config["configurable"]["thread_id"])
+        self.evict()
+        return result
+
+    def put_writes(self, config, writes, task_id, task_path: str = ""):
+        super().put_writes(config, writes, task_id, task_path)
+        self._touch(config["configurable"]["thread_id"])
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._last_access.pop(thread_id, None)
+            super().delete_thread(thread_id)
+
+    def size_metrics(self) -> Dict[str, Any]:
+        """Serialized checkpoint sizes and eviction counters."""
+        sizes: Dict[str, int] = defaultdict(int)
+        checkpoints = 0
+        with self._lock:
+            for thread_id, namespaces in self.storage.items():
+                for saved in namespaces.values():
+                    for checkpoint, metadata, _parent in saved.values():
+                        checkpoints += 1
+                        sizes[thread_id] += len(checkpoint[1]) + len(metadata[1])
+            for (thread_id, *_), (_, data) in self.blobs.items():
+                sizes[thread_id] += len(data)
+            for (thread_id, *_), writes in self.writes.items():
+                for write in writes.values():
+                    sizes[thread_id] += len(write[2][1])
+            threads = len(self._last_access)
+        total = sum(sizes.values())
+        return {
+            "backend": "memory",
+            "threads": threads,
+            "checkpoints": checkpoints,
+            "total_bytes": total,
+            "avg_thread_bytes": round(total / threads) if threads else 0,
+            "max_thread_bytes": max(sizes.values(), default=0),
+            "evicted_ttl": self.evicted_ttl,
+            "evicted_lru": self.evicted_lru,
+            "max_threads": self.max_threads,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+async def create_checkpointer(backend: str = CHECKPOINTER_BACKEND) -> BaseCheckpointSaver:
+    """
+    Create the checkpointer for `backend`. Must be awaited inside the running event
+    loop because the SQLite and Redis savers bind to it.
+    """
+    global _active_checkpointer, _active_backend
+    if backend == "sqlite":
+        try:
+            import aiosqlite
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+        except ImportError as exc:
+            raise ImportError(
+                "FORM_FILLER_CHECKPOINTER=sqlite requires the 'langgraph-checkpoint-sqlite' "
+                "package (install the 'sqlite' extra)."
+            ) from exc
+        conn = await aiosqlite.connect(CHECKPOINT_SQLITE_PATH)
+        _closers.append(conn.close)
+        saver = AsyncSqliteSaver(conn)
+        await saver.setup()
+    elif backend == "redis":
+        from langgraph.checkpoint.redis.aio import AsyncRedisSaver
+
+        ttl = {"default_ttl": CHECKPOINT_TTL_SECONDS / 60, "refresh_on_read": True} if CHECKPOINT_TTL_SECONDS else None
+        saver = AsyncRedisSaver(redis_url=os.environ["REDIS_URL"], ttl=ttl)
+        await saver.asetup()
+        _closers.append(lambda: saver.__aexit__(None, None, None))
+    elif backend == "memory":
+        saver = BoundedMemorySaver()
+    else:
+        raise ValueError(f"Unsupported FORM_FILLER_CHECKPOINTER '{backend}'. Use memory, sqlite or redis.")
+    _active_checkpointer = saver
+    _active_backend = backend
+    return saver
+
+
+async def close_checkpointer() -> None:
+    """Close any connections opened by create_checkpointer (called on app shutdown)."""
+    while _closers:
+        await _closers.pop()()
+
+
+def checkpoint_metrics() -> Dict[str, Any]:
+    """Size metrics for the active checkpointer (detailed for the in-memory backend)."""
+    if _active_checkpointer is None:
+        return {"backend": _active_backend, "initialized": False}
+    if isinstance(_active_checkpointer, BoundedMemorySaver):
+        return _active_checkpointer.size_metrics()
+    if _active_backend == "sqlite" and os.path.exists(CHECKPOINT_SQLITE_PATH):
+        return {"backend": "sqlite", "initialized": True, "total_bytes": os.path.getsize(CHECKPOINT_SQLITE_PATH)}
+    return {"backend": _active_backend, "initialized": True}
@@ -0,0 +1,142 @@
+"""
+Id-indexed form state shared by the form-filler graph and API.
+
+The graph state (FormFillerState) keeps plain lists so checkpoints stay JSON-like;
+FormState is built from those lists once per node or request and keeps every
+field, filled entry and missing entry in dicts keyed by data_id, together with
+the set of filled ids, so lookups and merges are O(1) per field instead of a
+scan over the lists.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+
+def _field_id(field) -> Optional[str]:
+    """Return the data_id of a field given either a dict or a bare id string."""
+    if isinstance(field, dict):
+        return field.get("data_id") or field.get("field_id")
+    return field
+
+
+def is_field_filled(field_value) -> bool:
+    """
+    Check if a field value is properly filled.
+    Returns False for None, empty string, empty list, or empty dict.
+    """
+    if field_value is None:
+        return False
+    if field_value == "":
+        return False
+    if isinstance(field_value, list) and len(field_value) == 0:
+        return False
+    if isinstance(field_value, dict) and len(field_value) == 0:
+        return False
+    return True
+
+
+class FormState:
+    """
+    Form fields indexed by data_id with maintained filled and missing sets.
+
+    - fields: form definition in form order
+    - filled: filled entries (the graph's filled_fields) in fill order
+    - missing: missing entries (dicts or bare ids) in the order they were reported
+    - filled_ids: ids that have a value, either in `fields` or in `filled`
+
+    A field is never both filled and missing: filling it removes it from
+    `missing`, and add_missing ignores ids that are already filled.
+    """
+
+    def __init__(
+        self,
+        form_fields: Optional[Iterable[Any]] = None,
+        filled_fields: Optional[Iterable[Any]] = None,
+        missing_fields: Optional[Iterable[Any]] = None,
+    ):
+        self.fields: Dict[str, Dict[str, Any]] = {}
+        self.filled: Dict[str, Dict[str, Any]] = {}
+        self.missing: Dict[str, Any] = {}
+        self.filled_ids: Set[str] = set()
+        for field in form_fields or []:
+            data_id = _field_id(field)
+            if isinstance(field, dict) and data_id:
+                self.fields[data_id] = field
+                if is_field_filled(field.get("fieldValue")):
+                    self.filled_ids.add(data_id)
+        for entry in filled_fields or []:
+            self.add_filled(entry)
+        for entry in missing_fields or []:
+            self.add_missing(entry)
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "FormState":
+        """Build a FormState from a FormFillerState (or any dict with the same list keys)."""
+        return cls(state.get("form_fields"), state.get("filled_fields"), state.get("missing_fields"))
+
+    def is_filled(self, data_id: str) -> bool:
+        return data_id in self.filled_ids
+
+    def add_filled(self, entry: Any, overwrite: bool = False) -> bool:
+        """
+        Record a filled entry and drop it from the missing set. The first entry for
+        an id wins unless `overwrite` is set. Returns True if the entry was recorded.
+        """
+        data_id = _field_id(entry)
+        if not isinstance(entry, dict) or not data_id:
+            return False
+        if data_id in self.filled and not overwrite:
+            return False
+        self.filled[data_id] = entry
+        self.filled_ids.add(data_id)
+        self.missing.pop(data_id, None)
+        return True
+
+    def add_missing(self, entry: Any) -> bool:
+        """Record a missing entry unless its field is already filled. Returns True if recorded."""
+        data_id = _field_id(entry)
+        if not data_id or data_id in self.filled_ids:
+            return False
+        self.missing[data_id] = entry
+        return True
+
+    def set_missing(self, entries: Iterable[Any]) -> None:
+        """Replace the missing set, skipping fields that are already filled."""
+        self.missing = {}
+        for entry in entries or []:
+            self.add_missing(entry)
+
+    def annotate_missing(self, data_id: str, validation_message: str) -> None:
+        """Attach a validation message to a missing dict entry, keeping its position."""
+        entry = self.missing.get(data_id)
+        if isinstance(entry, dict):
+            self.missing[data_id] = {**entry, "validation_message": validation_message}
+
+    def update_field(self, data_id: str, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply `changes` to a form field (creating it if unknown) and refresh its filled state."""
+        field = {**self.fields.get(data_id, {}), **changes}
+        self.fields[data_id] = field
+        if is_field_filled(field.get("fieldValue")):
+            self.filled_ids.add(data_id)
+            self.missing.pop(data_id, None)
+        elif data_id not in self.filled:
+            self.filled_ids.discard(data_id)
+        return field
+
+    def form_fields(self) -> List[Dict[str, Any]]:
+        return list(self.fields.values())
+
+    def filled_fields(self) -> List[Dict[str, Any]]:
+        return list(self.filled.values())
+
+    def missing_fields(self) -> List[Any]:
+        return list(self.missing.values())
+
+    def fields_with_values(self) -> List[Dict[str, Any]]:
+        """Form fields that currently carry a non-empty fieldValue."""
+        return [f for f in self.fields.values() if is_field_filled(f.get("fieldValue"))]
+
+    def merged_form_fields(self) -> List[Dict[str, Any]]:
+        """Form fields in form order with each filled entry merged over its field."""
+        return [
+            {**field, **self.filled[data_id]} if data_id in self.filled else field
+            for data_id, field in self.fields.items()
+        ]
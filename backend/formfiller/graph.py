@@ -9,15 +9,17 @@ from uuid import uuid4
 from dotenv import load_dotenv
 from .llm_client import llm as model
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
-from langchain_openai import AzureChatOpenAI
 from langgraph.graph import StateGraph, START, END, MessagesState
-from langgraph.checkpoint.memory import MemorySaver
+from .checkpointing import create_checkpointer
+from .form_state import FormState, _field_id, is_field_filled
+from .history import compact_history, render_history
+from .output_parsing import extract_json_from_output
 import traceback
 import asyncio
-from backend.formfiller.agents import analyze_form_executor, process_field_executor
+import time
+from backend.formfiller.agents import analyze_form_executor, process_field_executor, batch_field_executor
+from backend.core.logging import get_logger
 import json
-import re
-import ast
 
 from .tools.ai_search_tool import ai_search_tool
 
@@ -27,16 +29,17 @@ def search_tool(query: str) -> str:
 # Load environment variables
 load_dotenv()
 
-# Initialize the model
-model = AzureChatOpenAI(
-    azure_endpoint=os.environ.get("AZURE_OPENAI_ENDPOINT"),
-    azure_deployment=os.environ.get("AZURE_OPENAI_DEPLOYMENT_NAME"),
-    openai_api_version=os.environ.get("AZURE_OPENAI_API_VERSION", "2024-12-01-preview"),
-)
+logger = get_logger(__name__)
 
 
-# Create a checkpointer for persistence
-checkpointer = MemorySaver()
+# Field extraction strategy for process_field_input: "batch" extracts every pending
+# field in one LLM call, "sequential" makes one call per field and "concurrent"
+# fans the per-field calls out in parallel.
+FIELD_MODE = os.environ.get("FORM_FILLER_FIELD_MODE", "batch").lower()
+# Maximum number of fields sent in a single batched extraction call
+FIELD_BATCH_SIZE = int(os.environ.get("FORM_FILLER_BATCH_MAX_FIELDS", "50"))
+# Maximum number of per-field LLM calls in flight in "concurrent" mode
+FIELD_CONCURRENCY = int(os.environ.get("FORM_FILLER_FIELD_CONCURRENCY", "5"))
 
 # Define form field structure
 class FormField(TypedDict):
@@ -63,55 +66,17 @@ class FormFillerState(TypedDict, total=False):
     status: Literal["in_progress", "awaiting_info", "completed"]  # optional
     response_message: str  # optional
     thread_id: str  # optional
+    metrics: Dict[str, Any]  # optional, per-request LLM call count and latency
 
-def extract_json_from_output(output: str):
-    # Clean up formatting
-    output = output.strip().strip("`").strip()
-
-    # Remove "Final Answer:" prefix if present
-    if output.startswith("Final Answer:"):
-        output = output.replace("Final Answer:", "", 1).strip()
-
-    # Try to extract the JSON block using regex
-    match = re.search(r"({.*})", output, re.DOTALL)
-    if not match:
-        return {
-            "error": "Agent failed to complete analysis. No valid JSON found.",
-            "raw_output": output
-        }
-
-    json_str = match.group(1).strip()
-
-    # Try parsing as real JSON
-    try:
-        return json.loads(json_str)
-    except json.JSONDecodeError:
-        pass  # Try next method
-
-    # Try parsing as Python dict (e.g., single quotes)
-    try:
-        return ast.literal_eval(json_str)
-    except Exception as e:
-        return {
-            "error": "Failed to parse output as JSON or Python dict.",
-            "exception": str(e),
-            "raw_output": json_str
-        }
-
-def is_field_filled(field_value) -> bool:
+def _parse_response(response: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Check if a field value is properly filled.
-    Returns False for None, empty string, empty list, or empty dict.
+    Return the executor's validated structured result, or parse its text output
+    when structured output is disabled or failed validation.
     """
-    if field_value is None:
-        return False
-    if field_value == "":
-        return False
-    if isinstance(field_value, list) and len(field_value) == 0:
-        return False
-    if isinstance(field_value, dict) and len(field_value) == 0:
-        return False
-    return True
+    parsed = response.get("parsed")
+    if parsed is not None:
+        return parsed
+    return extract_json_from_output(response.get("text", ""))
 
 # Node 1: Initial form analysis: orchestrator node
 async def analyze_form(state: FormFillerState) -> FormFillerState:
@@ -129,30 +94,26 @@ async def analyze_form(state: FormFillerState) -> FormFillerState:
     response_message = state.get("response_message", "")
     thread_id = state.get("thread_id", str(uuid4()))
     #import pdb; pdb.set_trace()
-    # Add conversation history summary for context if available, but avoid duplicate 'content' keys
-    if conversation_history:
-        history_context = "Previous conversation:\n"
-        for entry in conversation_history:
-            role_val = entry.get("role")
-            content_val = entry.get("content", "")
-            if role_val == "user":
-                role = "User"
-            elif role_val == "assistant":
-                role = "Assistant"
-            else:
-                role = str(role_val) if role_val else "Unknown"
-            history_context += f"{role}: {content_val}\n"
-        # Only add the summary if it is not already present as a 'content' value
-        if not any(entry.get("content", None) == history_context for entry in conversation_history if isinstance(entry, dict)):
-            conversation_history.append({"role": "system", "content": history_context})
+    # Keep the last turns verbatim and older ones in a rolling summary (see history.py)
+    conversation_history = compact_history(conversation_history)
 
     # get labels for all the fields
     search_results = search_tool(json.dumps({"message": user_message, "formFields": form_fields}))
     print("Search Results:", search_results)
     # Get response from the LLM
-    response = await analyze_form_executor.ainvoke({"message": user_message, "formFields": form_fields, "search_results": search_results})
-
-    cleaned_str = extract_json_from_output(response['text'])
+    metrics = state.get("metrics") or _new_metrics()
+    response = await _timed_ainvoke(
+        analyze_form_executor,
+        {
+            "message": user_message,
+            "formFields": form_fields,
+            "search_results": search_results,
+            "history": render_history(conversation_history),
+        },
+        metrics,
+    )
+
+    cleaned_str = _parse_response(response)
 
     if isinstance(cleaned_str, str):
         return {
@@ -164,41 +125,22 @@ async def analyze_form(state: FormFillerState) -> FormFillerState:
             "status": "awaiting_info",
             "response_message": cleaned_str,
             "thread_id": thread_id,
+            "metrics": metrics,
         }
 
     # Update conversation history
     history = conversation_history.copy()
     history.append({"role": "user", "content": user_message})
 
-    # Determine next steps based on missing fields
-    new_filled_fields = cleaned_str.get("filled_fields", [])
-    # Always append, never overwrite
-    if filled_fields is None:
-        filled_fields = []
-    if new_filled_fields:
-        # Only add new fields that are not already present (by data_id)
-        existing_ids = {f.get('data_id') for f in filled_fields if isinstance(f, dict)}
-        for f in new_filled_fields:
-            if isinstance(f, dict) and f.get('data_id') not in existing_ids:
-                filled_fields.append(f)
-
-    # Filter missing_fields: remove any whose data_id exists in form_fields and fieldValue is not empty
-    raw_missing_fields = cleaned_str.get("missing_fields", [])
-    # Build a set of data_ids in form_fields with non-empty fieldValue
-    filled_data_ids = set()
-    for f in form_fields:
-        if isinstance(f, dict) and f.get('data_id'):
-            if is_field_filled(f.get('fieldValue')):
-                filled_data_ids.add(f['data_id'])
+    # Determine next steps based on missing fields. Filled entries are appended,
+    # never overwritten, and a field that already has a value is never missing.
+    form = FormState(form_fields, filled_fields)
+    for f in cleaned_str.get("filled_fields", []):
+        form.add_filled(f)
     # Support both str and dict in missing_fields
-    missing_fields = []
-    for f in raw_missing_fields:
-        if isinstance(f, dict):
-            if f.get('data_id') not in filled_data_ids:
-                missing_fields.append(f)
-        else:
-            if f not in filled_data_ids:
-                missing_fields.append(f)
+    form.set_missing(cleaned_str.get("missing_fields", []))
+    filled_fields = form.filled_fields()
+    missing_fields = form.missing_fields()
 
     status = "completed" if not missing_fields else "awaiting_info"
     current_field = missing_fields[0] if missing_fields else None
@@ -210,23 +152,9 @@ async def analyze_form(state: FormFillerState) -> FormFillerState:
         response_message = cleaned_str.get("message", "")
 
     history.append({"role": "assistant", "content": response_message})
+    history = compact_history(history)
 
-    # If there are missing fields, route to process_field_input
-    if missing_fields:
-        # Call process_field_input directly
-        next_state = {
-            **state,
-            "filled_fields": filled_fields,
-            "form_fields": form_fields,
-            "missing_fields": missing_fields,
-            "current_field": current_field,
-            "conversation_history": history,
-            "status": "awaiting_info",
-            "response_message": response_message,
-            "thread_id": thread_id,
-        }
-        return await process_field_input(next_state)
-
+    # Missing fields are handled by the analyze_form -> process_field_input edge
     return {
         **state,
         "filled_fields": filled_fields,
@@ -237,145 +165,282 @@ async def analyze_form(state: FormFillerState) -> FormFillerState:
         "status": status,
         "response_message": response_message,
         "thread_id": thread_id,
+        "metrics": metrics,
     }
 
-# Node 2: Process user input for specific field
+def _option_matches(option, value: str) -> Optional[Any]:
+    """Return the canonical option value if `value` matches the option's key or label."""
+    if isinstance(option, dict):
+        key = option.get("key")
+        label = option.get("value")
+        if value.strip().lower() in {str(key).strip().lower(), str(label).strip().lower()}:
+            return key
+        return None
+    if value.strip().lower() == str(option).strip().lower():
+        return option
+    return None
+
+
+def validate_field_value(field: Dict[str, Any], value: Any) -> tuple[bool, Any, str]:
+    """
+    Validate an extracted value against a single field definition.
+
+    Returns (is_valid, normalized_value, validation_message). Option-based fields
+    are normalized to the matching option key so the frontend can set them directly.
+    """
+    label = field.get("fieldLabel") or _field_id(field)
+    if not is_field_filled(value):
+        return False, "", field.get("validation_message") or f"Please provide a value for '{label}'."
+
+    options = [o for o in (field.get("options") or []) if not (isinstance(o, dict) and o.get("key") == "")]
+    if not options:
+        return True, value, ""
+
+    values = value if isinstance(value, list) else [value]
+    normalized = []
+    for item in values:
+        match = next((m for m in (_option_matches(o, str(item)) for o in options) if m is not None), None)
+        if match is None:
+            allowed = ", ".join(str(o.get("value") if isinstance(o, dict) else o) for o in options)
+            return False, "", f"'{item}' is not a valid option for '{label}'. Choose one of: {allowed}."
+        normalized.append(match)
+    return True, (normalized if isinstance(value, list) else normalized[0]), ""
+
+
+def _new_metrics() -> Dict[str, Any]:
+    # llm_latency_ms: wall-clock time with at least one LLM call in flight
+    # llm_latency_ms_total: latencies of all calls added up, above the wall-clock
+    # time when calls overlap (FORM_FILLER_FIELD_MODE=concurrent)
+    return {"llm_calls": 0, "llm_latency_ms": 0.0, "llm_latency_ms_total": 0.0, "field_mode": FIELD_MODE}
+
+
+async def _timed_ainvoke(executor, inputs: Dict[str, Any], metrics: Dict[str, Any]) -> Any:
+    """Invoke an LLM executor and record the call count and latency in `metrics`."""
+    started = time.perf_counter()
+    # Calls in flight and when the first of them started; dropped once none is left
+    if not metrics.get("_llm_in_flight"):
+        metrics["_llm_busy_since"] = started
+    metrics["_llm_in_flight"] = metrics.get("_llm_in_flight", 0) + 1
+    try:
+        return await executor.ainvoke(inputs)
+    finally:
+        finished = time.perf_counter()
+        metrics["llm_calls"] = metrics.get("llm_calls", 0) + 1
+        metrics["llm_latency_ms_total"] = round(
+            metrics.get("llm_latency_ms_total", 0.0) + (finished - started) * 1000, 2
+        )
+        metrics["_llm_in_flight"] -= 1
+        if not metrics["_llm_in_flight"]:
+            busy_since = metrics.pop("_llm_busy_since")
+            del metrics["_llm_in_flight"]
+            metrics["llm_latency_ms"] = round(
+                metrics.get("llm_latency_ms", 0.0) + (finished - busy_since) * 1000, 2
+            )
+
+
+async def _extract_fields_batched(
+    user_message: str, pending: List[Dict[str, Any]], metrics: Dict[str, Any]
+) -> tuple[Dict[str, Dict[str, Any]], str]:
+    """
+    Extract values for all pending fields with one structured call per batch of
+    FIELD_BATCH_SIZE fields. Returns ({data_id: result}, follow-up message).
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    message = ""
+    for start in range(0, len(pending), FIELD_BATCH_SIZE):
+        # The model answers with data_id, which fields identified by field_id lack
+        batch = [{**f, "data_id": _field_id(f)} for f in pending[start:start + FIELD_BATCH_SIZE]]
+        response = await _timed_ainvoke(
+            batch_field_executor,
+            {"fields": json.dumps(batch), "user_message": user_message},
+            metrics,
+        )
+        parsed = _parse_response(response)
+        if "error" in parsed:
+            logger.warning("Batch field extraction failed", error=parsed["error"], fields_in_batch=len(batch))
+            continue
+        for item in parsed.get("fields", []):
+            if isinstance(item, dict) and item.get("data_id"):
+                results[item["data_id"]] = item
+        message = parsed.get("message") or message
+    return results, message
+
+
+async def _extract_field_single(
+    user_message: str, field: Dict[str, Any], metrics: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Extract the value for one field with the per-field executor."""
+    response = await _timed_ainvoke(
+        process_field_executor,
+        {
+            "current_field_details": field,
+            "data_id": _field_id(field),
+            "fieldLabel": field.get("fieldLabel"),
+            "fieldType": field.get("fieldType"),
+            "fieldValue": field.get("fieldValue", ""),
+            "is_required": field.get("is_required"),
+            "validation_message": field.get("validation_message", ""),
+            "options": field.get("options", []),
+            "user_message": user_message,
+        },
+        metrics,
+    )
+    form_data = _parse_response(response)
+    details = form_data.get("current_field_details") or {}
+    return {
+        "data_id": _field_id(field),
+        "fieldValue": details.get("fieldValue", ""),
+        "success": bool(form_data.get("success", False)),
+        "validation_message": details.get("validation_message") or form_data.get("message", ""),
+    }
+
+
+def _field_dependencies(field: Dict[str, Any]) -> List[str]:
+    """Return the data_ids a field declares it depends on via `depends_on`."""
+    depends_on = field.get("depends_on") or []
+    if isinstance(depends_on, str):
+        depends_on = [depends_on]
+    return [d for d in depends_on if d]
+
+
+async def _extract_fields_concurrent(
+    user_message: str, pending: List[Dict[str, Any]], metrics: Dict[str, Any]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Extract pending fields with per-field calls run in parallel, at most
+    FIELD_CONCURRENCY at a time.
+
+    Fields that declare `depends_on` are only attempted once every pending field
+    they depend on has been filled, so independent fields run in waves. Results
+    are keyed by data_id and merged by the caller in missing_fields order, which
+    keeps the outcome deterministic regardless of completion order.
+    """
+    semaphore = asyncio.Semaphore(max(1, FIELD_CONCURRENCY))
+    pending_ids = {_field_id(f) for f in pending}
+    results: Dict[str, Dict[str, Any]] = {}
+    blocked: set = set()
+
+    async def run_one(field):
+        async with semaphore:
+            return await _extract_field_single(user_message, field, metrics)
+
+    remaining = list(pending)
+    while remaining:
+        ready, waiting = [], []
+        for field in remaining:
+            deps = [d for d in _field_dependencies(field) if d in pending_ids]
+            if any(d in blocked for d in deps):
+                # A prerequisite could not be filled, so this field cannot be either
+                blocked.add(_field_id(field))
+            elif all(d in results for d in deps):
+                ready.append(field)
+            else:
+                waiting.append(field)
+        if not ready and waiting:
+            # Circular dependencies: attempt the rest together rather than stall
+            ready, waiting = waiting, []
+
+        wave = await asyncio.gather(*(run_one(f) for f in ready))
+        for field, result in zip(ready, wave):
+            results[_field_id(field)] = result
+            if not (result["success"] and validate_field_value(field, result["fieldValue"])[0]):
+                blocked.add(_field_id(field))
+        remaining = waiting
+    return results
+
+
+# Node 2: Process user input for the remaining missing fields
 async def process_field_input(state: FormFillerState) -> FormFillerState:
     """
-    Processes user input for a specific requested field. Loops until all fields are filled.
+    Extracts values for the remaining missing fields from the user message.
+
+    In "batch" mode (default) all pending fields are sent in a single call per
+    FIELD_BATCH_SIZE fields; in "sequential" mode each field is processed in turn
+    and the loop stops at the first field the user has not answered yet; in
+    "concurrent" mode the per-field calls run in parallel (see
+    _extract_fields_concurrent).
     """
     user_message = state["user_message"]
-    filled_fields = state.get("filled_fields", [])
-    form_fields = state.get("form_fields", [])
-    missing_fields = state.get("missing_fields", [])
+    form = FormState.from_state(state)
+    missing_fields = form.missing_fields()
     conversation_history = state.get("conversation_history", [])
-    current_field = state.get("current_field")
     thread_id = state.get("thread_id", str(uuid4()))
     response_message = state.get("response_message", "")
+    metrics = state.get("metrics") or _new_metrics()
 
-    # If no current_field or missing_fields, return state
-    if not current_field or not missing_fields:
-        user_message = state["user_message"]
-        filled_fields = state.get("filled_fields", [])
-        missing_fields = state.get("missing_fields", [])
-        conversation_history = state.get("conversation_history", [])
-        current_field = state.get("current_field")
-        thread_id = state.get("thread_id", str(uuid4()))
-
-        # If no current_field or missing_fields, return state
-        if not current_field or not missing_fields:
-            return {
-                **state,
-                "status": "completed" if not missing_fields else "awaiting_info",
-                "thread_id": thread_id,
-            }
-
-        # Always work on the current_field (assume it's a dict or list of dicts)
-        if isinstance(current_field, list):
-            field = current_field[0]
-        else:
-            field = current_field
-
-        response = await process_field_executor.ainvoke(
-            {
-                "current_field_details": field,
-                "data_id": field.get("data_id"),
-                "fieldLabel": field.get("fieldLabel"),
-                "fieldType": field.get("fieldType"),
-                "is_required": field.get("is_required"),
-                "validation_message": field.get("validation_message", ""),
-                "options": field.get("options", []),
-                "user_message": user_message
-            }
-        )
-
-        output_text = (response.get("output") if isinstance(response, dict) else None) or str(response)
-
-        try:
-            cleaned_str = ast.literal_eval(output_text)
-            form_data = json.loads(cleaned_str['text'])
-        except Exception:
-            form_data = {"status": "failed", "message": "Invalid input format."}
-
-        history = conversation_history.copy()
-        history.append({"role": "user", "content": user_message})
-
-        current_field_details_updated = form_data.get('current_field_details')
-        success = form_data.get('success', False)
-        if isinstance(current_field_details_updated, dict) and success:
-            # Always append, never overwrite
-            if filled_fields is None:
-                filled_fields = []
-            # Only add if not already present (by data_id)
-            existing_ids = {f.get('data_id') for f in filled_fields if isinstance(f, dict)}
-            if current_field_details_updated.get('data_id') not in existing_ids:
-                filled_fields.append(current_field_details_updated)
-            # Remove from missing_fields
-            missing_fields = [f for f in missing_fields if (f.get('data_id') if isinstance(f, dict) else f) != current_field_details_updated['data_id']]
-
-            # Filter missing_fields: remove any whose data_id exists in form_fields and fieldValue is not empty
-            filled_data_ids = set()
-            for ff in form_fields:
-                if isinstance(ff, dict) and ff.get('data_id'):
-                    if is_field_filled(ff.get('fieldValue')):
-                        filled_data_ids.add(ff['data_id'])
-            filtered_missing_fields = []
-            for f in missing_fields:
-                if isinstance(f, dict):
-                    if f.get('data_id') not in filled_data_ids:
-                        filtered_missing_fields.append(f)
-                else:
-                    if f not in filled_data_ids:
-                        filtered_missing_fields.append(f)
-            missing_fields = filtered_missing_fields
-
-            current_field = missing_fields[0] if missing_fields else None
-            status = "completed" if not missing_fields else "awaiting_info"
-            response_text = form_data.get("message", "")
-
-            # If more fields to fill, recursively call process_field_input
-            if current_field:
-                next_state = {
-                    **state,
-                    "filled_fields": filled_fields,
-                    "missing_fields": missing_fields,
-                    "current_field": current_field,
-                    "conversation_history": history,
-                    "status": status,
-                    "response": response_text,
-                    "thread_id": thread_id,
-                }
-                return await process_field_input(next_state)
-
-            return {
-                **state,
-                "filled_fields": filled_fields,
-                "form_fields": form_fields,
-                "missing_fields": missing_fields,
-                "current_field": current_field,
-                "conversation_history": history,
-                "status": status,
-                "response": response_text,
-                "thread_id": thread_id,
-            }
-        else:
-            # Not success, keep asking for correct info
-            response_text = form_data.get("message", "Please provide the correct information for the field.")
-            status = "awaiting_info"
-            history.append({"role": "assistant", "content": response_text})
-            return {
-                **state,
-                "conversation_history": history,
-                "status": status,
-                "response": response_text,
-                "thread_id": thread_id,
-            }
-    else:
+    # Only dict entries carry enough detail to be extracted
+    pending = [f for f in missing_fields if isinstance(f, dict) and _field_id(f)]
+    if not pending:
         return {
             **state,
             "status": "completed" if not missing_fields else "awaiting_info",
             "thread_id": thread_id,
+            "metrics": metrics,
         }
+
+    started = time.perf_counter()
+    follow_up = ""
+    results: Dict[str, Dict[str, Any]] = {}
+    if FIELD_MODE == "sequential":
+        for field in pending:
+            result = await _extract_field_single(user_message, field, metrics)
+            results[_field_id(field)] = result
+            if not result["success"]:
+                follow_up = result["validation_message"]
+                break
+    elif FIELD_MODE == "concurrent":
+        results = await _extract_fields_concurrent(user_message, pending, metrics)
+    else:
+        results, follow_up = await _extract_fields_batched(user_message, pending, metrics)
+
+    newly_filled = set()
+    for data_id, field in list(form.missing.items()):
+        result = results.get(data_id) if isinstance(field, dict) else None
+        if result is not None and result.get("success"):
+            ok, value, message = validate_field_value(field, result.get("fieldValue"))
+            if ok:
+                form.add_filled({**field, "fieldValue": value, "validation_message": ""})
+                newly_filled.add(data_id)
+                continue
+            form.annotate_missing(data_id, message)
+        elif result is not None and result.get("validation_message"):
+            form.annotate_missing(data_id, result["validation_message"])
+    remaining = form.missing_fields()
+
+    status = "completed" if not remaining else "awaiting_info"
+    if status == "completed":
+        response_message = "Is there anything else I can help with?"
+    elif newly_filled:
+        response_message = follow_up or remaining[0].get("validation_message") or response_message
+
+    history = list(conversation_history)
+    if newly_filled:
+        history.append({"role": "assistant", "content": response_message})
+        history = compact_history(history)
+
+    logger.info(
+        "Processed field input",
+        field_mode=FIELD_MODE,
+        pending=len(pending),
+        filled=len(newly_filled),
+        llm_calls=metrics["llm_calls"],
+        llm_latency_ms=metrics["llm_latency_ms"],
+        llm_latency_ms_total=metrics.get("llm_latency_ms_total", 0.0),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+
+    return {
+        **state,
+        "filled_fields": form.filled_fields(),
+        "missing_fields": remaining,
+        "current_field": remaining[0] if remaining else None,
+        "conversation_history": history,
+        "status": status,
+        "response_message": response_message,
+        "thread_id": thread_id,
+        "metrics": metrics,
+    }
+
 # Conditional edge function
 def route_next_step(state: FormFillerState) -> str:
     """
@@ -412,11 +477,21 @@ form_filler_graph.add_edge("analyze_form", "process_field_input")
 form_filler_graph.add_conditional_edges("process_field_input", route_next_step)
 # Remove this line: form_filler_graph.add_edge("end", END)
 
-# Compile the graph with checkpointing and human-in-the-loop support
-compiled_graph = form_filler_graph.compile(
-    checkpointer=checkpointer
-)
-print(compiled_graph.get_graph().draw_ascii())
+# The graph is compiled on first use because the checkpointer (see checkpointing.py)
+# may need the running event loop
+_compiled_graph = None
+_compile_lock = asyncio.Lock()
+
+async def get_compiled_graph():
+    """Return the form-filler graph compiled with the configured checkpointer."""
+    global _compiled_graph
+    if _compiled_graph is None:
+        async with _compile_lock:
+            if _compiled_graph is None:
+                _compiled_graph = form_filler_graph.compile(
+                    checkpointer=await create_checkpointer()
+                )
+    return _compiled_graph
 
 async def chat_analyze_form(state: FormFillerState) -> Dict[str, Any]:
     """
@@ -429,8 +504,9 @@ async def chat_analyze_form(state: FormFillerState) -> Dict[str, Any]:
     Returns:
         Initial state and response information
     """
-    thread_id = str(uuid4())
-    
+    # Reuse the client's thread_id so the checkpointer resumes the previous turn
+    thread_id = state.get("thread_id") or str(uuid4())
+
     # initial_state = {
     #     "user_message": state["user_message"],
     #     "form_fields": state["form_fields"],
@@ -445,9 +521,13 @@ async def chat_analyze_form(state: FormFillerState) -> Dict[str, Any]:
     # }
     
     config = {"configurable": {"thread_id": thread_id}}
+    # Metrics are reported per request, never carried over from a previous turn
+    state = {**state, "metrics": _new_metrics()}
 
     try:
+        compiled_graph = await get_compiled_graph()
         result = await compiled_graph.ainvoke(state, config)
+        logger.info("Form filler request completed", thread_id=thread_id, **(result.get("metrics") or {}))
  
         return {
             "thread_id": thread_id,
@@ -457,9 +537,88 @@ async def chat_analyze_form(state: FormFillerState) -> Dict[str, Any]:
             "form_fields": result["form_fields"],
             "missing_fields": result["missing_fields"],
             "current_field": result["current_field"],
-            "conversation_history": result["conversation_history"]
+            "conversation_history": result["conversation_history"],
+            "metrics": result.get("metrics"),
         }
     except Exception as e:
             print("LangGraph Error:", e)
             traceback.print_exc()
             return {"error": str(e), "traceback": traceback.format_exc()}
+
+
+async def chat_session_turn(
+    user_message: str,
+    thread_id: Optional[str] = None,
+    form_fields: Optional[List[Dict[str, Any]]] = None,
+    field_updates: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Runs one turn of the stateful session protocol.
+
+    The form lives in the checkpointer under `thread_id`, so after the first turn
+    the client only sends the new user message plus any fields it changed itself.
+    Only fields whose value changed during this turn are returned.
+
+    Args:
+        user_message: The new user message
+        thread_id: Session to resume; a new session is started when omitted
+        form_fields: Full form definition, required only to start (or replace) a session
+        field_updates: Partial field dicts keyed by data_id that the user edited directly
+
+    Raises:
+        KeyError: If the session is unknown and no form_fields were sent
+    """
+    compiled_graph = await get_compiled_graph()
+    previous: Dict[str, Any] = {}
+    if thread_id:
+        snapshot = await compiled_graph.aget_state({"configurable": {"thread_id": thread_id}})
+        previous = snapshot.values or {}
+    if not previous and form_fields is None:
+        raise KeyError(f"Unknown session '{thread_id}'. Send form_fields to start a session.")
+
+    form = FormState(form_fields if form_fields is not None else previous.get("form_fields", []))
+    # Fold in values filled during earlier turns, then the client's own edits
+    for filled in previous.get("filled_fields") or []:
+        data_id = _field_id(filled)
+        if data_id in form.fields:
+            form.update_field(data_id, {"fieldValue": filled.get("fieldValue")})
+    for update in field_updates or []:
+        data_id = _field_id(update)
+        if data_id:
+            form.update_field(data_id, update)
+
+    values_before = {data_id: f.get("fieldValue") for data_id, f in form.fields.items()}
+    state = {
+        "user_message": user_message,
+        "thread_id": thread_id or str(uuid4()),
+        "form_fields": form.form_fields(),
+        "filled_fields": form.fields_with_values(),
+        "missing_fields": [],
+    }
+    result = await chat_analyze_form(state)
+    if "error" in result:
+        return result
+
+    changed_fields = []
+    for filled in result.get("filled_fields") or []:
+        data_id = _field_id(filled)
+        if isinstance(filled, dict) and filled.get("fieldValue") != values_before.get(data_id):
+            changed_fields.append({**form.fields.get(data_id, {}), **filled})
+
+    current_field = result.get("current_field")
+    if isinstance(current_field, list):
+        current_field = current_field[0] if current_field else None
+    if isinstance(current_field, str):
+        # Missing entries can be bare field ids; answer with the field itself
+        current_field = form.fields.get(current_field, {"data_id": current_field})
+    return {
+        "thread_id": result["thread_id"],
+        "response_message": result["response_message"],
+        "status": result["status"],
+        "changed_fields": changed_fields,
+        "missing_field_ids": [
+            data_id for data_id in map(_field_id, result.get("missing_fields") or []) if data_id
+        ],
+        "current_field": current_field if isinstance(current_field, dict) else None,
+        "metrics": result.get("metrics"),
+    }
@@ -0,0 +1,125 @@
+"""
+Bounded conversation history for the form filler.
+
+conversation_history keeps the last FORM_FILLER_HISTORY_TURNS user/assistant turns
+verbatim. Older messages are folded into a single rolling summary entry at the
+front of the list. That entry is the cache: each call only folds the messages
+that fell out of the window since the last one, instead of re-summarizing the
+whole conversation. The summary plus the kept turns are trimmed to
+FORM_FILLER_HISTORY_TOKEN_BUDGET tokens, so the prompt stays the same size
+however long the session runs.
+"""
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+# User/assistant turns (pairs of messages) kept verbatim
+HISTORY_MAX_TURNS = int(os.environ.get("FORM_FILLER_HISTORY_TURNS", "4"))
+# Upper bound on the tokens of the summary plus the kept turns
+HISTORY_TOKEN_BUDGET = int(os.environ.get("FORM_FILLER_HISTORY_TOKEN_BUDGET", "1000"))
+# Characters kept per message once it is folded into the summary
+SUMMARY_LINE_CHARS = 200
+
+SUMMARY_PREFIX = "Summary of earlier conversation:"
+# Written by earlier versions of analyze_form; each one repeats the whole history
+LEGACY_SUMMARY_PREFIX = "Previous conversation:"
+
+_ROLE_LABELS = {"user": "User", "assistant": "Assistant"}
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # No tokenizer available (or its data cannot be fetched): use the length estimate below
+        return None
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """Token count of `text`, estimated as characters / 4 when tiktoken is unavailable."""
+    encoding = _encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text))
+
+
+def _message_line(entry: Dict[str, Any], max_chars: Optional[int] = None) -> str:
+    role = entry.get("role")
+    label = _ROLE_LABELS.get(role, str(role) if role else "Unknown")
+    content = " ".join(str(entry.get("content", "")).split())
+    if max_chars and len(content) > max_chars:
+        content = content[:max_chars - 3].rstrip() + "..."
+    return f"{label}: {content}"
+
+
+def is_summary(entry: Any) -> bool:
+    """True for system entries holding a (current or legacy) conversation summary."""
+    return (
+        isinstance(entry, dict)
+        and entry.get("role") == "system"
+        and str(entry.get("content", "")).startswith((SUMMARY_PREFIX, LEGACY_SUMMARY_PREFIX))
+    )
+
+
+def compact_history(
+    history: Optional[List[Dict[str, Any]]],
+    max_turns: Optional[int] = None,
+    token_budget: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Return `history` as at most one summary entry followed by the last
+    `max_turns` turns, within `token_budget` tokens.
+
+    Only the most recent current-format summary is kept. Legacy "Previous
+    conversation" entries are dropped because they only repeat the messages
+    around them. When over budget, the oldest summary lines go first, then the
+    oldest verbatim messages; the latest message is always kept.
+    """
+    max_turns = HISTORY_MAX_TURNS if max_turns is None else max_turns
+    token_budget = HISTORY_TOKEN_BUDGET if token_budget is None else token_budget
+
+    summary_lines: List[str] = []
+    messages: List[Dict[str, Any]] = []
+    for entry in history or []:
+        if not isinstance(entry, dict):
+            continue
+        if is_summary(entry):
+            content = str(entry.get("content", ""))
+            if content.startswith(SUMMARY_PREFIX):
+                summary_lines = [l for l in content[len(SUMMARY_PREFIX):].splitlines() if l.strip()]
+        elif entry.get("role") != "system":
+            messages.append(entry)
+
+    keep = max(0, max_turns * 2)
+    overflow, kept = (messages[:-keep], messages[-keep:]) if keep else (messages, [])
+    summary_lines.extend(_message_line(m, SUMMARY_LINE_CHARS) for m in overflow)
+
+    def total_tokens() -> int:
+        return sum(count_tokens(l) for l in summary_lines) + sum(count_tokens(_message_line(m)) for m in kept)
+
+    tokens = total_tokens()
+    while tokens > token_budget and (summary_lines or len(kept) > 1):
+        if summary_lines:
+            tokens -= count_tokens(summary_lines.pop(0))
+        else:
+            tokens -= count_tokens(_message_line(kept.pop(0)))
+
+    compacted = []
+    if summary_lines:
+        compacted.append({"role": "system", "content": "\n".join([SUMMARY_PREFIX, *summary_lines])})
+    compacted.extend(kept)
+    return compacted
+
+
+def render_history(history: Optional[List[Dict[str, Any]]]) -> str:
+    """Render a compacted history as prompt text, one message per line."""
+    lines = []
+    for entry in history or []:
+        if is_summary(entry):
+            lines.append(str(entry["content"]))
+        elif isinstance(entry, dict):
+            lines.append(_message_line(entry))
+    return "\n".join(lines) or "(none)"
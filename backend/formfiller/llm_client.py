@@ -1,42 +1,46 @@
 """
-Azure OpenAI LLM client and initialization logic for agentic flows.
+Azure OpenAI LLM client for the form filler.
+
+The client itself is provided by backend.core.llm so the whole backend shares one
+lazily created, pooled client per deployment.
 """
 import os
 from dotenv import load_dotenv
-from langchain_openai import AzureChatOpenAI
+from backend.core.config import settings
+from backend.core.llm import get_llm, get_llm_metrics
 
 load_dotenv()
 
-_llm_instance = None
+# Verbose LLMChain logging prints every rendered prompt. It only applies to the
+# LLMChain fallback (FORM_FILLER_STRUCTURED_OUTPUT=false); it is off by default in
+# production (settings.is_production) and can be forced either way with FORM_FILLER_CHAIN_VERBOSE.
+CHAIN_VERBOSE = os.environ.get(
+    "FORM_FILLER_CHAIN_VERBOSE", "false" if settings.is_production else "true"
+).lower() == "true"
 
-def get_llm():
-    """Lazy initialization of Azure OpenAI LLM client."""
-    global _llm_instance
-    if _llm_instance is None:
-        _llm_instance = AzureChatOpenAI(
-            azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
-            azure_deployment=os.environ["AZURE_OPENAI_DEPLOYMENT_NAME"],
-            openai_api_version="2024-12-01-preview",
-        )
-    return _llm_instance
+# Ask the model for function-calling output validated against the Pydantic models in
+# schemas.py; set to false for deployments without tool support to use plain-text JSON.
+STRUCTURED_OUTPUT = os.environ.get("FORM_FILLER_STRUCTURED_OUTPUT", "true").lower() == "true"
 
 # Backward compatibility proxy
 class ModuleLLM:
     def __getattr__(self, name):
+        # Introspection (e.g. LangGraph's compile) must not build the client at import
+        if name.startswith("__"):
+            raise AttributeError(name)
         return getattr(get_llm(), name)
-    
+
     def __call__(self, *args, **kwargs):
         return get_llm()(*args, **kwargs)
-    
+
     def __repr__(self):
         return f"ModuleLLM(proxy_for={get_llm().__class__.__name__})"
-    
+
     def __getstate__(self):
         return {}
-    
+
     def __setstate__(self, state):
         pass
 
 # Create a lazy-loading instance that behaves like the actual LLM
 llm = ModuleLLM()
-
@@ -0,0 +1,111 @@
+"""
+Fallback JSON extraction for LLM outputs in the form filler.
+
+Structured output (see agents/structured_output.py) returns parsed objects
+directly; this parser handles the plain-text path and structured calls whose
+output failed validation. It accepts text around the object (code fences,
+"Final Answer:" prefixes, trailing explanations), // comments and trailing
+commas, and Python-style dicts.
+"""
+import ast
+import json
+from typing import Any, Dict, Optional
+
+_decoder = json.JSONDecoder()
+# Opening braces tried before giving up, so prose full of "{" stays cheap
+MAX_CANDIDATES = 8
+
+
+def _balanced_object(text: str, start: int) -> Optional[str]:
+    """
+    Return the object starting at text[start] (a "{") up to its matching "}",
+    or None if it is never closed. Single pass: braces inside strings are ignored,
+    and // comments and trailing commas outside strings are dropped on the way.
+    """
+    out = []
+    depth = 0
+    quote = None
+    i, n = start, len(text)
+    while i < n:
+        ch = text[i]
+        if quote:
+            out.append(ch)
+            if ch == "\\" and i + 1 < n:
+                out.append(text[i + 1])
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+            out.append(ch)
+        elif ch == "/" and text.startswith("//", i):
+            newline = text.find("\n", i)
+            i = n if newline == -1 else newline
+            continue
+        elif ch in "}]":
+            # Drop a trailing comma before the closing bracket
+            j = len(out) - 1
+            while j >= 0 and out[j].isspace():
+                j -= 1
+            if j >= 0 and out[j] == ",":
+                del out[j]
+            out.append(ch)
+            if ch == "}":
+                depth -= 1
+                if depth == 0:
+                    return "".join(out)
+        else:
+            if ch == "{":
+                depth += 1
+            out.append(ch)
+        i += 1
+    return None
+
+
+def extract_json_from_output(output: str) -> Dict[str, Any]:
+    """
+    Extract the first JSON object from an LLM output.
+
+    Returns the parsed dict, or a dict with an "error" key (and the raw output)
+    when no object can be parsed.
+    """
+    output = (output or "").strip()
+    start = output.find("{")
+    if start == -1:
+        return {
+            "error": "Agent failed to complete analysis. No valid JSON found.",
+            "raw_output": output
+        }
+
+    last_error: Optional[Exception] = None
+    for _ in range(MAX_CANDIDATES):
+        # Fast path: well-formed JSON, whatever follows it
+        try:
+            parsed, _end = _decoder.raw_decode(output, start)
+            if isinstance(parsed, dict):
+                return parsed
+        except json.JSONDecodeError as e:
+            last_error = e
+
+        candidate = _balanced_object(output, start)
+        if candidate is not None:
+            try:
+                parsed = json.loads(candidate)
+            except json.JSONDecodeError:
+                # Python dict syntax (single quotes, True/None)
+                try:
+                    parsed = ast.literal_eval(candidate)
+                except Exception as e:
+                    parsed, last_error = None, e
+            if isinstance(parsed, dict):
+                return parsed
+
+        start = output.find("{", start + 1)
+        if start == -1:
+            break
+
+    return {
+        "error": "Failed to parse output as JSON or Python dict.",
+        "exception": str(last_error),
+        "raw_output": output
+    }
@@ -1,6 +1,4 @@
 from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from langchain_openai import ChatOpenAI
 
 # Define the template
 template = """
@@ -8,6 +6,7 @@ You are an assistant that helps fill in form data based on the inputs:
 - User message: {message}
 - Current form fields (JSON array): {formFields}
 - Search results (JSON array): {search_results}
+- Conversation so far: {history}
 
 CRITICAL INSTRUCTIONS FOR HANDLING FORM FIELDS:
 
@@ -63,6 +62,6 @@ IMPORTANT:
 """
 
 analyze_form_prompt = PromptTemplate(
-    input_variables=["message", "formFields", "search_results"],
+    input_variables=["message", "formFields", "search_results", "history"],
     template=template
 )
\ No newline at end of file
@@ -0,0 +1,42 @@
+from langchain.prompts import PromptTemplate
+
+batch_field_prompt = PromptTemplate.from_template(
+    """
+You are an intelligent form processor. You are given a list of form fields that still need a value
+and a single user message. Your job is to extract a value for EVERY field in the list from the
+user message in one pass.
+
+Pending fields (JSON array):
+{fields}
+
+User Message:
+"{user_message}"
+
+Instructions:
+1. For each pending field, extract the appropriate value from the user message for 'fieldValue'.
+2. For fields with "options", set 'fieldValue' to the EXACT "key" of the matching option.
+3. If the fieldType is "radio" and there are no options, valid values are typically "Yes" or "No".
+4. If a valid value is found, set 'success' to true.
+5. If not, leave 'fieldValue' as an empty string, set 'success' to false, and explain what is needed in 'validation_message'.
+6. Return exactly one entry per pending field, using the field's original 'data_id'.
+7. In 'message', write a concise question asking the user for the fields that are still missing,
+   or an empty string if every field was filled.
+
+⚠️ Output must be a **valid JSON** object.
+⚠️ Do NOT include triple backticks (```), markdown formatting, or explanations.
+⚠️ Only return the raw JSON.
+
+Return the output in this exact format:
+
+{{
+  "fields": [
+    {{
+      "data_id": "<data_id>",
+      "fieldValue": "<extracted_value_or_empty_string>",
+      "success": <true_or_false>,
+      "validation_message": "<reason this field could not be filled, or empty string>"
+    }}
+  ],
+  "message": "<concise follow-up question or empty string>"
+}}
+""")
@@ -0,0 +1,54 @@
+"""
+Pydantic models for the structured LLM outputs of the form-filler agents.
+
+The field names mirror the JSON formats requested by the prompts, so structured
+and plain-text results are handled the same way by the graph.
+"""
+from typing import Any, Dict, List, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Field
+
+FieldValue = Union[str, List[str], None]
+
+
+class AnalyzeFormResult(BaseModel):
+    """Result of the analyze_form agent."""
+    message: str = Field("", description="Concise response or clarifying question for the user")
+    formFields: Optional[List[Dict[str, Any]]] = Field(
+        None, description="Updated form fields with option keys as fieldValue"
+    )
+    filled_fields: List[Dict[str, Any]] = Field(
+        default_factory=list, description="Validated, completed fields with all original properties"
+    )
+    missing_fields: List[Union[Dict[str, Any], str]] = Field(
+        default_factory=list, description="Fields still missing or invalid, with a validation_message"
+    )
+
+
+class FieldDetails(BaseModel):
+    """Field echoed back by the process_field agent with its extracted value."""
+    model_config = ConfigDict(extra="allow")
+
+    data_id: str
+    fieldValue: FieldValue = Field("", description="Extracted value, or an empty string")
+    validation_message: str = ""
+
+
+class ProcessFieldResult(BaseModel):
+    """Result of the per-field process_field agent."""
+    current_field_details: FieldDetails
+    success: bool = False
+
+
+class BatchFieldItem(BaseModel):
+    """One field of a batch_field result."""
+    data_id: str
+    fieldValue: FieldValue = Field("", description="Exact option key or extracted value, or an empty string")
+    success: bool = False
+    validation_message: str = ""
+
+
+class BatchFieldResult(BaseModel):
+    """Result of the batch_field agent: one entry per pending field."""
+    fields: List[BatchFieldItem] = Field(default_factory=list)
+    message: str = Field("", description="Follow-up question for the fields still missing, or empty")
@@ -5,7 +5,6 @@ from typing import Optional, List, TypedDict
 
 from langchain.tools import tool
 from dotenv import load_dotenv
-from langchain_openai import AzureChatOpenAI
 from azure.core.exceptions import AzureError
 from azure.search.documents import SearchClient
 from azure.core.credentials import AzureKeyCredential
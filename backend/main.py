@@ -4,10 +4,16 @@ Main FastAPI application with POST endpoint backbone
 
 import os
 import logging
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from backend.formfiller.api import router as api_router
+from backend.formfiller.agents import warm_executors
+from backend.core.llm import get_llm_metrics
+from backend.formfiller.graph import get_compiled_graph
+from backend.formfiller.checkpointing import checkpoint_metrics, close_checkpointer
+from backend.search_indexer.jobs import JobError, get_job_manager, shutdown_job_manager
 from dotenv import load_dotenv
-from backend.search_indexer import web_crawler
 
 load_dotenv()
 
@@ -26,6 +32,27 @@ if not logging.getLogger().handlers:
     )
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm the form-filler executors and checkpointer so the first /api/chat request
+    does not pay for it. The search indexer is not touched here: its SDKs and
+    clients are loaded on the first /indexer request, keeping cold starts short.
+    """
+    try:
+        warm_executors()
+        logger.info("Form filler executors warmed")
+    except Exception as e:
+        # Missing Azure OpenAI settings should not stop health checks from answering
+        logger.warning("Could not warm form filler executors: %s", e)
+    # Compile the graph inside the running loop so async checkpointers can bind to it
+    await get_compiled_graph()
+    yield
+    await close_checkpointer()
+    # Stop a running indexing job cleanly; its finished sources are already checkpointed
+    await run_in_threadpool(shutdown_job_manager)
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="NR Agentic AI API",
@@ -33,7 +60,8 @@ app = FastAPI(
         "An agentic AI API built with FastAPI, LangGraph, and LangChain. "
         "Features intelligent form filling and multi-agent workflows."
     ),
-    version="0.1.1"
+    version="0.1.1",
+    lifespan=lifespan,
 )
 
 # Log app init once
@@ -50,16 +78,87 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "NR Agentic AI API"}
 
+@app.get("/metrics/llm")
+async def llm_metrics():
+    """In-flight and total Azure OpenAI requests per deployment"""
+    return get_llm_metrics()
+
+@app.get("/metrics/checkpoints")
+async def checkpoints_metrics():
+    """Thread count, serialized size and evictions of the form-filler checkpointer"""
+    return checkpoint_metrics()
+
 @app.get("/indexer")
-async def start_indexing():
-    web_crawler.start_indexing()
-    return {"message": "Indexing started"}
+async def start_indexing(dry_run: bool = False):
+    """
+    Start an incremental indexing job (see POST /indexer/jobs). With dry_run=true,
+    only report which blobs would be added, changed and removed according to the
+    index manifest.
+    """
+    if dry_run:
+        from backend.search_indexer import web_crawler
+
+        return await run_in_threadpool(web_crawler.start_indexing, dry_run=True)
+    job = _submit_indexing_job()
+    return {"message": "Indexing started", "job_id": job.id}
+
+
+def _submit_indexing_job(resume_job_id: str = None):
+    try:
+        if resume_job_id:
+            return get_job_manager().resume(resume_job_id)
+        return get_job_manager().submit()
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except JobError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@app.post("/indexer/jobs", status_code=202)
+async def create_indexing_job():
+    """Start an indexing job in the background; poll GET /indexer/jobs/{job_id} for progress"""
+    return _submit_indexing_job().as_dict()
+
+
+@app.get("/indexer/jobs")
+async def list_indexing_jobs():
+    """Recent indexing jobs, newest first"""
+    return [job.as_dict(include_result=False) for job in get_job_manager().list()]
+
+
+@app.get("/indexer/jobs/{job_id}")
+async def get_indexing_job(job_id: str):
+    """Status, per-stage progress and throughput of an indexing job, and its result once finished"""
+    try:
+        return get_job_manager().get(job_id).as_dict()
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.post("/indexer/jobs/{job_id}/cancel")
+async def cancel_indexing_job(job_id: str):
+    """Cancel a queued or running job; sources it finished stay indexed"""
+    try:
+        return get_job_manager().cancel(job_id).as_dict()
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except JobError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@app.post("/indexer/jobs/{job_id}/resume", status_code=202)
+async def resume_indexing_job(job_id: str):
+    """Start a new job that continues from the manifest checkpoint of a cancelled or failed job"""
+    return _submit_indexing_job(resume_job_id=job_id).as_dict()
 
 @app.get("/indexer/test")
 async def test_index_single_file():
     """Test endpoint to index the BCeID file specifically"""
+    from backend.search_indexer import web_crawler
+
     try:
-        result = web_crawler.index_single_file(
+        result = await run_in_threadpool(
+            web_crawler.index_single_file,
             blob_name="BCeIDTypesofBCeID.pdf",
             file_url="https://cssaidevhub27077213787.blob.core.windows.net/source-docs-posse/BCeIDTypesofBCeID.pdf"
         )
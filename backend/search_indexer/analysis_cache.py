@@ -0,0 +1,230 @@
+"""
+Persistent cache of Document Intelligence results.
+
+Entries are keyed by the SHA-256 of the document bytes, the model id and the
+output content format, so a byte-identical file is never sent to Document
+Intelligence twice, even after its blob is renamed or re-uploaded, or the index
+manifest is lost. Each entry stores the markdown content, the page count and
+the analysis time, gzip-compressed as JSON.
+
+Backends keep the total size under `max_bytes`, evicting least recently used
+entries first:
+- DiskCacheBackend: files under a local directory; a hit refreshes the mtime
+- BlobCacheBackend: blobs in a container; a hit rewrites the blob metadata,
+  which refreshes Last-Modified
+
+AnalysisCacheStats counts hits and misses, and the pages, seconds and cost
+that hits saved (pages x the model's price per 1000 pages).
+"""
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+from backend.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+ENTRY_SUFFIX = ".json.gz"
+
+
+def analysis_cache_key(digest: str, model_id: str, content_format: str) -> str:
+    """Key for a document whose SHA-256 hex digest is `digest` (see manifest.content_hash)."""
+    return f"{model_id}/{content_format}/{digest}"
+
+
+@dataclass
+class AnalysisCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    pages_saved: int = 0
+    seconds_saved: float = 0.0
+
+    def since(self, earlier: "AnalysisCacheStats") -> "AnalysisCacheStats":
+        return AnalysisCacheStats(**{
+            name: value - getattr(earlier, name) for name, value in asdict(self).items()
+        })
+
+    def as_dict(self, price_per_1000_pages: float = 0.0) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            **asdict(self),
+            "seconds_saved": round(self.seconds_saved, 1),
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "cost_saved": round(self.pages_saved * price_per_1000_pages / 1000, 4),
+        }
+
+
+class DiskCacheBackend:
+    """Entries as files under `directory`, at most `max_bytes` in total."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total: Optional[int] = None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, *key.split("/")) + ENTRY_SUFFIX
+
+    def load(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            return None
+
+    def store(self, key: str, data: bytes) -> int:
+        """Write an entry; returns the number of entries evicted to make room."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".entry-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        with self._lock:
+            total = self._scan_total() if self._total is None else self._total
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            self._total = total - previous + len(data)
+            return self._evict() if self._total > self.max_bytes else 0
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(ENTRY_SUFFIX):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    yield path, stat.st_size, stat.st_mtime
+
+    def _scan_total(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> int:
+        evicted = 0
+        for path, size, _ in sorted(self._entries(), key=lambda entry: entry[2]):
+            if self._total <= self.max_bytes:
+                break
+            os.remove(path)
+            self._total -= size
+            evicted += 1
+        return evicted
+
+
+class BlobCacheBackend:
+    """Entries as blobs in a container, at most `max_bytes` in total."""
+
+    def __init__(self, container_client, max_bytes: int):
+        self.container_client = container_client
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total: Optional[int] = None
+
+    def load(self, key: str) -> Optional[bytes]:
+        from azure.core.exceptions import ResourceNotFoundError
+
+        blob = self.container_client.get_blob_client(key + ENTRY_SUFFIX)
+        try:
+            data = blob.download_blob().readall()
+        except ResourceNotFoundError:
+            return None
+        try:
+            # Refreshes Last-Modified, which eviction orders by
+            blob.set_blob_metadata({"last_access": str(int(time.time()))})
+        except Exception as e:
+            logger.debug("Could not refresh analysis cache entry", key=key, error=str(e))
+        return data
+
+    def store(self, key: str, data: bytes) -> int:
+        from azure.core.exceptions import ResourceExistsError
+
+        with self._lock:
+            if self._total is None:
+                try:
+                    self.container_client.create_container()
+                except ResourceExistsError:
+                    pass
+                self._total = sum(blob.size for blob in self.container_client.list_blobs())
+        self.container_client.upload_blob(key + ENTRY_SUFFIX, data, overwrite=True)
+        with self._lock:
+            self._total += len(data)
+            return self._evict() if self._total > self.max_bytes else 0
+
+    def _evict(self) -> int:
+        evicted = 0
+        blobs = sorted(self.container_client.list_blobs(), key=lambda blob: blob.last_modified)
+        self._total = sum(blob.size for blob in blobs)
+        for blob in blobs:
+            if self._total <= self.max_bytes:
+                break
+            self.container_client.delete_blob(blob.name)
+            self._total -= blob.size
+            evicted += 1
+        return evicted
+
+
+class AnalysisCache:
+    """Document Intelligence results by document hash, model id and content format."""
+
+    def __init__(self, backend, model_id: str, content_format: str, price_per_1000_pages: float = 0.0):
+        self.backend = backend
+        self.model_id = model_id
+        self.content_format = content_format
+        self.price_per_1000_pages = price_per_1000_pages
+        self.stats = AnalysisCacheStats()
+        self._lock = threading.Lock()
+
+    def key(self, digest: str) -> str:
+        return analysis_cache_key(digest, self.model_id, self.content_format)
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Return the cached {"content", "pages", "seconds"} for the document's SHA-256, or None."""
+        key = self.key(digest)
+        try:
+            raw = self.backend.load(key)
+            entry = json.loads(gzip.decompress(raw)) if raw is not None else None
+        except Exception as e:
+            # A broken or unreachable cache only costs a fresh analysis
+            logger.warning("Could not read analysis cache entry", key=key, error=str(e))
+            entry = None
+        with self._lock:
+            if entry is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+                self.stats.pages_saved += entry.get("pages", 0)
+                self.stats.seconds_saved += entry.get("seconds", 0.0)
+        return entry
+
+    def put(self, digest: str, content: str, pages: int, seconds: float) -> None:
+        key = self.key(digest)
+        entry = {
+            "content": content,
+            "pages": pages,
+            "seconds": round(seconds, 3),
+            "model_id": self.model_id,
+            "content_format": self.content_format,
+            "cached_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        try:
+            evicted = self.backend.store(key, gzip.compress(json.dumps(entry).encode("utf-8")))
+        except Exception as e:
+            logger.warning("Could not write analysis cache entry", key=key, error=str(e))
+            return
+        if evicted:
+            with self._lock:
+                self.stats.evictions += evicted
+
+    def snapshot(self) -> AnalysisCacheStats:
+        with self._lock:
+            return AnalysisCacheStats(**asdict(self.stats))
+
+    def report(self, stats: AnalysisCacheStats) -> Dict[str, Any]:
+        return stats.as_dict(self.price_per_1000_pages)
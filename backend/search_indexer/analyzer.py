@@ -0,0 +1,217 @@
+"""
+Concurrent Document Intelligence analysis.
+
+An analysis is a long-running operation: one POST submits the document, then
+the client polls until the result is ready, often for tens of seconds on large
+PDFs. The sync client spends a thread on every poll loop. DocumentAnalyzer
+instead runs the aio DocumentIntelligenceClient on one background event loop,
+so the pollers of all in-flight analyses are multiplexed on a single thread.
+
+Analyses are capped at `max_in_flight`, and every HTTP attempt goes through a
+token bucket: one for submissions (POST) and one for polls (GET), sized to the
+service's per-second limits. 429s are retried by the SDK's retry policy, which
+honours Retry-After. Pipeline threads call `analyze()`, which blocks only the
+caller until that document's result is ready.
+
+Documents can be passed as bytes, which are base64-encoded into a JSON request,
+or as a binary file object, which is sent as the raw request body and streamed
+from the file, so large documents never need to be held in memory.
+"""
+import asyncio
+import io
+import threading
+import time
+from dataclasses import dataclass
+from typing import IO, Any, Callable, Dict, Optional, Union
+
+from backend.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Output format requested from the service; part of the analysis cache key
+CONTENT_FORMAT = "markdown"
+
+
+@dataclass
+class AnalysisResult:
+    content: str
+    pages: int
+    seconds: float
+
+
+class AsyncRateLimiter:
+    """Token bucket for coroutines; a rate of 0 disables it."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class _FileBody(io.RawIOBase):
+    """
+    Request body over a seekable binary file. The retry policy rewinds it between
+    attempts; the copy kept in the retry history is the same object rather than a
+    deep copy of the file; and closing it leaves the file to its owner.
+    """
+
+    def __init__(self, file: IO[bytes]):
+        self._file = file
+        self._start = file.tell()
+        self.size = file.seek(0, io.SEEK_END) - self._start
+        file.seek(self._start)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._file.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def close(self) -> None:
+        pass
+
+    def __deepcopy__(self, memo) -> "_FileBody":
+        return self
+
+
+def _rate_limit_policy(submit: AsyncRateLimiter, poll: AsyncRateLimiter):
+    from azure.core.pipeline.policies import AsyncHTTPPolicy
+
+    class RateLimitPolicy(AsyncHTTPPolicy):
+        """Waits for a token before each HTTP attempt, including SDK retries."""
+
+        async def send(self, request):
+            limiter = submit if request.http_request.method == "POST" else poll
+            await limiter.acquire()
+            return await self.next.send(request)
+
+    return RateLimitPolicy()
+
+
+class DocumentAnalyzer:
+    """
+    Runs Document Intelligence analyses on a background event loop, at most
+    `max_in_flight` at a time. `client_factory(**kwargs)` builds the aio
+    DocumentIntelligenceClient, passing kwargs through to it.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[..., Any],
+        model_id: str = "prebuilt-read",
+        max_in_flight: int = 8,
+        submit_rate: float = 15.0,
+        poll_rate: float = 50.0,
+        polling_interval: Optional[float] = None,
+    ):
+        self.client_factory = client_factory
+        self.model_id = model_id
+        self.max_in_flight = max_in_flight
+        self.polling_interval = polling_interval
+        self._submit_limiter = AsyncRateLimiter(submit_rate)
+        self._poll_limiter = AsyncRateLimiter(poll_rate)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._start_lock = threading.Lock()
+        self.stats = {"in_flight": 0, "peak_in_flight": 0, "completed": 0, "failed": 0, "busy_seconds": 0.0}
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="document-analyzer", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def analyze(self, data: Union[bytes, IO[bytes]], timeout: Optional[float] = None) -> AnalysisResult:
+        """Analyze `data` (bytes or a binary file object) into markdown; blocks the calling thread only."""
+        future = asyncio.run_coroutine_threadsafe(self.analyze_async(data), self._ensure_loop())
+        return future.result(timeout)
+
+    async def analyze_async(self, data: Union[bytes, IO[bytes]]) -> AnalysisResult:
+        from azure.ai.documentintelligence.models import AnalyzeDocumentRequest, DocumentContentFormat
+
+        if self._client is None:
+            # Built inside the loop so its HTTP session binds to it
+            self._client = self.client_factory(
+                per_retry_policies=[_rate_limit_policy(self._submit_limiter, self._poll_limiter)]
+            )
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        async with self._semaphore:
+            stats = self.stats
+            stats["in_flight"] += 1
+            stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+            started = time.monotonic()
+            try:
+                kwargs = {"polling_interval": self.polling_interval} if self.polling_interval else {}
+                if isinstance(data, (bytes, bytearray)):
+                    body = AnalyzeDocumentRequest(bytes_source=bytes(data))
+                else:
+                    body = _FileBody(data)
+                    kwargs["content_type"] = "application/octet-stream"
+                    kwargs["headers"] = {"Content-Length": str(body.size)}
+                poller = await self._client.begin_analyze_document(
+                    self.model_id,
+                    body,
+                    output_content_format=DocumentContentFormat.MARKDOWN,
+                    **kwargs,
+                )
+                result = await poller.result()
+                stats["completed"] += 1
+                return AnalysisResult(
+                    content=result.content or "",
+                    pages=len(result.pages or []),
+                    seconds=time.monotonic() - started,
+                )
+            except Exception:
+                stats["failed"] += 1
+                raise
+            finally:
+                stats["in_flight"] -= 1
+                stats["busy_seconds"] += time.monotonic() - started
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self.stats, "busy_seconds": round(self.stats["busy_seconds"], 3)}
+
+    def close(self) -> None:
+        """Close the client and stop the event loop."""
+        with self._start_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.close(), loop).result()
+            self._client = None
+        loop.call_soon_threadsafe(loop.stop)
@@ -0,0 +1,380 @@
+"""
+Structure-aware chunking of Document Intelligence markdown.
+
+RecursiveCharacterTextSplitter cut documents every 512 characters, wherever
+that fell: mid-table, mid-sentence, and into many tiny chunks, each of which
+costs an embedding and an index document. MarkdownChunker instead follows the
+structure in the markdown that Document Intelligence returns:
+
+- the text is parsed in one pass into headings, paragraphs, tables (HTML or
+  pipe) and figures; page header, footer and page number comments are dropped,
+  and page breaks only advance the page number
+- blocks are packed greedily into chunks of up to `max_tokens`, breaking at
+  headings once a chunk has `min_tokens`, so short sections are merged with
+  the next one instead of becoming chunks of their own
+- a table that fits is never split; a larger one is split between rows, and
+  every piece repeats the header row; a row too large for a piece is split
+  between cells, and a cell too large for one into token windows
+- a paragraph longer than `max_tokens` is split at sentence ends, falling back
+  to token windows that overlap by `overlap_tokens`
+- a chunk that continues a section starts with that section's headings, and
+  records them as `section` metadata along with the `page` it starts on
+
+Tokens are counted with tiktoken (cl100k_base, as used by the embedding models),
+with every block of a document encoded in one batch; without tiktoken the
+count is estimated as characters / 4. Plain text (e.g. web pages) has no
+markup and is chunked by paragraph.
+"""
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from langchain.schema import Document
+
+CHUNKER_VERSION = 3
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_COMMENT = re.compile(r"^<!--\s*(\w+)")
+_TABLE_ROW = re.compile(r"<tr\b.*?</tr>", re.S | re.I)
+_TABLE_HEADER = re.compile(r"<th\b", re.I)
+_TABLE_CELL = re.compile(r"(<t[dh]\b[^>]*>)(.*?)(</t[dh]>)", re.S | re.I)
+_SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+")
+# Between the parts (headings, blocks) of a chunk
+_PART_SEPARATOR = "\n\n"
+
+# Block kinds
+HEADING = "heading"
+TEXT = "text"
+TABLE = "table"
+FIGURE = "figure"
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # No tokenizer available (or its data cannot be fetched): use the length estimate below
+        return None
+
+
+def count_tokens_batch(texts: List[str]) -> List[int]:
+    """Token counts of `texts`, encoded in one batch; characters / 4 without tiktoken."""
+    encoding = _encoding()
+    if encoding is None:
+        return [(len(text) + 3) // 4 for text in texts]
+    return [len(tokens) for tokens in encoding.encode_ordinary_batch(texts)]
+
+
+@dataclass
+class Block:
+    kind: str
+    text: str
+    page: int
+    # Headings above the block, outermost first ("# Title", "## Section", ...)
+    path: List[str] = field(default_factory=list)
+    tokens: int = 0
+
+
+@dataclass
+class Chunk:
+    text: str
+    tokens: int
+    page: int
+    section: str
+
+
+def parse_blocks(text: str) -> List[Block]:
+    """Split Document Intelligence markdown into headings, paragraphs, tables and figures."""
+    blocks: List[Block] = []
+    path: List[str] = []
+    page = 1
+    lines = text.splitlines()
+    i = 0
+    paragraph: List[str] = []
+
+    def flush_paragraph():
+        if paragraph:
+            blocks.append(Block(TEXT, "\n".join(paragraph), page, list(path)))
+            paragraph.clear()
+
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+        if not stripped:
+            flush_paragraph()
+            i += 1
+            continue
+        comment = _COMMENT.match(stripped)
+        if comment:
+            flush_paragraph()
+            if comment.group(1) == "PageBreak":
+                page += 1
+            # PageHeader, PageFooter and PageNumber repeat on every page: noise for search
+            i += 1
+            continue
+        heading = _HEADING.match(stripped)
+        if heading:
+            flush_paragraph()
+            level = len(heading.group(1))
+            path = [h for h in path if len(h) - len(h.lstrip("#")) < level] + [stripped]
+            blocks.append(Block(HEADING, stripped, page, list(path)))
+            i += 1
+            continue
+        for kind, start, end in ((TABLE, "<table", "</table>"), (FIGURE, "<figure", "</figure>")):
+            if stripped.lower().startswith(start):
+                flush_paragraph()
+                j = i
+                while j < len(lines) - 1 and end not in lines[j].lower():
+                    j += 1
+                blocks.append(Block(kind, "\n".join(lines[i:j + 1]).strip(), page, list(path)))
+                i = j + 1
+                break
+        else:
+            if stripped.startswith("|"):
+                flush_paragraph()
+                j = i
+                while j + 1 < len(lines) and lines[j + 1].strip().startswith("|"):
+                    j += 1
+                blocks.append(Block(TABLE, "\n".join(lines[i:j + 1]).strip(), page, list(path)))
+                i = j + 1
+            else:
+                paragraph.append(line.rstrip())
+                i += 1
+    flush_paragraph()
+    return blocks
+
+
+def _split_table(block: Block, max_tokens: int, overlap_tokens: int) -> List[str]:
+    """Split a table between rows into pieces of up to `max_tokens`, repeating the header row."""
+    if block.text.startswith("|"):
+        rows = block.text.splitlines()
+        # Header line plus its |---| separator
+        header_rows = 2 if len(rows) > 1 and set(rows[1].replace("|", "").strip()) <= set("-: ") else 1
+        header, body, wrap = "\n".join(rows[:header_rows]), rows[header_rows:], ("", "")
+    else:
+        rows = _TABLE_ROW.findall(block.text)
+        if not rows:
+            return _token_windows(block.text, max_tokens, overlap_tokens)
+        has_header = bool(_TABLE_HEADER.search(rows[0]))
+        header = rows[0] if has_header else ""
+        body = rows[1:] if has_header else rows
+        wrap = ("<table>", "</table>")
+    # Every piece is top, its rows and bottom joined by "\n"; a row is counted with the "\n" before it
+    top = "\n".join(filter(None, [wrap[0], header]))
+    bottom = f"\n{wrap[1]}" if wrap[1] else ""
+    top_tokens, bottom_tokens = count_tokens_batch([top, bottom])
+    if header and top_tokens + bottom_tokens > max_tokens // 2:
+        # A header row too large to repeat in every piece is only in the first one
+        top, body = wrap[0], [header] + body
+        top_tokens = count_tokens_batch([top])[0]
+    budget = max(1, max_tokens - top_tokens - bottom_tokens)
+    sized = []
+    for row, tokens in zip(body, count_tokens_batch([f"\n{row}" for row in body])):
+        if tokens <= budget:
+            sized.append((row, tokens))
+        else:
+            parts = _split_row(row, budget - 1, overlap_tokens)
+            sized.extend(zip(parts, count_tokens_batch([f"\n{part}" for part in parts])))
+    pieces, current, size = [], [], 0
+    for row, tokens in sized:
+        if current and size + tokens > budget:
+            pieces.append(current)
+            current, size = [], 0
+        current.append(row)
+        size += tokens
+    if current:
+        pieces.append(current)
+    return ["\n".join(filter(None, [top, *piece])) + bottom for piece in pieces]
+
+
+def _split_row(row: str, max_tokens: int, overlap_tokens: int) -> List[str]:
+    """Split a table row between cells into rows of up to `max_tokens`; a cell larger than
+    that becomes token windows, each in a copy of the cell."""
+    if row.startswith("|"):
+        cells = [("| ", cell.strip(), " ") for cell in row.strip().strip("|").split("|")]
+        wrap = ("", "|")
+    else:
+        cells = _TABLE_CELL.findall(row)
+        wrap = ("<tr>", "</tr>")
+    if not cells:
+        return _token_windows(row, max_tokens, overlap_tokens)
+    wrap_tokens, *tag_tokens = count_tokens_batch(["".join(wrap)] + [start + end for start, _, end in cells])
+    budget = max(1, max_tokens - wrap_tokens)
+    split_cells = []
+    for (start, text, end), tokens in zip(cells, tag_tokens):
+        limit = max(1, budget - tokens)
+        split_cells.extend(start + part + end for part in _token_windows(text, limit, min(overlap_tokens, limit // 2)))
+    rows, current, size = [], [], 0
+    for cell, tokens in zip(split_cells, count_tokens_batch(split_cells)):
+        if current and size + tokens > budget:
+            rows.append(current)
+            current, size = [], 0
+        current.append(cell)
+        size += tokens
+    if current:
+        rows.append(current)
+    return [wrap[0] + "".join(cells) + wrap[1] for cells in rows]
+
+
+def _split_text(text: str, max_tokens: int, overlap_tokens: int) -> List[str]:
+    """Split a paragraph at sentence ends; sentences longer than `max_tokens` become token windows."""
+    sentences = _SENTENCE_END.split(text)
+    # A sentence after the first of a piece is counted with the space that joins it
+    counts = count_tokens_batch(sentences + [" " + sentence for sentence in sentences])
+    pieces, current, size = [], [], 0
+    for sentence, tokens, joined in zip(sentences, counts, counts[len(sentences):]):
+        if tokens > max_tokens:
+            if current:
+                pieces.append(" ".join(current))
+                current, size = [], 0
+            pieces.extend(_token_windows(sentence, max_tokens, overlap_tokens))
+            continue
+        if current and size + joined > max_tokens:
+            pieces.append(" ".join(current))
+            current, size = [], 0
+        size += joined if current else tokens
+        current.append(sentence)
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def _token_windows(text: str, max_tokens: int, overlap_tokens: int) -> List[str]:
+    step = max(1, max_tokens - overlap_tokens)
+    encoding = _encoding()
+    if encoding is None:
+        size, stride = max_tokens * 4, step * 4
+        return [text[i:i + size] for i in range(0, max(1, len(text) - overlap_tokens * 4), stride)]
+    tokens = encoding.encode_ordinary(text)
+    return [encoding.decode(tokens[i:i + max_tokens]) for i in range(0, max(1, len(tokens) - overlap_tokens), step)]
+
+
+class MarkdownChunker:
+    """Chunks Document Intelligence markdown along its structure; see the module docstring."""
+
+    def __init__(self, max_tokens: int = 512, min_tokens: int = 128, overlap_tokens: int = 64):
+        self.max_tokens = max_tokens
+        self.min_tokens = min(min_tokens, max_tokens)
+        self.overlap_tokens = min(overlap_tokens, max_tokens // 2)
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies the chunking, so sources are re-chunked when it changes."""
+        return f"markdown-v{CHUNKER_VERSION}:{self.max_tokens}:{self.min_tokens}:{self.overlap_tokens}"
+
+    def _units(self, blocks: List[Block], context, separator: int) -> List[Block]:
+        """Blocks with oversized tables and paragraphs split, leaving room for their headings."""
+        units: List[Block] = []
+        for block in blocks:
+            if block.tokens <= self.max_tokens or block.kind == HEADING:
+                units.append(block)
+                continue
+            limit = max(self.max_tokens // 2, self.max_tokens - context(block.path)[1] - separator)
+            if block.kind == TABLE:
+                pieces = _split_table(block, limit, self.overlap_tokens)
+            else:
+                pieces = _split_text(block.text, limit, self.overlap_tokens)
+            for piece, tokens in zip(pieces, count_tokens_batch(pieces)):
+                units.append(Block(block.kind, piece, block.page, block.path, tokens))
+        return units
+
+    def split_text(self, text: str) -> List[Chunk]:
+        blocks = parse_blocks(text)
+        for block, tokens in zip(blocks, count_tokens_batch([b.text for b in blocks])):
+            block.tokens = tokens
+        separator = count_tokens_batch([_PART_SEPARATOR])[0]
+        contexts: Dict[tuple, tuple] = {}
+
+        def context(path: List[str]) -> tuple:
+            """(heading lines, tokens) repeated at the top of a chunk in the section at `path`."""
+            key = tuple(path)
+            if key not in contexts:
+                lines = "\n".join(path)
+                contexts[key] = (lines, count_tokens_batch([lines])[0] if lines else 0)
+            return contexts[key]
+
+        chunks: List[Chunk] = []
+        parts: List[str] = []
+        size = 0
+        page = 1
+        # Path of the chunk's first content block, once it has one
+        section: Optional[List[str]] = None
+        # Headings after the chunk's last content block
+        tail: List[Block] = []
+
+        def fits(tokens: int) -> bool:
+            return size + (separator if parts else 0) + tokens <= self.max_tokens
+
+        def add(text: str, tokens: int) -> None:
+            nonlocal size
+            size += (separator if parts else 0) + tokens
+            parts.append(text)
+
+        def repeated(unit: Block, path: List[str]) -> List[str]:
+            """The headings of `path` that a chunk starting with `unit` repeats at its top."""
+            lines, tokens = context(path)
+            return path if lines and tokens + separator + unit.tokens <= self.max_tokens else []
+
+        def start(unit: Block, path: List[str]) -> None:
+            nonlocal page
+            page = unit.page
+            if repeated(unit, path):
+                add(*context(path))
+
+        def flush(carried: List[str] = ()) -> None:
+            """Emits the chunk, less the trailing headings the next chunk repeats (`carried`)."""
+            nonlocal parts, size, section
+            if section is not None:
+                while tail and tail[-1].text in carried:
+                    parts.pop()
+                    size -= separator + tail.pop().tokens
+                chunks.append(Chunk(_PART_SEPARATOR.join(parts), size, page, " > ".join(h.lstrip("# ") for h in section)))
+            parts, size, section = [], 0, None
+            tail.clear()
+
+        for unit in self._units(blocks, context, separator):
+            if unit.kind == HEADING:
+                if size >= self.min_tokens or not fits(unit.tokens):
+                    flush(repeated(unit, unit.path[:-1]))
+                if not parts:
+                    # Headings above this one come first
+                    start(unit, unit.path[:-1])
+                if section is not None:
+                    tail.append(unit)
+                add(unit.text, unit.tokens)
+                continue
+            if parts and not fits(unit.tokens):
+                if section is None:
+                    # Only headings so far: the block starts a new chunk that repeats them
+                    parts, size = [], 0
+                else:
+                    flush(repeated(unit, unit.path))
+            if not parts:
+                # A continuation of its section: repeat the section's headings
+                start(unit, unit.path)
+            if section is None:
+                section = unit.path
+            add(unit.text, unit.tokens)
+            tail.clear()
+        if section is None and parts and not chunks:
+            # A document of headings only
+            section = []
+        flush()
+        return chunks
+
+    def split_documents(self, documents: List["Document"]) -> List["Document"]:
+        """Chunk each document, copying its metadata and adding `section` and `page`."""
+        from langchain.schema import Document
+
+        result = []
+        for document in documents:
+            for chunk in self.split_text(document.page_content):
+                metadata: Dict[str, Any] = {**document.metadata, "page": chunk.page}
+                if chunk.section:
+                    metadata["section"] = chunk.section
+                result.append(Document(page_content=chunk.text, metadata=metadata))
+        return result
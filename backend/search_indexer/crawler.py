@@ -0,0 +1,499 @@
+"""
+Async web crawler for the pages indexed alongside the blobs.
+
+Starting from seed URLs, the crawler follows links up to `max_depth` hops, staying
+within `allowed_prefixes` and stopping at `max_pages` URLs. Pages are fetched
+concurrently on one event loop with httpx, and politely:
+- robots.txt is honoured per host, including its Crawl-delay
+- every host has its own token bucket (`host_rate` requests per second) and at
+  most `host_concurrency` requests in flight
+- 429 and 5xx responses are retried after Retry-After or an exponential backoff
+
+Pages seen on an earlier run (`known`: url -> the validators a page recorded)
+are fetched with If-None-Match / If-Modified-Since. A 304 costs no body, and
+the page's recorded links keep the crawl going past it.
+
+HTML is converted to markdown (headings, paragraphs, list items and tables) so
+the structure-aware chunker can split it like analyzed documents. Pages whose
+64-bit SimHash is within `duplicate_distance` bits of a page already crawled in
+the run (print views, mirrored URLs, session parameters) are reported as
+duplicates instead of being indexed twice.
+
+`iter_pages()` runs the crawl on a background event loop and yields pages as
+they are fetched, through a bounded buffer, so a slow consumer (the indexing
+pipeline) back-pressures the crawl.
+"""
+import asyncio
+import hashlib
+import queue
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+from urllib.parse import urldefrag, urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+from backend.core.logging import get_logger
+from backend.search_indexer.analyzer import AsyncRateLimiter
+
+if TYPE_CHECKING:
+    from langchain.schema import Document
+
+logger = get_logger(__name__)
+
+# Page statuses
+FETCHED = "fetched"
+NOT_MODIFIED = "not_modified"
+DUPLICATE = "duplicate"
+GONE = "gone"
+DISALLOWED = "disallowed"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Links to these are never fetched: they are not HTML pages
+_BINARY_EXTENSIONS = (
+    ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".zip", ".jpg", ".jpeg", ".png",
+    ".gif", ".svg", ".mp4", ".mp3", ".css", ".js", ".ico", ".xml", ".json",
+)
+_SHINGLE = re.compile(r"\w+")
+_HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+_BLOCKS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "details", "div", "dl", "dt",
+    "figcaption", "figure", "hr", "li", "main", "ol", "p", "pre", "section", "summary", "ul",
+}
+_DROPPED = ["script", "style", "noscript", "template", "svg", "nav", "header", "footer", "form", "iframe"]
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """64-bit SimHash of the text's word shingles; similar texts differ in few bits."""
+    words = _SHINGLE.findall(text.lower())
+    shingles = Counter(
+        " ".join(words[i:i + shingle_size]) for i in range(max(1, len(words) - shingle_size + 1))
+    )
+    weights = [0] * 64
+    for shingle, count in shingles.items():
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += count if value >> bit & 1 else -count
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+class SimHashIndex:
+    """
+    Near-duplicate lookup: the 64 bits are split into `distance + 1` bands, so two
+    hashes within `distance` bits of each other share at least one band exactly.
+    """
+
+    def __init__(self, distance: int = 3):
+        self.distance = distance
+        self.bands = distance + 1
+        self.width = 64 // self.bands
+        self._buckets: List[Dict[int, List[tuple]]] = [{} for _ in range(self.bands)]
+
+    def _keys(self, value: int) -> List[int]:
+        mask = (1 << self.width) - 1
+        return [value >> (band * self.width) & mask for band in range(self.bands)]
+
+    def find(self, value: int) -> Optional[str]:
+        """Name of an indexed hash within `distance` bits of `value`, if any."""
+        if self.distance < 0:
+            return None
+        for band, key in enumerate(self._keys(value)):
+            for name, other in self._buckets[band].get(key, ()):
+                if bin(value ^ other).count("1") <= self.distance:
+                    return name
+        return None
+
+    def add(self, name: str, value: int) -> None:
+        for band, key in enumerate(self._keys(value)):
+            self._buckets[band].setdefault(key, []).append((name, value))
+
+
+def html_to_markdown(html: str, base_url: str = "") -> tuple:
+    """
+    (title, markdown, links) of an HTML page. The markdown leaves out scripts,
+    navigation, headers and footers; the links (absolute) include them.
+    """
+    from bs4 import BeautifulSoup
+    from bs4.element import NavigableString, PreformattedString
+
+    soup = BeautifulSoup(html, "html.parser")
+    title = soup.title.get_text(" ", strip=True) if soup.title else ""
+    base = soup.find("base", href=True)
+    base_url = urljoin(base_url, base["href"]) if base else base_url
+    links = [urljoin(base_url, a["href"]) for a in soup.find_all("a", href=True)]
+    for tag in soup(_DROPPED):
+        tag.decompose()
+    blocks: List[str] = []
+    inline: List[str] = []
+
+    def flush():
+        text = " ".join("".join(inline).split())
+        if text:
+            blocks.append(text)
+        inline.clear()
+
+    def table(node):
+        rows = []
+        for tr in node.find_all("tr"):
+            cells = "".join(
+                f"<{cell.name}>{' '.join(cell.get_text(' ').split())}</{cell.name}>"
+                for cell in tr.find_all(["th", "td"])
+            )
+            if cells:
+                rows.append(f"<tr>{cells}</tr>")
+        return "\n".join(["<table>", *rows, "</table>"]) if rows else ""
+
+    def walk(node):
+        for child in node.children:
+            if isinstance(child, NavigableString):
+                if not isinstance(child, PreformattedString):
+                    inline.append(str(child))
+            elif child.name in _HEADINGS:
+                flush()
+                text = " ".join(child.get_text(" ").split())
+                if text:
+                    blocks.append(f"{'#' * _HEADINGS[child.name]} {text}")
+            elif child.name == "table":
+                flush()
+                blocks.append(table(child))
+            elif child.name in _BLOCKS:
+                flush()
+                walk(child)
+                flush()
+            else:
+                walk(child)
+
+    walk(soup.find("main") or soup.body or soup)
+    flush()
+    return title, "\n\n".join(block for block in blocks if block), links
+
+
+def normalize_url(url: str) -> str:
+    """Drop the fragment and lower-case the scheme and host."""
+    url = urldefrag(url.strip())[0]
+    parts = urlsplit(url)
+    return parts._replace(scheme=parts.scheme.lower(), netloc=parts.netloc.lower(), path=parts.path or "/").geturl()
+
+
+@dataclass
+class CrawledPage:
+    url: str
+    status: str
+    depth: int = 0
+    title: str = ""
+    text: str = ""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    # In-scope links found on the page (for a 304, the links recorded last time)
+    links: List[str] = field(default_factory=list)
+    simhash: Optional[int] = None
+    duplicate_of: Optional[str] = None
+    error: Optional[str] = None
+
+    def validators(self) -> Dict[str, Any]:
+        """What the next crawl needs to fetch the page conditionally and continue past a 304."""
+        return {
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "links": self.links,
+            "simhash": f"{self.simhash:016x}" if self.simhash is not None else None,
+        }
+
+    def to_document(self) -> "Document":
+        from langchain.schema import Document
+
+        return Document(page_content=self.text, metadata={"source": self.url, "title": self.title})
+
+
+class _Host:
+    def __init__(self, rate: float, concurrency: int):
+        self.limiter = AsyncRateLimiter(rate, burst=1)
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.robots: Optional[RobotFileParser] = None
+        self.robots_lock = asyncio.Lock()
+
+
+_DONE = object()
+
+
+class AsyncCrawler:
+    """Crawls from `seeds`; see the module docstring."""
+
+    def __init__(
+        self,
+        seeds: List[str],
+        allowed_prefixes: Optional[List[str]] = None,
+        max_pages: int = 100,
+        max_depth: int = 1,
+        concurrency: int = 8,
+        host_rate: float = 2.0,
+        host_concurrency: int = 2,
+        duplicate_distance: int = 6,
+        known: Optional[Dict[str, Dict[str, Any]]] = None,
+        user_agent: str = "nr-ai-form-indexer",
+        timeout: float = 30.0,
+        retries: int = 2,
+        respect_robots: bool = True,
+        buffer: int = 8,
+    ):
+        self.seeds = [normalize_url(url) for url in seeds]
+        # By default, links are followed below each seed's directory
+        self.allowed_prefixes = [normalize_url(p) for p in allowed_prefixes or []] or [
+            seed.rsplit("/", 1)[0] + "/" for seed in self.seeds
+        ]
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.concurrency = concurrency
+        self.host_rate = host_rate
+        self.host_concurrency = host_concurrency
+        self.known = known or {}
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.retries = retries
+        self.respect_robots = respect_robots
+        self.buffer = buffer
+        self.duplicates = SimHashIndex(duplicate_distance)
+        self.stats: Counter = Counter()
+        # Links were left out because max_pages was reached
+        self.truncated = False
+        # Every reachable page was crawled: not stopped, and no error ended the crawl
+        self.complete = False
+        self._seen: set = set()
+        self._hosts: Dict[str, _Host] = {}
+
+    def in_scope(self, url: str) -> bool:
+        parts = urlsplit(url)
+        return (
+            parts.scheme in ("http", "https")
+            and not parts.path.lower().endswith(_BINARY_EXTENSIONS)
+            and url.startswith(tuple(self.allowed_prefixes))
+        )
+
+    def _host(self, url: str) -> _Host:
+        netloc = urlsplit(url).netloc
+        if netloc not in self._hosts:
+            self._hosts[netloc] = _Host(self.host_rate, self.host_concurrency)
+        return self._hosts[netloc]
+
+    async def _allowed(self, client, url: str) -> bool:
+        host = self._host(url)
+        async with host.robots_lock:
+            if host.robots is None:
+                parts = urlsplit(url)
+                robots = RobotFileParser()
+                try:
+                    response = await client.get(f"{parts.scheme}://{parts.netloc}/robots.txt")
+                    self.stats["requests"] += 1
+                    status = response.status_code
+                    lines = response.text.splitlines() if status == 200 else []
+                except Exception:
+                    status, lines = None, []
+                robots.parse(lines)
+                if status in (401, 403):
+                    robots.disallow_all = True
+                delay = robots.crawl_delay(self.user_agent)
+                if delay:
+                    host.limiter.rate = min(host.limiter.rate or float("inf"), 1 / float(delay))
+                host.robots = robots
+        return host.robots.can_fetch(self.user_agent, url)
+
+    def _retry_delay(self, response, attempt: int) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(30.0, float(retry_after))
+            except ValueError:
+                try:
+                    return min(30.0, max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time()))
+                except (TypeError, ValueError):
+                    pass
+        return min(30.0, 0.5 * 2 ** attempt)
+
+    async def _get(self, client, url: str, headers: Dict[str, str]):
+        host = self._host(url)
+        response, error = None, None
+        for attempt in range(self.retries + 1):
+            async with host.semaphore:
+                await host.limiter.acquire()
+                try:
+                    response, error = await client.get(url, headers=headers), None
+                except Exception as e:
+                    response, error = None, e
+                self.stats["requests"] += 1
+            if response is not None and response.status_code not in _RETRY_STATUSES:
+                break
+            if attempt < self.retries:
+                self.stats["retries"] += 1
+                await asyncio.sleep(self._retry_delay(response, attempt))
+        return response, error
+
+    async def fetch(self, client, url: str, depth: int = 0) -> CrawledPage:
+        """Fetch one page (conditionally, if it is known) into a CrawledPage."""
+        if self.respect_robots and not await self._allowed(client, url):
+            return CrawledPage(url, DISALLOWED, depth)
+        known = self.known.get(url) or {}
+        headers = {}
+        if known.get("etag"):
+            headers["If-None-Match"] = known["etag"]
+        if known.get("last_modified"):
+            headers["If-Modified-Since"] = known["last_modified"]
+        response, error = await self._get(client, url, headers)
+        # A page that cannot be fetched now keeps the crawl going through its recorded links
+        known_links = list(known.get("links", []))
+        if response is None:
+            return CrawledPage(url, FAILED, depth, links=known_links, error=f"{type(error).__name__}: {error}")
+        status = response.status_code
+        if status == 304:
+            value = int(known["simhash"], 16) if known.get("simhash") else None
+            if value is not None:
+                self.duplicates.add(url, value)
+            return CrawledPage(
+                url, NOT_MODIFIED, depth,
+                etag=response.headers.get("ETag", known.get("etag")),
+                last_modified=response.headers.get("Last-Modified", known.get("last_modified")),
+                links=known_links,
+                simhash=value,
+            )
+        if status in (404, 410):
+            return CrawledPage(url, GONE, depth)
+        if status != 200:
+            return CrawledPage(url, FAILED, depth, links=known_links, error=f"HTTP {status}")
+        if "html" not in response.headers.get("Content-Type", "text/html"):
+            return CrawledPage(url, SKIPPED, depth, error=response.headers.get("Content-Type"))
+        self.stats["bytes"] += len(response.content)
+        final_url = normalize_url(str(response.url))
+        title, text, found = html_to_markdown(response.text, final_url)
+        links = []
+        for link in found:
+            link = normalize_url(link)
+            if self.in_scope(link) and link not in links:
+                links.append(link)
+        page = CrawledPage(
+            url, FETCHED, depth,
+            title=title,
+            text=text,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            links=links,
+            simhash=simhash(text),
+        )
+        page.duplicate_of = self.duplicates.find(page.simhash)
+        if page.duplicate_of is not None:
+            page.status = DUPLICATE
+        else:
+            self.duplicates.add(url, page.simhash)
+        # A redirect target is not fetched again under its own URL
+        self._seen.add(final_url)
+        return page
+
+    def _schedule(self, frontier: asyncio.Queue, url: str, depth: int) -> None:
+        if url in self._seen:
+            return
+        if len(self._seen) >= self.max_pages:
+            self.truncated = True
+            return
+        self._seen.add(url)
+        frontier.put_nowait((url, depth))
+
+    async def crawl(self, should_stop: Optional[Callable[[], bool]] = None) -> AsyncIterator[CrawledPage]:
+        """Crawl from the seeds, yielding each page as it is fetched."""
+        import httpx
+
+        frontier: asyncio.Queue = asyncio.Queue()
+        out: asyncio.Queue = asyncio.Queue(self.buffer)
+
+        async def worker(client):
+            while True:
+                url, depth = await frontier.get()
+                try:
+                    try:
+                        page = await self.fetch(client, url, depth)
+                    except Exception as e:
+                        page = CrawledPage(url, FAILED, depth, error=f"{type(e).__name__}: {e}")
+                    if depth < self.max_depth:
+                        for link in page.links:
+                            self._schedule(frontier, link, depth + 1)
+                    self.stats[page.status] += 1
+                    await out.put(page)
+                finally:
+                    frontier.task_done()
+
+        async def finish():
+            await frontier.join()
+            await out.put(_DONE)
+
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(
+            headers={"User-Agent": self.user_agent},
+            timeout=self.timeout,
+            limits=limits,
+            follow_redirects=True,
+        ) as client:
+            for seed in self.seeds:
+                self._schedule(frontier, seed, 0)
+            tasks = [asyncio.create_task(worker(client)) for _ in range(self.concurrency)]
+            tasks.append(asyncio.create_task(finish()))
+            try:
+                while not (should_stop and should_stop()):
+                    try:
+                        page = await asyncio.wait_for(out.get(), 0.25)
+                    except asyncio.TimeoutError:
+                        continue
+                    if page is _DONE:
+                        self.complete = True
+                        break
+                    yield page
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    def iter_pages(self, stop_event: Optional[threading.Event] = None) -> Iterator[CrawledPage]:
+        """
+        Crawl on a background event loop, yielding pages to the calling thread as
+        they are fetched. Setting `stop_event` (or closing the iterator) stops the crawl.
+        """
+        pages: queue.Queue = queue.Queue(self.buffer)
+        closed = threading.Event()
+
+        def should_stop():
+            return closed.is_set() or (stop_event is not None and stop_event.is_set())
+
+        async def put(item):
+            while not closed.is_set():
+                try:
+                    pages.put_nowait(item)
+                    return
+                except queue.Full:
+                    await asyncio.sleep(0.05)
+
+        async def produce():
+            try:
+                async for page in self.crawl(should_stop):
+                    await put(page)
+            except Exception as e:
+                logger.error("Web crawl failed", error=str(e), error_type=type(e).__name__, exc_info=True)
+            finally:
+                await put(_DONE)
+
+        thread = threading.Thread(target=asyncio.run, args=(produce(),), name="web-crawler", daemon=True)
+        started = time.perf_counter()
+        thread.start()
+        try:
+            while True:
+                page = pages.get()
+                if page is _DONE:
+                    break
+                yield page
+        finally:
+            closed.set()
+            thread.join()
+            self.stats["seconds"] = round(time.perf_counter() - started, 3)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**self.stats, "pages": len(self._seen), "truncated": self.truncated, "complete": self.complete}
@@ -0,0 +1,162 @@
+"""
+Content-addressed embedding cache for the search indexer.
+
+Chunks are keyed by the SHA-256 of the embedding model name and the normalized
+chunk text (Unicode NFC, collapsed whitespace), so boilerplate repeated across
+documents and chunks of re-indexed documents are embedded once. Vectors are
+stored as float32 blobs in a local SQLite database, which is also the precision
+Azure AI Search keeps them at.
+
+CachedEmbeddings wraps any LangChain Embeddings: hits are served from the cache,
+misses are de-duplicated and sent to the wrapped model's embed_documents in
+batches, and the per-run hit rate and embedding calls saved are tracked in
+EmbeddingCacheStats.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+# SQLite limits the number of bound parameters per statement
+_LOOKUP_CHUNK = 500
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def embedding_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+@dataclass
+class EmbeddingCacheStats:
+    # Texts requested from the cache
+    texts: int = 0
+    hits: int = 0
+    misses: int = 0
+    # Calls made to the wrapped model
+    embedding_calls: int = 0
+
+    def since(self, earlier: "EmbeddingCacheStats") -> "EmbeddingCacheStats":
+        return EmbeddingCacheStats(**{
+            name: value - getattr(earlier, name) for name, value in asdict(self).items()
+        })
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            **asdict(self),
+            "hit_rate": round(self.hits / self.texts, 3) if self.texts else 0.0,
+            # Without the cache every text was embedded with its own call
+            "embedding_calls_saved": self.texts - self.embedding_calls,
+        }
+
+
+class SQLiteEmbeddingStore:
+    """Embedding vectors in a SQLite file, shared safely between threads."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY, model TEXT NOT NULL, dimensions INTEGER NOT NULL,"
+            " vector BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            for i in range(0, len(keys), _LOOKUP_CHUNK):
+                chunk = keys[i:i + _LOOKUP_CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, model: str, items: Iterable[tuple]) -> None:
+        now = time.time()
+        rows = [
+            (key, model, len(vector), array("f", vector).tobytes(), now)
+            for key, vector in items
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that serves repeated texts from a content-addressed cache."""
+
+    def __init__(self, embeddings: Embeddings, store: SQLiteEmbeddingStore, model: str, batch_size: int = 64):
+        self.embeddings = embeddings
+        self.store = store
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.stats = EmbeddingCacheStats()
+        self._stats_lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [embedding_key(self.model, text) for text in texts]
+        vectors = self.store.get_many(list(dict.fromkeys(keys)))
+        # One model input per distinct missing key, even if it repeats within the request
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        calls = 0
+        pending = list(missing.items())
+        for i in range(0, len(pending), self.batch_size):
+            batch = pending[i:i + self.batch_size]
+            embedded = self.embeddings.embed_documents([text for _, text in batch])
+            calls += 1
+            fresh = list(zip((key for key, _ in batch), embedded))
+            self.store.put_many(self.model, fresh)
+            vectors.update(fresh)
+        with self._stats_lock:
+            self.stats.texts += len(texts)
+            self.stats.misses += len(missing)
+            self.stats.hits += len(texts) - len(missing)
+            self.stats.embedding_calls += calls
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    def snapshot(self) -> EmbeddingCacheStats:
+        with self._stats_lock:
+            return EmbeddingCacheStats(**asdict(self.stats))
+
+
+def build_cached_embeddings(
+    embeddings: Embeddings, path: Optional[str], model: str, batch_size: int = 64
+) -> Embeddings:
+    """Wrap `embeddings` in a cache stored at `path`; an empty path disables caching."""
+    if not path:
+        return embeddings
+    return CachedEmbeddings(embeddings, SQLiteEmbeddingStore(path), model, batch_size)
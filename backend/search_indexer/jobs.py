@@ -0,0 +1,186 @@
+"""
+Background indexing jobs.
+
+The indexer is synchronous and runs for minutes, so the API starts it as a job
+on a worker thread and returns straight away; clients poll the job for its
+per-stage progress and throughput. One job runs at a time, since every run
+reads and writes the same index manifest; a new job is refused while another
+is queued or running.
+
+Cancelling sets the run's stop event: the pipeline drains, and the sources it
+finished are already recorded in the manifest. Resuming a cancelled or failed
+job starts a new run, which skips those sources because their manifest entries
+are up to date. Jobs live in memory; after a restart, a new job likewise picks
+up from the last manifest checkpoint.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.core.logging import get_logger
+from backend.search_indexer.pipeline import PipelineProgress
+
+logger = get_logger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+CANCELLING = "cancelling"
+CANCELLED = "cancelled"
+COMPLETED = "completed"
+FAILED = "failed"
+
+ACTIVE_STATUSES = (QUEUED, RUNNING, CANCELLING)
+RESUMABLE_STATUSES = (CANCELLED, FAILED)
+
+
+class JobError(Exception):
+    """A job request that cannot be honoured in the job's current state."""
+
+
+def _timestamp(seconds: Optional[float]) -> Optional[str]:
+    if seconds is None:
+        return None
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(seconds))
+
+
+@dataclass
+class IndexingJob:
+    id: str
+    resumed_from: Optional[str] = None
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    stop_event: threading.Event = field(default_factory=threading.Event, repr=False)
+    progress: PipelineProgress = field(default_factory=PipelineProgress, repr=False)
+
+    def as_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        end = self.finished_at or time.time()
+        data = {
+            "id": self.id,
+            "status": self.status,
+            "resumed_from": self.resumed_from,
+            "created_at": _timestamp(self.created_at),
+            "started_at": _timestamp(self.started_at),
+            "finished_at": _timestamp(self.finished_at),
+            "elapsed_seconds": round(end - self.started_at, 3) if self.started_at else 0.0,
+            "progress": self.progress.snapshot(),
+            "error": self.error,
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+
+class IndexingJobManager:
+    """Runs indexing jobs one at a time on a worker thread and keeps recent ones."""
+
+    def __init__(self, run: Callable[..., Dict[str, Any]], history: int = 50):
+        self._run = run
+        self._history = history
+        self._jobs: "OrderedDict[str, IndexingJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="indexer-job")
+
+    def submit(self, resumed_from: Optional[str] = None) -> IndexingJob:
+        """Queue a new run; refused while another job is queued or running."""
+        with self._lock:
+            active = [job for job in self._jobs.values() if job.status in ACTIVE_STATUSES]
+            if active:
+                raise JobError(f"Indexing job {active[0].id} is already {active[0].status}")
+            job = IndexingJob(id=uuid.uuid4().hex, resumed_from=resumed_from)
+            self._jobs[job.id] = job
+            while len(self._jobs) > self._history:
+                oldest = next(iter(self._jobs.values()))
+                if oldest.status in ACTIVE_STATUSES:
+                    break
+                self._jobs.popitem(last=False)
+        self._executor.submit(self._execute, job)
+        logger.info("Indexing job queued", job_id=job.id, resumed_from=resumed_from)
+        return job
+
+    def get(self, job_id: str) -> IndexingJob:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"Indexing job {job_id} not found")
+        return job
+
+    def list(self) -> List[IndexingJob]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> IndexingJob:
+        job = self.get(job_id)
+        with self._lock:
+            if job.status not in ACTIVE_STATUSES:
+                raise JobError(f"Indexing job {job_id} is already {job.status}")
+            job.stop_event.set()
+            if job.status == QUEUED:
+                job.status, job.finished_at = CANCELLED, time.time()
+            else:
+                job.status = CANCELLING
+        logger.info("Indexing job cancel requested", job_id=job_id)
+        return job
+
+    def resume(self, job_id: str) -> IndexingJob:
+        """Start a new run that picks up where a cancelled or failed job stopped."""
+        job = self.get(job_id)
+        if job.status not in RESUMABLE_STATUSES:
+            raise JobError(f"Only cancelled or failed jobs can be resumed; job {job_id} is {job.status}")
+        return self.submit(resumed_from=job_id)
+
+    def _execute(self, job: IndexingJob) -> None:
+        with self._lock:
+            if job.stop_event.is_set():
+                return
+            job.status, job.started_at = RUNNING, time.time()
+        logger.info("Indexing job started", job_id=job.id)
+        try:
+            result = self._run(stop_event=job.stop_event, progress=job.progress)
+        except Exception as e:
+            result = {"error": f"Indexing failed: {e}"}
+        with self._lock:
+            job.result, job.finished_at = result, time.time()
+            if "error" in result:
+                job.status, job.error = FAILED, result["error"]
+            elif result.get("cancelled") or job.stop_event.is_set():
+                job.status = CANCELLED
+            else:
+                job.status = COMPLETED
+            job.progress.set_phase(job.status)
+        logger.info("Indexing job finished", job_id=job.id, status=job.status)
+
+    def shutdown(self) -> None:
+        """Cancel active jobs and wait for the running one to drain."""
+        for job in self.list():
+            if job.status in ACTIVE_STATUSES:
+                job.stop_event.set()
+        self._executor.shutdown(wait=True)
+
+
+_job_manager: Optional[IndexingJobManager] = None
+
+
+def get_job_manager() -> IndexingJobManager:
+    """Process-wide job manager; the indexer itself is imported on the first job."""
+    global _job_manager
+    if _job_manager is None:
+        def run(**kwargs):
+            from backend.search_indexer import web_crawler
+
+            return web_crawler.start_indexing(**kwargs)
+
+        _job_manager = IndexingJobManager(run)
+    return _job_manager
+
+
+def shutdown_job_manager() -> None:
+    if _job_manager is not None:
+        _job_manager.shutdown()
@@ -0,0 +1,237 @@
+"""
+Index manifest for incremental re-indexing.
+
+The manifest records, per indexed source (blob name or web page URL), the blob
+ETag, the SHA-256 of its content and the IDs of the chunks uploaded for it.
+Chunk IDs are derived from the source and the chunk text, so an unchanged
+chunk keeps its ID across runs and is neither re-embedded nor re-uploaded.
+
+A run compares the container listing with the manifest:
+- unchanged: same ETag, skipped without downloading
+- changed: new ETag; if the downloaded content hash still matches, only the
+  ETag is updated, otherwise the blob is re-chunked, new chunks are uploaded
+  and the chunks that no longer exist are deleted
+- added: indexed from scratch
+- removed: every chunk recorded for it is deleted from the index
+
+Each entry also records the chunking it was split with (the chunker's
+fingerprint); a source chunked differently counts as changed and is re-chunked,
+even if its ETag and content are the same.
+
+Documents uploaded before chunk IDs were used as keys have random UUID keys. Until
+the manifest records them as deleted (legacy_keys_deleted), each run deletes those
+of the sources it has indexed, so the index does not hold every passage twice.
+
+The manifest is a JSON document kept on local disk or in Blob Storage.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+MANIFEST_VERSION = 1
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def chunk_id(source: str, text: str) -> str:
+    """Stable search document key for a chunk (hex is valid in an Azure Search key)."""
+    return hashlib.sha256(f"{source}\0{text}".encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ManifestDiff:
+    """Difference between the source listing and the manifest."""
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    @property
+    def to_index(self) -> List[str]:
+        return self.added + self.changed
+
+    def report(self, manifest: "IndexManifest") -> Dict[str, Any]:
+        """Dry-run report: what a run would do, without downloading anything."""
+        return {
+            "added": self.added,
+            "changed": self.changed,
+            "removed": self.removed,
+            "unchanged_count": len(self.unchanged),
+            "chunks_to_delete_if_removed": sum(
+                len(manifest.entries[name].get("chunk_ids", [])) for name in self.removed
+            ),
+            "note": "changed blobs whose content hash still matches are not re-analyzed",
+        }
+
+
+class IndexManifest:
+    """Per-source ETag, content hash and chunk IDs for one search index."""
+
+    def __init__(
+        self,
+        index_name: str,
+        entries: Optional[Dict[str, Dict[str, Any]]] = None,
+        chunking: str = "",
+        legacy_keys_deleted: bool = False,
+    ):
+        self.index_name = index_name
+        self.entries: Dict[str, Dict[str, Any]] = entries or {}
+        # Fingerprint of the current chunking, recorded with every entry
+        self.chunking = chunking
+        # True once no document uploaded with a random key is left for an indexed source
+        self.legacy_keys_deleted = legacy_keys_deleted
+
+    @classmethod
+    def from_json(cls, raw: Optional[str], index_name: str, chunking: str = "") -> "IndexManifest":
+        if not raw:
+            return cls(index_name, chunking=chunking)
+        data = json.loads(raw)
+        # A manifest written for another index (or format) says nothing about this one
+        if data.get("version") != MANIFEST_VERSION or data.get("index_name") != index_name:
+            return cls(index_name, chunking=chunking)
+        # Manifests written before the flag existed may sit next to legacy documents
+        return cls(index_name, data.get("sources", {}), chunking, data.get("legacy_keys_deleted", False))
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "version": MANIFEST_VERSION,
+                "index_name": self.index_name,
+                "legacy_keys_deleted": self.legacy_keys_deleted,
+                "sources": self.entries,
+            },
+            indent=1,
+            sort_keys=True,
+        )
+
+    def diff(
+        self, listing: Dict[str, Optional[str]], scope: Optional[Callable[[str], bool]] = None
+    ) -> ManifestDiff:
+        """
+        Compare `listing` ({source: etag}) with the manifest entries accepted by
+        `scope` (all entries by default). Sources without an ETag (web pages)
+        always count as changed and are checked by content hash instead, as
+        do sources chunked differently from the current chunking.
+        """
+        result = ManifestDiff()
+        for name, etag in listing.items():
+            entry = self.entries.get(name)
+            if entry is None:
+                result.added.append(name)
+            elif etag is None or entry.get("etag") != etag or not self._same_chunking(entry):
+                result.changed.append(name)
+            else:
+                result.unchanged.append(name)
+        result.removed = [
+            name for name in self.entries if (scope is None or scope(name)) and name not in listing
+        ]
+        return result
+
+    def _same_chunking(self, entry: Dict[str, Any]) -> bool:
+        return entry.get("chunking", "") == self.chunking
+
+    def matches_content(self, name: str, digest: str) -> bool:
+        """True if the source was indexed from the same content with the current chunking."""
+        entry = self.entries.get(name)
+        return entry is not None and entry.get("content_hash") == digest and self._same_chunking(entry)
+
+    def chunk_ids(self, name: str) -> List[str]:
+        return list(self.entries.get(name, {}).get("chunk_ids", []))
+
+    def record(
+        self,
+        name: str,
+        etag: Optional[str],
+        digest: str,
+        chunk_ids: Iterable[str],
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Record an indexed source; `extra` holds source-specific fields (e.g. a web page's validators)."""
+        self.entries[name] = {
+            **(extra or {}),
+            "etag": etag,
+            "content_hash": digest,
+            "chunk_ids": list(chunk_ids),
+            "chunking": self.chunking,
+            "indexed_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+
+    def touch(self, name: str, etag: Optional[str], extra: Optional[Dict[str, Any]] = None) -> None:
+        """Record a new ETag (and `extra` fields) for content that did not change."""
+        if name in self.entries:
+            self.entries[name].update(extra or {})
+            self.entries[name]["etag"] = etag
+
+    def remove(self, name: str) -> None:
+        self.entries.pop(name, None)
+
+
+class LocalManifestStore:
+    """Manifest kept in a JSON file, replaced atomically on save."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Optional[str]:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, encoding="utf-8") as f:
+            return f.read()
+
+    def save(self, raw: str) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".manifest-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(raw)
+        os.replace(tmp_path, self.path)
+
+
+class BlobManifestStore:
+    """Manifest kept as a blob, e.g. next to the source documents."""
+
+    def __init__(self, container_client, blob_name: str):
+        self.container_client = container_client
+        self.blob_name = blob_name
+
+    def load(self) -> Optional[str]:
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            return self.container_client.download_blob(self.blob_name).readall().decode("utf-8")
+        except ResourceNotFoundError:
+            return None
+
+    def save(self, raw: str) -> None:
+        self.container_client.upload_blob(self.blob_name, raw.encode("utf-8"), overwrite=True)
+
+
+def plan_chunks(manifest: IndexManifest, source: str, chunks: List[Any]) -> Tuple[List[Any], List[str], List[str]]:
+    """
+    Assign stable IDs to a source's chunks and split them against the manifest.
+
+    Returns (chunks_to_upload, all_chunk_ids, stale_chunk_ids). Chunks already
+    recorded for the source are not uploaded again; stale IDs are the recorded
+    chunks that no longer exist.
+    """
+    previous = set(manifest.chunk_ids(source))
+    ids: List[str] = []
+    seen = set()
+    to_upload = []
+    for chunk in chunks:
+        cid = chunk_id(source, chunk.page_content)
+        if cid in seen:
+            continue
+        chunk.id = cid
+        ids.append(cid)
+        seen.add(cid)
+        if cid not in previous:
+            to_upload.append(chunk)
+    stale = [cid for cid in previous if cid not in seen]
+    return to_upload, ids, stale
@@ -0,0 +1,197 @@
+"""
+Bounded memory for document downloads.
+
+Blobs are streamed chunk by chunk into a SpooledTemporaryFile instead of being
+read whole into memory: a blob stays in memory up to `spool_bytes` and rolls
+over to a temporary file beyond that. The SHA-256 is computed while streaming,
+so the manifest and the analysis cache never need the bytes again, and the
+file object is handed to Document Intelligence as the request body, which the
+HTTP client streams from disk.
+
+MemoryBudget caps the document bytes held in memory across the whole run.
+Every download reserves the in-memory part of its blob (at most `spool_bytes`)
+before streaming and releases it when the blob is closed; downloads wait while
+the budget is exhausted, which in turn back-pressures the pipeline.
+
+RssSampler reports the process's peak resident set size over a run.
+"""
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+from typing import IO, Any, Dict, Optional
+
+from backend.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+MB = 1024 * 1024
+
+
+class MemoryBudget:
+    """Byte budget shared by concurrent downloads; a limit of 0 disables it."""
+
+    def __init__(self, limit_bytes: int):
+        self.limit = limit_bytes
+        self.reserved = 0
+        self.peak = 0
+        self.waits = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, size: int) -> int:
+        """Block until `size` bytes fit in the budget; returns the bytes reserved."""
+        if self.limit > 0:
+            # A single reservation above the limit is admitted once nothing else is held
+            size = min(size, self.limit)
+        with self._condition:
+            if self.limit > 0 and self.reserved + size > self.limit:
+                self.waits += 1
+                self._condition.wait_for(lambda: self.reserved + size <= self.limit)
+            self.reserved += size
+            self.peak = max(self.peak, self.reserved)
+        return size
+
+    def release(self, size: int) -> None:
+        with self._condition:
+            self.reserved -= size
+            self._condition.notify_all()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "limit_mb": round(self.limit / MB, 1),
+            "peak_reserved_mb": round(self.peak / MB, 1),
+            "waits": self.waits,
+        }
+
+
+class SpooledBlob:
+    """
+    Downloaded blob content: in memory up to the spool size, in a temporary file
+    beyond it. Close it (or use it as a context manager) to free the memory, the
+    file and the budget reservation.
+    """
+
+    def __init__(self, name: str, spool_bytes: int, budget: Optional[MemoryBudget] = None):
+        self.name = name
+        self.size = 0
+        self.sha256 = ""
+        self.file = tempfile.SpooledTemporaryFile(max_size=spool_bytes, prefix="indexer-blob-")
+        if spool_bytes <= 0:
+            # A max_size of 0 would never roll over; 0 here means always on disk
+            self.file.rollover()
+        self._budget = budget
+        self._reserved = 0
+
+    @property
+    def on_disk(self) -> bool:
+        return bool(getattr(self.file, "_rolled", False))
+
+    def stream(self) -> IO[bytes]:
+        """The content as a file object, positioned at the start."""
+        self.file.seek(0)
+        return self.file
+
+    def read(self) -> bytes:
+        return self.stream().read()
+
+    def close(self) -> None:
+        self.file.close()
+        if self._budget is not None and self._reserved:
+            self._budget.release(self._reserved)
+            self._reserved = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __enter__(self) -> "SpooledBlob":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def download_spooled(
+    blob_client, spool_bytes: int, budget: Optional[MemoryBudget] = None
+) -> SpooledBlob:
+    """
+    Stream a blob into a SpooledBlob, hashing it on the way. The first response
+    tells the blob size, so the budget is reserved before the rest is fetched.
+    """
+    downloader = blob_client.download_blob()
+    blob = SpooledBlob(blob_client.blob_name, spool_bytes, budget)
+    if budget is not None:
+        blob._reserved = budget.acquire(min(downloader.size, spool_bytes))
+    try:
+        digest = hashlib.sha256()
+        for chunk in downloader.chunks():
+            digest.update(chunk)
+            blob.file.write(chunk)
+        blob.size = blob.file.tell()
+        blob.sha256 = digest.hexdigest()
+    except BaseException:
+        blob.close()
+        raise
+    return blob
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process, where /proc is available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size over the life of the process."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssSampler:
+    """Samples the resident set size on a background thread to find a run's peak."""
+
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self.start_rss = current_rss_bytes()
+        self.peak = self.start_rss or 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            rss = current_rss_bytes()
+            if rss is not None:
+                self.peak = max(self.peak, rss)
+
+    def start(self) -> "RssSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        rss = current_rss_bytes()
+        if rss is not None:
+            self.peak = max(self.peak, rss)
+
+    def __enter__(self) -> "RssSampler":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def as_dict(self) -> Dict[str, Any]:
+        process_peak = peak_rss_bytes()
+        return {
+            "start_rss_mb": round(self.start_rss / MB, 1) if self.start_rss is not None else None,
+            "peak_rss_mb": round(self.peak / MB, 1) if self.start_rss is not None else None,
+            "process_peak_rss_mb": round(process_peak / MB, 1) if process_peak is not None else None,
+        }
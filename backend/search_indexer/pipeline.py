@@ -0,0 +1,265 @@
+"""
+Staged, bounded-memory processing pipeline for the search indexer.
+
+Each stage has its own pool of worker threads and reads from a bounded queue
+filled by the previous stage. A slow stage therefore blocks the stages in front
+of it instead of letting work pile up: at most `queue_size` items wait between
+two stages, and each worker holds one item (or one batch) at a time. Memory is
+bounded by the worker counts and queue sizes, not by the size of the corpus.
+
+Stages can:
+- map one item to one output (return None to drop it)
+- fan out, yielding outputs one at a time so they stream into the next queue
+- batch, receiving lists of up to `batch_size` items (e.g. for uploads); a
+  partial batch is passed on once no item has arrived for `linger` seconds, so
+  batches fill up under load without holding items back when input is slow
+- discard the items they drop after a stop, to free what those items hold
+"""
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from backend.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """One pipeline stage: `fn` runs on `workers` threads."""
+    name: str
+    fn: Callable[[Any], Any]
+    workers: int = 1
+    # fn returns an iterable whose items are passed on one at a time
+    fan_out: bool = False
+    # fn receives lists of up to batch_size items (0 = one item at a time)
+    batch_size: int = 0
+    # Seconds to wait for more items before passing on a partial batch
+    linger: float = 0.2
+    # Called with each input item dropped because the pipeline was stopped
+    discard: Optional[Callable[[Any], None]] = None
+
+
+@dataclass
+class StageStats:
+    processed: int = 0
+    failed: int = 0
+    emitted: int = 0
+    busy_seconds: float = 0.0
+    peak_queue: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "emitted": self.emitted,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "peak_queue": self.peak_queue,
+        }
+
+
+class PipelineProgress:
+    """
+    Live view of one or more pipeline runs, for progress reporting while they run.
+    Stage stats are read without locking, so a snapshot may be a few items behind.
+    """
+
+    def __init__(self):
+        self.phase = "pending"
+        self.totals: Dict[str, Any] = {}
+        self._runs: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def set_phase(self, phase: str, **totals: Any) -> None:
+        with self._lock:
+            self.phase = phase
+            self.totals.update(totals)
+
+    def update(self, **totals: Any) -> None:
+        with self._lock:
+            self.totals.update(totals)
+
+    def track(self, name: str, stats: Dict[str, StageStats]) -> None:
+        with self._lock:
+            self._runs[name] = (time.perf_counter(), stats, [None])
+
+    def finish(self, name: str) -> None:
+        with self._lock:
+            self._runs[name][2][0] = time.perf_counter()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            runs = dict(self._runs)
+            result = {"phase": self.phase, "totals": dict(self.totals), "pipelines": {}}
+        for name, (started, stats, finished) in runs.items():
+            elapsed = (finished[0] or time.perf_counter()) - started
+            result["pipelines"][name] = {
+                "elapsed_seconds": round(elapsed, 3),
+                "finished": finished[0] is not None,
+                "stages": {
+                    stage: {**s.as_dict(), "per_second": round(s.processed / elapsed, 2) if elapsed else 0.0}
+                    for stage, s in stats.items()
+                },
+            }
+        return result
+
+
+class _BoundedQueue(queue.Queue):
+    """Queue that records its peak depth in the consuming stage's stats."""
+
+    def __init__(self, maxsize: int, stats: StageStats):
+        super().__init__(maxsize=maxsize)
+        self.stats = stats
+
+    def _put(self, item):
+        super()._put(item)
+        if len(self.queue) > self.stats.peak_queue:
+            self.stats.peak_queue = len(self.queue)
+
+
+def run_pipeline(
+    source: Iterable[Any],
+    stages: List[Stage],
+    queue_size: int = 8,
+    stop_event: Optional[threading.Event] = None,
+    progress: Optional[PipelineProgress] = None,
+    name: str = "pipeline",
+) -> Dict[str, Any]:
+    """
+    Feed `source` through `stages` and block until every item has been processed.
+
+    Errors raised by a stage are logged and counted per item; the pipeline keeps
+    going. Setting `stop_event` stops feeding new items and makes workers drop
+    queued items, so the pipeline drains quickly.
+
+    When `progress` is given, the run's stage stats are tracked there under `name`
+    while it runs.
+
+    Returns per-stage stats and the wall-clock time.
+    """
+    stop_event = stop_event or threading.Event()
+    stats = {stage.name: StageStats() for stage in stages}
+    if progress is not None:
+        progress.track(name, stats)
+    queues = [_BoundedQueue(queue_size, stats[stage.name]) for stage in stages]
+    threads: List[threading.Thread] = []
+    started = time.perf_counter()
+
+    def emit(index: int, output: Any) -> None:
+        if index + 1 < len(queues) and output is not None:
+            queues[index + 1].put(output)
+
+    def run_fn(index: int, stage: Stage, item: Any) -> None:
+        stage_stats = stats[stage.name]
+        began = time.perf_counter()
+        emitted = 0
+        try:
+            result = stage.fn(item)
+            if stage.fan_out:
+                for output in result or ():
+                    if stop_event.is_set():
+                        break
+                    emit(index, output)
+                    emitted += 1
+            elif result is not None:
+                emit(index, result)
+                emitted = 1
+            failed = 0
+        except Exception as e:
+            failed = 1
+            logger.error(
+                f"Pipeline stage {stage.name} failed",
+                error=str(e),
+                error_type=type(e).__name__,
+                exc_info=True,
+            )
+        with stage_stats._lock:
+            stage_stats.processed += len(item) if stage.batch_size else 1
+            stage_stats.failed += failed
+            stage_stats.emitted += emitted
+            stage_stats.busy_seconds += time.perf_counter() - began
+
+    def drop(stage: Stage, items: List[Any]) -> None:
+        if stage.discard is None:
+            return
+        for item in items:
+            try:
+                stage.discard(item)
+            except Exception as e:
+                logger.warning(f"Pipeline stage {stage.name} failed to discard an item", error=str(e))
+
+    def worker(index: int, stage: Stage, remaining: List[int], lock: threading.Lock) -> None:
+        in_queue = queues[index]
+        batch: List[Any] = []
+        while True:
+            try:
+                item = in_queue.get(timeout=stage.linger) if batch else in_queue.get()
+            except queue.Empty:
+                if stop_event.is_set():
+                    drop(stage, batch)
+                else:
+                    run_fn(index, stage, batch)
+                batch = []
+                continue
+            if item is _DONE:
+                # Let sibling workers see the end marker too
+                in_queue.put(item)
+                break
+            if stop_event.is_set():
+                drop(stage, [item, *batch])
+                batch = []
+                continue
+            if stage.batch_size:
+                batch.append(item)
+                if len(batch) >= stage.batch_size:
+                    run_fn(index, stage, batch)
+                    batch = []
+            else:
+                run_fn(index, stage, item)
+        if batch:
+            if stop_event.is_set():
+                drop(stage, batch)
+            else:
+                run_fn(index, stage, batch)
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        # The last worker of a stage closes the next stage's input
+        if last and index + 1 < len(queues):
+            queues[index + 1].put(_DONE)
+
+    for index, stage in enumerate(stages):
+        remaining, lock = [max(1, stage.workers)], threading.Lock()
+        for n in range(remaining[0]):
+            thread = threading.Thread(
+                target=worker,
+                args=(index, stage, remaining, lock),
+                name=f"indexer-{stage.name}-{n}",
+                daemon=True,
+            )
+            thread.start()
+            threads.append(thread)
+
+    try:
+        for item in source:
+            if stop_event.is_set():
+                break
+            queues[0].put(item)
+    finally:
+        queues[0].put(_DONE)
+        for thread in threads:
+            thread.join()
+        if progress is not None:
+            progress.finish(name)
+
+    return {
+        "stages": {name: stage_stats.as_dict() for name, stage_stats in stats.items()},
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "stopped": stop_event.is_set(),
+    }
@@ -0,0 +1,318 @@
+"""
+Adaptive concurrent uploader for the search index.
+
+Chunks are uploaded in concurrent batches. Batch size and concurrency adapt to
+the service with AIMD (additive increase, multiplicative decrease), as TCP does
+for its congestion window:
+
+- a batch that succeeds within `target_latency` adds `batch_step` to the batch
+  size, and every `concurrency` such batches add one concurrent upload
+- a throttled batch (429/503) or a slow one halves both; only the first signal
+  per adjustment counts, so a burst of in-flight failures halves once
+
+Failed batches (throttled, 408/5xx, or a transport error that got no response)
+are retried with full-jitter exponential backoff. A Retry-After (or
+retry-after-ms) header pauses every upload until it has passed. A 413 splits the
+batch in two instead of retrying it as is.
+"""
+import email.utils
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+THROTTLE_STATUSES = {429, 503}
+TRANSIENT_STATUSES = {408, 500, 502, 504}
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is None and error.args and isinstance(error.args[0], list):
+        # AzureSearch raises with the per-document IndexingResult list when a
+        # batch partially fails; the worst document status decides
+        statuses = [
+            getattr(r, "status_code", None) for r in error.args[0] if not getattr(r, "succeeded", True)
+        ]
+        throttled = [s for s in statuses if s in THROTTLE_STATUSES]
+        status = throttled[0] if throttled else max((s for s in statuses if s), default=None)
+    if status is None and "Bad Gateway" in str(error):
+        status = 502
+    return status
+
+
+@lru_cache(maxsize=1)
+def _transport_errors() -> tuple:
+    """Errors of a request that got no HTTP response (connection reset, timeout, ...)."""
+    errors = [ConnectionError, TimeoutError]
+    try:
+        from azure.core.exceptions import ServiceRequestError, ServiceResponseError
+        errors += [ServiceRequestError, ServiceResponseError]
+    except ImportError:
+        pass
+    try:
+        # The embeddings are computed in the same call (add_documents)
+        from openai import APIConnectionError
+        errors.append(APIConnectionError)
+    except ImportError:
+        pass
+    return tuple(errors)
+
+
+def _is_transient(error: Exception, status: Optional[int]) -> bool:
+    if status is not None:
+        return status in TRANSIENT_STATUSES
+    # A transport error, possibly wrapped by the vector store
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, _transport_errors()):
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    for name, scale in (("retry-after-ms", 0.001), ("x-ms-retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name) or headers.get(name.title())
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except ValueError:
+            # Retry-After may also be an HTTP date
+            parsed = email.utils.parsedate_to_datetime(value)
+            if parsed is not None:
+                return max(0.0, parsed.timestamp() - time.time())
+    return None
+
+
+@dataclass
+class UploadResult:
+    total_chunks: int = 0
+    successful: int = 0
+    failed: int = 0
+    failed_batches: List[int] = field(default_factory=list)
+    failed_chunks: List[Any] = field(default_factory=list, repr=False)
+    retries: int = 0
+    throttled: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "total_chunks": self.total_chunks,
+            "successful": self.successful,
+            "failed": self.failed,
+            "failed_batches": self.failed_batches,
+            "success_rate": (self.successful / self.total_chunks * 100) if self.total_chunks else 0,
+            "retries": self.retries,
+            "throttled": self.throttled,
+        }
+
+
+class AdaptiveLimiter:
+    """Shared AIMD batch size and concurrency limit."""
+
+    def __init__(
+        self,
+        batch_size: int = 10,
+        min_batch_size: int = 1,
+        max_batch_size: int = 100,
+        batch_step: int = 5,
+        concurrency: int = 2,
+        max_concurrency: int = 8,
+        target_latency: float = 5.0,
+    ):
+        self.batch_size = batch_size
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.batch_step = batch_step
+        self.concurrency = concurrency
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.in_flight = 0
+        self.epoch = 0
+        self.paused_until = 0.0
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> int:
+        """Wait for a free upload slot; returns the current epoch."""
+        with self._cond:
+            while True:
+                paused = self.paused_until - time.monotonic()
+                if paused <= 0 and self.in_flight < self.concurrency:
+                    self.in_flight += 1
+                    return self.epoch
+                self._cond.wait(timeout=paused if paused > 0 else None)
+
+    def release(self) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self, epoch: int, latency: float) -> None:
+        if latency > self.target_latency:
+            self.on_congestion(epoch, reason="slow")
+            return
+        with self._cond:
+            self.batch_size = min(self.max_batch_size, self.batch_size + self.batch_step)
+            self._successes += 1
+            if self._successes >= self.concurrency:
+                self._successes = 0
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+            self._cond.notify_all()
+
+    def on_congestion(self, epoch: int, reason: str, pause: Optional[float] = None) -> None:
+        with self._cond:
+            if pause:
+                self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            # Batches started before the last decrease already saw the old limits
+            if epoch == self.epoch:
+                self.epoch += 1
+                self._successes = 0
+                self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+                self.concurrency = max(1, self.concurrency // 2)
+                logger.info(
+                    "Upload limits decreased",
+                    reason=reason,
+                    batch_size=self.batch_size,
+                    concurrency=self.concurrency,
+                    pause_seconds=pause,
+                )
+            self._cond.notify_all()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"batch_size": self.batch_size, "concurrency": self.concurrency}
+
+
+class AdaptiveUploader:
+    """
+    Upload documents through `upload_fn` (e.g. vector_store.add_documents) in
+    concurrent, adaptively sized batches. Safe to share between threads: all
+    callers draw on the same limiter and worker pool.
+
+    Only the calling thread waits for upload slots; each worker task holds one
+    slot while it runs and hands failed batches back to the caller for retry,
+    so workers never block on the limiter.
+    """
+
+    def __init__(
+        self,
+        upload_fn: Callable[[List[Any]], Any],
+        limiter: Optional[AdaptiveLimiter] = None,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+    ):
+        self.upload_fn = upload_fn
+        self.limiter = limiter or AdaptiveLimiter()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.limiter.max_concurrency, thread_name_prefix="indexer-upload"
+        )
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(delay, retry_after) if retry_after is not None else delay
+
+    def upload(self, chunks: List[Any]) -> UploadResult:
+        """Upload `chunks` and block until every batch has succeeded or given up."""
+        result = UploadResult(total_chunks=len(chunks))
+        # (ready_at, batch_num, attempt, batch) waiting for their backoff to pass
+        retries: List[tuple] = []
+        outstanding = set()
+        start, batch_num = 0, 0
+        while start < len(chunks) or retries or outstanding:
+            now = time.monotonic()
+            retries.sort(key=lambda item: item[0])
+            if retries and retries[0][0] <= now:
+                _, num, attempt, batch = retries.pop(0)
+                epoch = self.limiter.acquire()
+            elif start < len(chunks):
+                epoch = self.limiter.acquire()
+                # Sliced only once a slot is free, so it uses the latest batch size
+                batch = chunks[start:start + self.limiter.batch_size]
+                start += len(batch)
+                batch_num += 1
+                num, attempt = batch_num, 0
+            else:
+                timeout = max(0.0, retries[0][0] - now) if retries else None
+                done, _ = wait(outstanding, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    outstanding.discard(future)
+                    retries.extend(future.result())
+                continue
+            outstanding.add(self._executor.submit(self._upload_batch, batch, num, attempt, epoch, result))
+            for future in [f for f in outstanding if f.done()]:
+                outstanding.discard(future)
+                retries.extend(future.result())
+        logger.info("Batch indexing completed", **result.as_dict(), **self.limiter.as_dict())
+        return result
+
+    def _upload_batch(self, batch: List[Any], batch_num: int, attempt: int, epoch: int, result: UploadResult) -> List[tuple]:
+        """Run one attempt in an acquired slot; returns batches to retry as (ready_at, batch_num, attempt, batch)."""
+        started = time.monotonic()
+        try:
+            self.upload_fn(batch)
+        except Exception as e:
+            error = e
+        else:
+            self.limiter.release()
+            self.limiter.on_success(epoch, time.monotonic() - started)
+            with self.limiter._cond:
+                result.successful += len(batch)
+            return []
+        self.limiter.release()
+
+        status = _status_code(error)
+        if status == 413 and len(batch) > 1:
+            # Too large for one request: upload the halves separately
+            half = len(batch) // 2
+            now = time.monotonic()
+            return [(now, batch_num, attempt, batch[:half]), (now, batch_num, attempt, batch[half:])]
+
+        retryable = status in THROTTLE_STATUSES or _is_transient(error, status)
+        if retryable and attempt < self.max_retries:
+            retry_after = _retry_after_seconds(error)
+            if status in THROTTLE_STATUSES:
+                self.limiter.on_congestion(epoch, reason=f"http_{status}", pause=retry_after)
+            delay = self.backoff(attempt, retry_after)
+            with self.limiter._cond:
+                result.retries += 1
+                result.throttled += status in THROTTLE_STATUSES
+            logger.warning(
+                f"Upload of batch {batch_num} failed, retrying",
+                status_code=status,
+                attempt=attempt + 1,
+                max_retries=self.max_retries,
+                wait_seconds=round(delay, 2),
+            )
+            return [(time.monotonic() + delay, batch_num, attempt + 1, batch)]
+
+        with self.limiter._cond:
+            result.failed += len(batch)
+            result.failed_batches.append(batch_num)
+            result.failed_chunks.extend(batch)
+        logger.error(
+            f"❌ Batch {batch_num} failed" + (" after retries" if retryable else " with non-retryable error"),
+            status_code=status,
+            error=str(error),
+            error_type=type(error).__name__,
+            documents_in_batch=len(batch),
+        )
+        return []
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
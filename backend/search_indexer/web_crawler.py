@@ -14,30 +14,24 @@ Required Environment Variables:
 - AZURE_DOCUMENT_INTELLIGENCE_KEY: Document Intelligence service key (optional if using managed identity)
 """
 
-from langchain_openai import AzureOpenAIEmbeddings
-from langchain_community.vectorstores.azuresearch import AzureSearch
-from langchain.document_loaders import WebBaseLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.schema import Document
+import json
 import os
-from azure.storage.blob import BlobServiceClient
-from azure.ai.documentintelligence import DocumentIntelligenceClient
-from azure.ai.documentintelligence.models import (
-    AnalyzeDocumentRequest,
-    DocumentContentFormat,
-)
-from azure.core.credentials import AzureKeyCredential
-from azure.identity import DefaultAzureCredential
-from azure.search.documents import SearchClient
-from azure.search.documents.indexes import SearchIndexClient
-from azure.core.exceptions import HttpResponseError
+import random
+import re
+import threading
 import traceback
 import time
-from typing import List
+from typing import TYPE_CHECKING, Dict, List, Optional
 from backend.core.logging import get_logger
 from dotenv import load_dotenv
 from pathlib import Path
 
+# LangChain and Azure SDK modules are imported where they are used, and clients are
+# built on first use, so importing this module (e.g. from backend.main) stays cheap
+# and does not need storage or Document Intelligence settings.
+if TYPE_CHECKING:
+    from langchain.schema import Document
+
 # Load environment variables from .env file in backend directory
 backend_dir = Path(__file__).parent.parent
 env_file = backend_dir / ".env"
@@ -49,39 +43,295 @@ logger = get_logger(__name__)
 
 # Environment variables (will be set in Azure Functions later)
 AZURE_STORAGE_CONNECTION_STRING = f"DefaultEndpointsProtocol=https;AccountName={os.getenv('AZURE_STORAGE_ACCOUNT_NAME')};AccountKey={os.getenv('AZURE_STORAGE_ACCOUNT_KEY')};EndpointSuffix=core.windows.net"
-blob_service_client = BlobServiceClient.from_connection_string(
-    AZURE_STORAGE_CONNECTION_STRING
-)
-container_client = blob_service_client.get_container_client(
-    os.getenv("AZURE_STORAGE_CONTAINER_NAME")
-)
-
-# Initialize Document Intelligence client
+
+# File types sent to Document Intelligence
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".doc", ".txt", ".html", ".json")
+
+# Indexing pipeline sizing: workers per stage and the bound on each stage's input queue
+INDEXER_DOWNLOAD_WORKERS = int(os.getenv("INDEXER_DOWNLOAD_WORKERS", "4"))
+INDEXER_ANALYZE_WORKERS = int(os.getenv("INDEXER_ANALYZE_WORKERS", "8"))
+INDEXER_UPLOAD_WORKERS = int(os.getenv("INDEXER_UPLOAD_WORKERS", "2"))
+INDEXER_UPLOAD_BATCH_SIZE = int(os.getenv("INDEXER_UPLOAD_BATCH_SIZE", "10"))
+INDEXER_QUEUE_SIZE = int(os.getenv("INDEXER_QUEUE_SIZE", "8"))
+
+# Bounded memory for downloads (see memory.py): blobs are streamed in chunks of
+# INDEXER_DOWNLOAD_CHUNK_MB, kept in memory up to INDEXER_SPOOL_MB and spooled to a
+# temporary file beyond it; document bytes held in memory across the run are capped at
+# INDEXER_MEMORY_LIMIT_MB (0 = no limit)
+INDEXER_DOWNLOAD_CHUNK_MB = int(os.getenv("INDEXER_DOWNLOAD_CHUNK_MB", "4"))
+INDEXER_SPOOL_MB = int(os.getenv("INDEXER_SPOOL_MB", "16"))
+INDEXER_MEMORY_LIMIT_MB = int(os.getenv("INDEXER_MEMORY_LIMIT_MB", "256"))
+
+# Structure-aware chunking (see chunker.py): chunks of up to INDEXER_CHUNK_MAX_TOKENS,
+# broken at headings once they reach INDEXER_CHUNK_MIN_TOKENS; paragraphs split into
+# token windows overlap by INDEXER_CHUNK_OVERLAP_TOKENS. Changing these re-chunks every
+# source on the next run
+INDEXER_CHUNK_MAX_TOKENS = int(os.getenv("INDEXER_CHUNK_MAX_TOKENS", "512"))
+INDEXER_CHUNK_MIN_TOKENS = int(os.getenv("INDEXER_CHUNK_MIN_TOKENS", "128"))
+INDEXER_CHUNK_OVERLAP_TOKENS = int(os.getenv("INDEXER_CHUNK_OVERLAP_TOKENS", "64"))
+
+# Adaptive uploads (see uploader.py): INDEXER_UPLOAD_BATCH_SIZE is the starting batch
+# size, which grows up to the maximum and, with concurrency, halves on throttling or
+# when a batch takes longer than the target latency (seconds)
+INDEXER_UPLOAD_MAX_BATCH_SIZE = int(os.getenv("INDEXER_UPLOAD_MAX_BATCH_SIZE", "100"))
+INDEXER_UPLOAD_MAX_CONCURRENCY = int(os.getenv("INDEXER_UPLOAD_MAX_CONCURRENCY", "8"))
+INDEXER_UPLOAD_TARGET_LATENCY = float(os.getenv("INDEXER_UPLOAD_TARGET_LATENCY", "5"))
+
+# Web pages indexed alongside the blobs (comma-separated): the seeds of the web crawl
+INDEXER_WEB_PAGES = [
+    url.strip()
+    for url in os.getenv(
+        "INDEXER_WEB_PAGES", "https://portalext.nrs.gov.bc.ca/web/client/-/unit-converter"
+    ).split(",")
+    if url.strip()
+]
+
+# Web crawl (see crawler.py): links are followed up to INDEXER_CRAWL_MAX_DEPTH hops from
+# the seeds (0 = the seeds only), within INDEXER_CRAWL_ALLOWED_PREFIXES (comma-separated;
+# default: below each seed's directory), for at most INDEXER_CRAWL_MAX_PAGES pages. Each
+# host gets at most INDEXER_CRAWL_HOST_RPS requests per second and
+# INDEXER_CRAWL_HOST_CONCURRENCY at a time; pages within INDEXER_CRAWL_DUPLICATE_DISTANCE
+# bits of SimHash of a page already crawled are skipped as near-duplicates
+INDEXER_CRAWL_MAX_DEPTH = int(os.getenv("INDEXER_CRAWL_MAX_DEPTH", "1"))
+INDEXER_CRAWL_MAX_PAGES = int(os.getenv("INDEXER_CRAWL_MAX_PAGES", "100"))
+INDEXER_CRAWL_ALLOWED_PREFIXES = [
+    prefix.strip() for prefix in os.getenv("INDEXER_CRAWL_ALLOWED_PREFIXES", "").split(",") if prefix.strip()
+]
+INDEXER_CRAWL_CONCURRENCY = int(os.getenv("INDEXER_CRAWL_CONCURRENCY", "8"))
+INDEXER_CRAWL_HOST_RPS = float(os.getenv("INDEXER_CRAWL_HOST_RPS", "2"))
+INDEXER_CRAWL_HOST_CONCURRENCY = int(os.getenv("INDEXER_CRAWL_HOST_CONCURRENCY", "2"))
+INDEXER_CRAWL_DUPLICATE_DISTANCE = int(os.getenv("INDEXER_CRAWL_DUPLICATE_DISTANCE", "6"))
+INDEXER_CRAWL_USER_AGENT = os.getenv("INDEXER_CRAWL_USER_AGENT", "nr-ai-form-indexer")
+
+# Seconds between manifest checkpoints during a run; finished sources are not redone
+# when a cancelled or interrupted run is resumed
+INDEXER_CHECKPOINT_SECONDS = float(os.getenv("INDEXER_CHECKPOINT_SECONDS", "30"))
+
+# Verification after indexing polls the index, backing off, until the uploaded chunks are
+# searchable (INDEXER_VERIFY_KEYS of their keys are looked up) and the document count
+# has moved by the expected delta, for at most INDEXER_VERIFY_TIMEOUT seconds
+INDEXER_VERIFY_TIMEOUT = float(os.getenv("INDEXER_VERIFY_TIMEOUT", "30"))
+INDEXER_VERIFY_KEYS = int(os.getenv("INDEXER_VERIFY_KEYS", "100"))
+
+# Incremental indexing manifest: "local" (INDEXER_MANIFEST_PATH is a file path) or
+# "blob" (INDEXER_MANIFEST_PATH is a blob name in the source container)
+INDEXER_MANIFEST_STORE = os.getenv("INDEXER_MANIFEST_STORE", "local").lower()
+INDEXER_MANIFEST_PATH = os.getenv("INDEXER_MANIFEST_PATH", "index_manifest.json")
+
+SEARCH_INDEX_NAME = "bc-water-index"
+
+# Embedding model deployment, and the local cache of chunk embeddings keyed by model
+# and normalized text (an empty EMBEDDING_CACHE_PATH disables the cache)
+EMBEDDING_DEPLOYMENT = os.getenv("EMBEDDING_DEPLOYMENT", "text-embedding-3-large")
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "embedding_cache.sqlite")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+
+# Document Intelligence settings
 document_intelligence_endpoint = os.getenv("AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT")
 document_intelligence_key = os.getenv("AZURE_DOCUMENT_INTELLIGENCE_KEY")
 
-# Use key-based authentication if available, otherwise use DefaultAzureCredential
-if document_intelligence_key:
-    document_intelligence_client = DocumentIntelligenceClient(
-        endpoint=document_intelligence_endpoint,
-        credential=AzureKeyCredential(document_intelligence_key),
-    )
-else:
-    document_intelligence_client = DocumentIntelligenceClient(
-        endpoint=document_intelligence_endpoint, credential=DefaultAzureCredential()
-    )
+# Concurrent analysis (see analyzer.py): analyses in flight across all callers, and the
+# service's per-second limits for submitting analyses and polling their results
+INDEXER_DI_MAX_IN_FLIGHT = int(os.getenv("INDEXER_DI_MAX_IN_FLIGHT", "8"))
+INDEXER_DI_SUBMIT_RPS = float(os.getenv("INDEXER_DI_SUBMIT_RPS", "15"))
+INDEXER_DI_POLL_RPS = float(os.getenv("INDEXER_DI_POLL_RPS", "50"))
+
+# Cache of analysis results keyed by document hash, model and output format (see
+# analysis_cache.py): "disk" (INDEXER_DI_CACHE_PATH is a directory), "blob" (entries in
+# INDEXER_DI_CACHE_CONTAINER) or "none"; the price is only used to report cost saved
+INDEXER_DI_CACHE = os.getenv("INDEXER_DI_CACHE", "disk").lower()
+INDEXER_DI_CACHE_PATH = os.getenv("INDEXER_DI_CACHE_PATH", "di_cache")
+INDEXER_DI_CACHE_CONTAINER = os.getenv("INDEXER_DI_CACHE_CONTAINER", "di-cache")
+INDEXER_DI_CACHE_MAX_MB = int(os.getenv("INDEXER_DI_CACHE_MAX_MB", "1024"))
+INDEXER_DI_PRICE_PER_1000_PAGES = float(os.getenv("INDEXER_DI_PRICE_PER_1000_PAGES", "1.5"))
 
 # Lazy initialization for Azure services
+_blob_service_client = None
+_container_client = None
+_document_intelligence_client = None
+_document_analyzer = None
+_document_analyzer_lock = threading.Lock()
+_analysis_cache = None
+_analysis_cache_lock = threading.Lock()
 _embeddings = None
 _vector_store = None
+_search_clients = {}
+_search_index_client = None
+_search_transport_instance = None
+_search_clients_lock = threading.Lock()
+
+
+def get_blob_service_client():
+    """Get Azure Blob Storage service client with lazy initialization."""
+    global _blob_service_client
+    if _blob_service_client is None:
+        from azure.storage.blob import BlobServiceClient
+
+        # Downloads are fetched in chunks of this size rather than a single 32 MB first GET
+        chunk_bytes = INDEXER_DOWNLOAD_CHUNK_MB * 1024 * 1024
+        _blob_service_client = BlobServiceClient.from_connection_string(
+            AZURE_STORAGE_CONNECTION_STRING,
+            max_single_get_size=chunk_bytes,
+            max_chunk_get_size=chunk_bytes,
+        )
+    return _blob_service_client
+
+
+def get_container_client():
+    """Get the source documents container client with lazy initialization."""
+    global _container_client
+    if _container_client is None:
+        _container_client = get_blob_service_client().get_container_client(
+            os.getenv("AZURE_STORAGE_CONTAINER_NAME")
+        )
+    return _container_client
+
+
+def get_document_intelligence_client():
+    """Get Azure Document Intelligence client with lazy initialization."""
+    global _document_intelligence_client
+    if _document_intelligence_client is None:
+        from azure.ai.documentintelligence import DocumentIntelligenceClient
+        from azure.core.credentials import AzureKeyCredential
+
+        # Use key-based authentication if available, otherwise use DefaultAzureCredential
+        if document_intelligence_key:
+            credential = AzureKeyCredential(document_intelligence_key)
+        else:
+            from azure.identity import DefaultAzureCredential
+
+            credential = DefaultAzureCredential()
+        _document_intelligence_client = DocumentIntelligenceClient(
+            endpoint=document_intelligence_endpoint, credential=credential
+        )
+    return _document_intelligence_client
+
+
+def get_document_analyzer():
+    """Get the shared concurrent Document Intelligence analyzer with lazy initialization."""
+    global _document_analyzer
+    with _document_analyzer_lock:
+        if _document_analyzer is None:
+            _document_analyzer = _build_document_analyzer()
+    return _document_analyzer
+
+
+def _build_document_analyzer():
+    from backend.search_indexer.analyzer import DocumentAnalyzer
+
+    def build_client(**kwargs):
+        from azure.ai.documentintelligence.aio import DocumentIntelligenceClient
+        from azure.core.credentials import AzureKeyCredential
+
+        if document_intelligence_key:
+            credential = AzureKeyCredential(document_intelligence_key)
+        else:
+            from azure.identity.aio import DefaultAzureCredential
+
+            credential = DefaultAzureCredential()
+        return DocumentIntelligenceClient(
+            endpoint=document_intelligence_endpoint, credential=credential, **kwargs
+        )
+
+    return DocumentAnalyzer(
+        build_client,
+        max_in_flight=INDEXER_DI_MAX_IN_FLIGHT,
+        submit_rate=INDEXER_DI_SUBMIT_RPS,
+        poll_rate=INDEXER_DI_POLL_RPS,
+    )
+
+
+def get_analysis_cache():
+    """Get the Document Intelligence result cache, or None when INDEXER_DI_CACHE is "none"."""
+    global _analysis_cache
+    if INDEXER_DI_CACHE == "none":
+        return None
+    with _analysis_cache_lock:
+        if _analysis_cache is None:
+            from backend.search_indexer.analysis_cache import AnalysisCache, BlobCacheBackend, DiskCacheBackend
+            from backend.search_indexer.analyzer import CONTENT_FORMAT
+
+            max_bytes = INDEXER_DI_CACHE_MAX_MB * 1024 * 1024
+            if INDEXER_DI_CACHE == "blob":
+                backend = BlobCacheBackend(
+                    get_blob_service_client().get_container_client(INDEXER_DI_CACHE_CONTAINER), max_bytes
+                )
+            elif INDEXER_DI_CACHE == "disk":
+                backend = DiskCacheBackend(INDEXER_DI_CACHE_PATH, max_bytes)
+            else:
+                raise ValueError(f"Unknown INDEXER_DI_CACHE: {INDEXER_DI_CACHE!r}")
+            _analysis_cache = AnalysisCache(
+                backend,
+                model_id=get_document_analyzer().model_id,
+                content_format=CONTENT_FORMAT,
+                price_per_1000_pages=INDEXER_DI_PRICE_PER_1000_PAGES,
+            )
+    return _analysis_cache
+
+
+def get_text_splitter():
+    """Get the chunker that splits analyzed documents into search chunks."""
+    from backend.search_indexer.chunker import MarkdownChunker
+
+    return MarkdownChunker(
+        max_tokens=INDEXER_CHUNK_MAX_TOKENS,
+        min_tokens=INDEXER_CHUNK_MIN_TOKENS,
+        overlap_tokens=INDEXER_CHUNK_OVERLAP_TOKENS,
+    )
+
+
+def get_web_crawler(known=None):
+    """Get a crawler over INDEXER_WEB_PAGES; `known` holds the validators recorded for pages seen before."""
+    from backend.search_indexer.crawler import AsyncCrawler
+
+    return AsyncCrawler(
+        INDEXER_WEB_PAGES,
+        allowed_prefixes=INDEXER_CRAWL_ALLOWED_PREFIXES,
+        max_pages=INDEXER_CRAWL_MAX_PAGES,
+        max_depth=INDEXER_CRAWL_MAX_DEPTH,
+        concurrency=INDEXER_CRAWL_CONCURRENCY,
+        host_rate=INDEXER_CRAWL_HOST_RPS,
+        host_concurrency=INDEXER_CRAWL_HOST_CONCURRENCY,
+        duplicate_distance=INDEXER_CRAWL_DUPLICATE_DISTANCE,
+        known=known,
+        user_agent=INDEXER_CRAWL_USER_AGENT,
+        buffer=INDEXER_QUEUE_SIZE,
+    )
+
+
+_LAZY_CLIENTS = {
+    "blob_service_client": get_blob_service_client,
+    "container_client": get_container_client,
+    "document_intelligence_client": get_document_intelligence_client,
+}
+
+
+def __getattr__(name):
+    # Keep the former module-level client attributes working, built on first access
+    if name in _LAZY_CLIENTS:
+        return _LAZY_CLIENTS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def get_embeddings():
-    """Get Azure OpenAI embeddings client with lazy initialization."""
+    """
+    Get the Azure OpenAI embeddings client with lazy initialization, wrapped in the
+    embedding cache unless EMBEDDING_CACHE_PATH is empty.
+    """
     global _embeddings
     if _embeddings is None:
-        _embeddings = AzureOpenAIEmbeddings(
-            azure_deployment="text-embedding-3-large",  # Deploy this embedding model in Azure OpenAI if not already (similar to GPT deployment)
-            openai_api_version="2024-02-01",  # Adjust to latest
+        from langchain_openai import AzureOpenAIEmbeddings
+
+        from backend.search_indexer.embedding_cache import build_cached_embeddings
+
+        _embeddings = build_cached_embeddings(
+            AzureOpenAIEmbeddings(
+                azure_deployment=EMBEDDING_DEPLOYMENT,  # Deploy this embedding model in Azure OpenAI if not already (similar to GPT deployment)
+                openai_api_version="2024-02-01",  # Adjust to latest
+            ),
+            EMBEDDING_CACHE_PATH,
+            model=EMBEDDING_DEPLOYMENT,
+            batch_size=EMBEDDING_BATCH_SIZE,
         )
     return _embeddings
 
@@ -89,105 +339,222 @@ def get_vector_store():
     """Get Azure Search vector store with lazy initialization."""
     global _vector_store
     if _vector_store is None:
+        from langchain_community.vectorstores.azuresearch import AzureSearch
+
         _vector_store = AzureSearch(
             azure_search_endpoint=os.getenv("AZURE_SEARCH_ENDPOINT"),
             azure_search_key=os.getenv("AZURE_SEARCH_ADMIN_KEY"),
-            index_name="bc-water-index",  # Create if doesn't exist
-            embedding_function=get_embeddings().embed_query,
+            index_name=SEARCH_INDEX_NAME,  # Create if doesn't exist
+            # An Embeddings object (not embed_query) so each upload batch is embedded in one call
+            embedding_function=get_embeddings(),
             search_type="hybrid",  # Enables vector + keyword
         )
     return _vector_store
 
 
-def verify_indexing(index_name="bc-water-index", wait_seconds=3):
+def _search_credential():
+    from azure.core.credentials import AzureKeyCredential
+
+    search_key = os.getenv("AZURE_SEARCH_KEY") or os.getenv("AZURE_SEARCH_ADMIN_KEY")
+    if not os.getenv("AZURE_SEARCH_ENDPOINT") or not search_key:
+        return None
+    return AzureKeyCredential(search_key)
+
+
+def _search_transport():
+    """One HTTP session (connection pool) shared by the search clients."""
+    global _search_transport_instance
+    if _search_transport_instance is None:
+        import requests
+        from azure.core.pipeline.transport import RequestsTransport
+
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=INDEXER_UPLOAD_MAX_CONCURRENCY)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _search_transport_instance = RequestsTransport(session=session, session_owner=False)
+    return _search_transport_instance
+
+
+def get_search_client(index_name=SEARCH_INDEX_NAME):
+    """Get the shared SearchClient for an index, or None without Azure Search credentials."""
+    with _search_clients_lock:
+        if index_name not in _search_clients:
+            from azure.search.documents import SearchClient
+
+            credential = _search_credential()
+            if credential is None:
+                return None
+            _search_clients[index_name] = SearchClient(
+                endpoint=os.getenv("AZURE_SEARCH_ENDPOINT"),
+                index_name=index_name,
+                credential=credential,
+                transport=_search_transport(),
+            )
+        return _search_clients[index_name]
+
+
+def get_search_index_client():
+    """Get the shared SearchIndexClient, or None without Azure Search credentials."""
+    global _search_index_client
+    with _search_clients_lock:
+        if _search_index_client is None:
+            from azure.search.documents.indexes import SearchIndexClient
+
+            credential = _search_credential()
+            if credential is None:
+                return None
+            _search_index_client = SearchIndexClient(
+                endpoint=os.getenv("AZURE_SEARCH_ENDPOINT"),
+                credential=credential,
+                transport=_search_transport(),
+            )
+        return _search_index_client
+
+
+def _find_keys(search_client, keys: List[str], batch_size: int = 100) -> set:
+    """Keys among `keys` that are searchable, looked up with one filtered query per batch."""
+    found = set()
+    for i in range(0, len(keys), batch_size):
+        batch = keys[i:i + batch_size]
+        # Chunk keys are hex digests (or UUIDs), so they need no escaping
+        key_filter = "search.in(id, '{}', ',')".format(",".join(batch))
+        results = search_client.search(search_text="*", filter=key_filter, select=["id"], top=len(batch))
+        found.update(result["id"] for result in results)
+    return found
+
+
+_CHUNK_KEY = re.compile(r"[0-9a-f]{64}")
+
+
+def _legacy_chunk_ids(index_name=SEARCH_INDEX_NAME) -> Dict[str, List[str]]:
+    """
+    Keys of the documents uploaded before chunk keys were derived from the chunk
+    (random UUIDs, see manifest.chunk_id), by their metadata source.
+
+    Read with one pass over the index; a run without a manifest deletes a
+    source's legacy documents once its new chunks are uploaded, so the index
+    does not hold every passage twice.
+    """
+    search_client = get_search_client(index_name)
+    legacy: Dict[str, List[str]] = {}
+    for result in search_client.search(search_text="*", select=["id", "metadata"]):
+        key = result["id"]
+        if _CHUNK_KEY.fullmatch(key):
+            continue
+        metadata = result.get("metadata") or {}
+        if isinstance(metadata, str):
+            try:
+                metadata = json.loads(metadata)
+            except ValueError:
+                metadata = {}
+        source = metadata.get("source") if isinstance(metadata, dict) else None
+        if source:
+            legacy.setdefault(source, []).append(key)
+    return legacy
+
+
+def _index_document_count(index_name=SEARCH_INDEX_NAME) -> Optional[int]:
+    """Current document count of the index, or None if it cannot be read."""
+    try:
+        search_client = get_search_client(index_name)
+        return search_client.get_document_count() if search_client is not None else None
+    except Exception as e:
+        logger.warning("Could not read the index document count", error=str(e))
+        return None
+
+
+def verify_indexing(
+    index_name=SEARCH_INDEX_NAME,
+    expected_keys: Optional[List[str]] = None,
+    expected_count: Optional[int] = None,
+    timeout: Optional[float] = None,
+    initial_delay: float = 0.25,
+    max_delay: float = 2.0,
+):
     """
     Verify that documents have been successfully indexed.
-    
+
+    Uploaded documents become searchable shortly after the upload returns, so
+    instead of waiting a fixed time this polls, with exponential backoff, until
+    every key in `expected_keys` is found and the index holds at least
+    `expected_count` documents, or `timeout` seconds have passed. Without
+    expectations it checks once.
+
     Args:
         index_name: Name of the search index
-        wait_seconds: Seconds to wait for indexing to complete
-        
+        expected_keys: Keys of uploaded chunks to look up (INDEXER_VERIFY_KEYS of them are sampled)
+        expected_count: Document count the index should reach
+        timeout: Seconds to keep polling (default INDEXER_VERIFY_TIMEOUT)
+
     Returns:
         Dictionary with verification results
     """
+    timeout = INDEXER_VERIFY_TIMEOUT if timeout is None else timeout
     try:
-        # Wait for indexing to complete
-        logger.info(f"Waiting {wait_seconds} seconds for indexing to complete...")
-        time.sleep(wait_seconds)
-        
-        search_endpoint = os.getenv("AZURE_SEARCH_ENDPOINT")
-        search_key = os.getenv("AZURE_SEARCH_KEY") or os.getenv("AZURE_SEARCH_ADMIN_KEY")
-        
-        if not search_endpoint or not search_key:
+        search_client = get_search_client(index_name)
+        if search_client is None:
             logger.error("Missing Azure Search credentials for verification")
             return {
                 "success": False,
                 "error": "Missing Azure Search credentials"
             }
-        
-        credential = AzureKeyCredential(search_key)
-        
-        # Get index statistics
-        logger.info("Fetching index statistics")
-        index_client = SearchIndexClient(endpoint=search_endpoint, credential=credential)
-        stats = index_client.get_index_statistics(index_name)
-        
+
+        keys = list(expected_keys or [])
+        if len(keys) > INDEXER_VERIFY_KEYS:
+            keys = random.Random(0).sample(keys, INDEXER_VERIFY_KEYS)
+        missing = set(keys)
+        started = time.monotonic()
+        delay = initial_delay
+        polls = 0
+        while True:
+            polls += 1
+            document_count = search_client.get_document_count()
+            if missing:
+                missing -= _find_keys(search_client, sorted(missing))
+            count_reached = expected_count is None or document_count >= expected_count
+            elapsed = time.monotonic() - started
+            if (not missing and count_reached) or elapsed >= timeout:
+                break
+            time.sleep(min(delay, timeout - elapsed))
+            delay = min(delay * 1.5, max_delay)
+
+        stats = get_search_index_client().get_index_statistics(index_name)
         # Handle both dict and object responses
         if isinstance(stats, dict):
-            document_count = stats.get('document_count', 0)
             storage_size = stats.get('storage_size', 0)
         else:
-            document_count = getattr(stats, 'document_count', 0)
             storage_size = getattr(stats, 'storage_size', 0)
-        
-        logger.info(
-            "Index statistics retrieved",
-            document_count=document_count,
-            storage_size=storage_size
-        )
-        
-        # Search for sample documents
-        logger.info("Searching for sample documents")
-        search_client = SearchClient(
-            endpoint=search_endpoint,
-            index_name=index_name,
-            credential=credential
-        )
-        
-        # Search for all documents
-        results = list(search_client.search(search_text="*", top=5))
-        
-        logger.info(
-            "Sample documents retrieved",
-            sample_count=len(results)
-        )
-        
-        # Log sample document previews
-        for i, result in enumerate(results, 1):
-            content_preview = str(result.get('content', ''))[:100]
-            logger.debug(
-                f"Sample document {i}",
-                content_preview=content_preview
-            )
-        
+
         verification_result = {
-            "success": True,
+            "success": not missing and (bool(keys) or expected_count is not None or document_count > 0),
             "document_count": document_count,
+            "expected_count": expected_count,
+            "count_reached": count_reached,
             "storage_size": storage_size,
-            "sample_documents_found": len(results),
-            "has_documents": document_count > 0
+            "keys_checked": len(keys),
+            "keys_missing": len(missing),
+            "has_documents": document_count > 0,
+            "polls": polls,
+            "elapsed_seconds": round(time.monotonic() - started, 3),
         }
-        
-        if document_count > 0:
+
+        if verification_result["success"]:
             logger.info(
                 "✅ Indexing verification successful",
                 **verification_result
             )
+        elif missing:
+            logger.warning(
+                "⚠️  Uploaded chunks not searchable before the verification timeout",
+                missing_sample=sorted(missing)[:5],
+                **verification_result
+            )
         else:
             logger.warning("⚠️  No documents found in index")
-        
+
         return verification_result
-        
+
     except Exception as e:
         logger.error(
             "Error during indexing verification",
@@ -202,115 +569,43 @@ def verify_indexing(index_name="bc-water-index", wait_seconds=3):
         }
 
 
-def add_documents_in_batches(vector_store, chunks: List[Document], batch_size: int = 10, max_retries: int = 3):
+def add_documents_in_batches(vector_store, chunks: List["Document"], batch_size: int = 10, max_retries: int = 3):
     """
-    Add documents to vector store in smaller batches with retry logic.
-    
+    Add documents to vector store in concurrent, adaptively sized batches (see uploader.py).
+
     Args:
         vector_store: The Azure Search vector store
         chunks: List of document chunks to index
-        batch_size: Number of documents per batch (default: 10)
-        max_retries: Maximum number of retry attempts per batch (default: 3)
-        
+        batch_size: Initial number of documents per batch (default: 10)
+        max_retries: Maximum number of retries per batch on throttling or transient errors (default: 3)
+
     Returns:
         Dictionary with indexing results
     """
-    total_chunks = len(chunks)
-    successful = 0
-    failed = 0
-    failed_batches = []
-    
-    logger.info(
-        "Starting batch indexing",
-        total_chunks=total_chunks,
-        batch_size=batch_size
+    from backend.search_indexer.uploader import AdaptiveUploader
+
+    uploader = AdaptiveUploader(
+        vector_store.add_documents, _upload_limiter(batch_size), max_retries=max_retries
     )
-    
-    # Process chunks in batches
-    for i in range(0, total_chunks, batch_size):
-        batch = chunks[i:i + batch_size]
-        batch_num = (i // batch_size) + 1
-        total_batches = (total_chunks + batch_size - 1) // batch_size
-        
-        logger.info(
-            f"Processing batch {batch_num}/{total_batches}",
-            batch_start=i,
-            batch_end=min(i + batch_size, total_chunks)
-        )
-        
-        # Retry logic for each batch
-        for attempt in range(max_retries):
-            try:
-                vector_store.add_documents(batch)
-                successful += len(batch)
-                logger.info(
-                    f"✅ Batch {batch_num} indexed successfully",
-                    documents_in_batch=len(batch),
-                    attempt=attempt + 1
-                )
-                break  # Success, move to next batch
-                
-            except HttpResponseError as e:
-                if "Bad Gateway" in str(e) or "502" in str(e):
-                    if attempt < max_retries - 1:
-                        wait_time = (attempt + 1) * 2  # Exponential backoff: 2s, 4s, 6s
-                        logger.warning(
-                            f"Bad Gateway error on batch {batch_num}, retrying...",
-                            attempt=attempt + 1,
-                            max_retries=max_retries,
-                            wait_seconds=wait_time
-                        )
-                        time.sleep(wait_time)
-                    else:
-                        failed += len(batch)
-                        failed_batches.append(batch_num)
-                        logger.error(
-                            f"❌ Batch {batch_num} failed after {max_retries} attempts",
-                            error=str(e),
-                            documents_in_batch=len(batch)
-                        )
-                else:
-                    # Different error, don't retry
-                    failed += len(batch)
-                    failed_batches.append(batch_num)
-                    logger.error(
-                        f"❌ Batch {batch_num} failed with non-retryable error",
-                        error=str(e),
-                        error_type=type(e).__name__,
-                        documents_in_batch=len(batch)
-                    )
-                    break
-                    
-            except Exception as e:
-                failed += len(batch)
-                failed_batches.append(batch_num)
-                logger.error(
-                    f"❌ Batch {batch_num} failed with unexpected error",
-                    error=str(e),
-                    error_type=type(e).__name__,
-                    documents_in_batch=len(batch),
-                    exc_info=True
-                )
-                break
-        
-        # Small delay between batches to avoid overwhelming the service
-        if i + batch_size < total_chunks:
-            time.sleep(0.5)
-    
-    result = {
-        "total_chunks": total_chunks,
-        "successful": successful,
-        "failed": failed,
-        "failed_batches": failed_batches,
-        "success_rate": (successful / total_chunks * 100) if total_chunks > 0 else 0
-    }
-    
-    logger.info(
-        "Batch indexing completed",
-        **result
+    try:
+        logger.info("Starting batch indexing", total_chunks=len(chunks), batch_size=batch_size)
+        return uploader.upload(chunks).as_dict()
+    finally:
+        uploader.close()
+
+
+def _upload_limiter(batch_size: int = None):
+    """AIMD limits for search uploads, starting from `batch_size` documents per batch."""
+    from backend.search_indexer.uploader import AdaptiveLimiter
+
+    batch_size = batch_size or INDEXER_UPLOAD_BATCH_SIZE
+    return AdaptiveLimiter(
+        batch_size=batch_size,
+        max_batch_size=max(batch_size, INDEXER_UPLOAD_MAX_BATCH_SIZE),
+        concurrency=min(2, INDEXER_UPLOAD_MAX_CONCURRENCY),
+        max_concurrency=INDEXER_UPLOAD_MAX_CONCURRENCY,
+        target_latency=INDEXER_UPLOAD_TARGET_LATENCY,
     )
-    
-    return result
 
 
 def process_document_with_intelligence(blob_name, blob_data):
@@ -318,10 +613,21 @@ def process_document_with_intelligence(blob_name, blob_data):
     Process a document using Azure Document Intelligence.
     
     Sends the document bytes directly to Document Intelligence (not via URL)
-    to avoid issues with private blob storage endpoints.
+    to avoid issues with private blob storage endpoints. `blob_data` is either
+    bytes or a SpooledBlob (see memory.py), whose file is streamed as the request
+    body instead of being read into memory. The analysis runs on the
+    shared DocumentAnalyzer, so analyses from concurrent callers overlap within
+    the service limits while this call waits for its own result. Documents whose
+    bytes were analyzed before are served from the analysis cache instead.
     
     Returns a Document object with the extracted content
     """
+    from azure.core.exceptions import HttpResponseError
+    from langchain.schema import Document
+
+    from backend.search_indexer.manifest import content_hash
+    from backend.search_indexer.memory import SpooledBlob
+
     try:
         logger.info(
             "Processing document with Document Intelligence",
@@ -329,23 +635,21 @@ def process_document_with_intelligence(blob_name, blob_data):
             file_size=len(blob_data)
         )
         
-        # Create the request with the blob data bytes
-        # This sends the document content directly, avoiding blob URL access issues
-        analyze_request = AnalyzeDocumentRequest(bytes_source=blob_data)
-
-        # Use the prebuilt-read model for general document reading
-        # For tables and forms, consider using "prebuilt-layout"
-        poller = document_intelligence_client.begin_analyze_document(
-            "prebuilt-read",
-            analyze_request,
-            output_content_format=DocumentContentFormat.MARKDOWN,
-        )
-        
-        # Wait for the analysis to complete
-        result = poller.result()
-
-        # Extract the content
-        content = result.content if result.content else ""
+        spooled = isinstance(blob_data, SpooledBlob)
+        digest = blob_data.sha256 if spooled else content_hash(blob_data)
+        cache = get_analysis_cache()
+        cached = cache.get(digest) if cache else None
+        if cached is not None:
+            content = cached["content"]
+            logger.info("Using cached Document Intelligence result", blob_name=blob_name, pages=cached["pages"])
+        else:
+            # Sends the document content directly, avoiding blob URL access issues. Uses the
+            # prebuilt-read model for general document reading; for tables and forms,
+            # consider "prebuilt-layout"
+            result = get_document_analyzer().analyze(blob_data.stream() if spooled else blob_data)
+            content = result.content
+            if cache and content:
+                cache.put(digest, content, result.pages, result.seconds)
         
         if not content:
             logger.warning(
@@ -408,94 +712,432 @@ def process_document_with_intelligence(blob_name, blob_data):
         return None
 
 
-def start_indexing():
-    try:
-        # Load and chunk documents
-        docs = []
-        logger.info("Starting document loading from blob storage")
+def get_manifest_store():
+    """Return the configured index manifest store (local file or blob)."""
+    from backend.search_indexer.manifest import BlobManifestStore, LocalManifestStore
 
-        for blob in container_client.list_blobs():
-            try:
-                # Get the blob data
-                blob_client = container_client.get_blob_client(blob.name)
-                blob_data = blob_client.download_blob().readall()
+    if INDEXER_MANIFEST_STORE == "blob":
+        return BlobManifestStore(get_container_client(), INDEXER_MANIFEST_PATH)
+    return LocalManifestStore(INDEXER_MANIFEST_PATH)
 
-                if blob.name.endswith((".pdf", ".docx", ".doc", ".txt", ".html", ".json")):
-                    logger.info("Processing document", blob_name=blob.name)
 
-                    # Use Document Intelligence to process the document
-                    document = process_document_with_intelligence(blob.name, blob_data)
+def _download_blob(blob_name: str, budget=None):
+    """Stream one blob into a SpooledBlob within the memory budget; the caller closes it."""
+    from backend.search_indexer.memory import download_spooled
 
-                    if document:
-                        docs.append(document)
-                        logger.info(
-                            "Successfully processed document", blob_name=blob.name
-                        )
-                    else:
-                        logger.warning(
-                            "Failed to process document", blob_name=blob.name
-                        )
+    blob = download_spooled(
+        get_container_client().get_blob_client(blob_name), INDEXER_SPOOL_MB * 1024 * 1024, budget
+    )
+    logger.info("Downloaded blob", blob_name=blob_name, size_bytes=blob.size, spooled_to_disk=blob.on_disk)
+    return blob
+
+
+def _list_source_blobs(skipped: List[str]) -> dict:
+    """Return {blob name: etag} for supported blobs, recording the rest in `skipped`."""
+    listing = {}
+    for blob in get_container_client().list_blobs():
+        if INDEXER_MANIFEST_STORE == "blob" and blob.name == INDEXER_MANIFEST_PATH:
+            continue
+        if blob.name.endswith(SUPPORTED_EXTENSIONS):
+            listing[blob.name] = blob.etag
+        else:
+            logger.debug("Skipping unsupported file type", blob_name=blob.name)
+            skipped.append(blob.name)
+    return listing
 
-                else:
-                    logger.debug("Skipping unsupported file type", blob_name=blob.name)
-
-            except Exception as blob_error:
-                logger.error(
-                    "Error processing blob",
-                    blob_name=blob.name,
-                    error=str(blob_error),
-                    error_type=type(blob_error).__name__,
-                    exc_info=True,
-                )
-                continue
 
-        # Example for webpage
+def _is_web_source(name: str) -> bool:
+    return name.startswith(("http://", "https://"))
+
+
+def _merge_indexing_results(total: dict, result: dict) -> None:
+    total["total_chunks"] += result["total_chunks"]
+    total["successful"] += result["successful"]
+    total["failed"] += result["failed"]
+    total["failed_batches"].extend(result["failed_batches"])
+    total["retries"] += result["retries"]
+    total["throttled"] += result["throttled"]
+
+
+def _delete_chunks(vector_store, chunk_ids: List[str], batch_size: int = 1000) -> List[str]:
+    """Delete chunks from the index by key; returns the IDs that could not be deleted."""
+    failed = []
+    for i in range(0, len(chunk_ids), batch_size):
+        batch = chunk_ids[i:i + batch_size]
         try:
-            logger.info("Loading webpage")
-            web_loader = WebBaseLoader(
-                "https://portalext.nrs.gov.bc.ca/web/client/-/unit-converter"
-            )
-            docs.extend(web_loader.load())
-            logger.info("Successfully loaded webpage")
-        except Exception as web_error:
+            vector_store.delete(ids=batch)
+        except Exception as e:
             logger.error(
-                "Error loading webpage",
-                error=str(web_error),
-                error_type=type(web_error).__name__,
-                exc_info=True,
+                "Failed to delete stale chunks",
+                chunk_count=len(batch),
+                error=str(e),
+                error_type=type(e).__name__,
             )
+            failed.extend(batch)
+    return failed
 
-        logger.info("Document loading completed", total_documents=len(docs))
 
-        # Add more loaders for other files...
-        logger.info("Starting text splitting")
-        splitter = RecursiveCharacterTextSplitter(chunk_size=512, chunk_overlap=50)
-        chunks = splitter.split_documents(docs)
-        logger.info("Text splitting completed", total_chunks=len(chunks))
+def start_indexing(stop_event=None, dry_run: bool = False, progress=None):
+    """
+    Incrementally index the supported blobs in the container plus the configured web pages.
 
-        # Index with batch processing and retry logic
-        logger.info("Starting vector store indexing with batch processing")
+    The index manifest (see manifest.py) decides what to do per source: unchanged
+    blobs are skipped without downloading, changed and new ones are re-chunked
+    and only chunks not already in the index are uploaded, stale chunks are
+    deleted, and blobs removed from the container are purged from the index.
+
+    Documents flow through a staged pipeline (see pipeline.py): concurrent
+    downloads -> Document Intelligence analysis with bounded concurrency ->
+    streaming chunking -> batched uploads. Each stage has its own workers and
+    bounded input queue, so memory does not grow with the corpus. Downloads are
+    streamed into spooled temporary files under a run-wide memory budget (see
+    memory.py), and the run reports its peak RSS.
+
+    A source is recorded in the manifest as soon as all of its new chunks are
+    uploaded, and the manifest is saved every INDEXER_CHECKPOINT_SECONDS, so a
+    cancelled or interrupted run resumes from the sources it had not finished.
+
+    Args:
+        stop_event: Optional threading.Event that cancels the run when set
+        dry_run: Only report what would be added, changed and removed
+        progress: Optional PipelineProgress updated while the run is in progress
+    """
+    from backend.search_indexer.manifest import IndexManifest, content_hash, plan_chunks
+    from backend.search_indexer.memory import MemoryBudget, RssSampler
+    from backend.search_indexer.pipeline import PipelineProgress, Stage, run_pipeline
+    from backend.search_indexer.uploader import AdaptiveUploader
+
+    progress = progress or PipelineProgress()
+    try:
+        progress.set_phase("listing")
+        manifest_store = get_manifest_store()
+        splitter = get_text_splitter()
+        manifest = IndexManifest.from_json(manifest_store.load(), SEARCH_INDEX_NAME, splitter.fingerprint)
+        skipped: List[str] = []
+        listing = _list_source_blobs(skipped)
+        blob_diff = manifest.diff(listing, scope=lambda name: not _is_web_source(name))
+        # Web pages are discovered by the crawl, so they are only compared once it is done
+        web_known = {name: entry for name, entry in manifest.entries.items() if _is_web_source(name)}
+        # Until the manifest records them as gone, the index may still hold documents
+        # uploaded with random keys (before chunk IDs were the keys); each source indexed
+        # by this run has them deleted along with its stale chunks
+        legacy = _legacy_chunk_ids() if not manifest.legacy_keys_deleted else {}
+        logger.info(
+            "Index manifest compared with sources",
+            added=len(blob_diff.added),
+            changed=len(blob_diff.changed),
+            unchanged=len(blob_diff.unchanged),
+            removed=len(blob_diff.removed),
+            web_seeds=len(INDEXER_WEB_PAGES),
+            legacy_sources=len(legacy),
+        )
+        if dry_run:
+            return {
+                "dry_run": True,
+                "blobs": blob_diff.report(manifest),
+                "legacy_chunks_to_delete": sum(
+                    len(keys) for source, keys in legacy.items() if source in listing or _is_web_source(source)
+                ),
+                "web_pages": {
+                    "seeds": INDEXER_WEB_PAGES,
+                    "indexed": len(web_known),
+                    "note": "web pages are discovered by crawling and checked with conditional GETs when indexing",
+                },
+                "skipped_unsupported": len(skipped),
+            }
+
+        logger.info(
+            "Starting document indexing pipeline",
+            download_workers=INDEXER_DOWNLOAD_WORKERS,
+            analyze_workers=INDEXER_ANALYZE_WORKERS,
+            upload_workers=INDEXER_UPLOAD_WORKERS,
+            queue_size=INDEXER_QUEUE_SIZE,
+        )
         vector_store = get_vector_store()
-        
-        # Use smaller batches to avoid Bad Gateway errors
-        indexing_result = add_documents_in_batches(
-            vector_store=vector_store,
-            chunks=chunks,
-            batch_size=10,  # Process 10 documents at a time
-            max_retries=3    # Retry up to 3 times per batch
+        # Embedding cache counters are cumulative; the run reports the difference
+        embedding_cache = getattr(getattr(vector_store, "embedding_function", None), "snapshot", None)
+        cache_before = embedding_cache() if embedding_cache else None
+        analysis_cache = get_analysis_cache()
+        analysis_before = analysis_cache.snapshot() if analysis_cache else None
+        # Shared by the upload workers, so batch size and concurrency adapt across them
+        uploader = AdaptiveUploader(vector_store.add_documents, _upload_limiter())
+        lock = threading.Lock()
+        indexing_result = {
+            "total_chunks": 0, "successful": 0, "failed": 0, "failed_batches": [], "retries": 0, "throttled": 0,
+        }
+        # source -> (etag, content hash, chunk ids, stale chunk ids, extra manifest fields),
+        # recorded once uploads succeed
+        pending = {}
+        unchanged_content: List[str] = []
+        failed_sources = set()
+        # source -> new chunks not yet through the upload stage
+        remaining = {}
+        budget = MemoryBudget(INDEXER_MEMORY_LIMIT_MB * 1024 * 1024)
+        spooled_to_disk = 0
+        # Keys of the chunks uploaded, for verification
+        uploaded_ids: List[str] = []
+        deleted_chunks = 0
+        sources_indexed = 0
+        last_checkpoint = time.monotonic()
+
+        def finish_sources(sources):
+            """Record sources whose new chunks are all uploaded, checkpointing the manifest."""
+            nonlocal deleted_chunks, sources_indexed, last_checkpoint
+            for source in sources:
+                with lock:
+                    etag, digest, chunk_ids, stale, extra = pending.pop(source)
+                    if source in failed_sources:
+                        # Keeps its previous entry and is retried on the next run
+                        continue
+                undeleted = _delete_chunks(vector_store, stale)
+                with lock:
+                    deleted_chunks += len(stale) - len(undeleted)
+                    manifest.record(source, etag, digest, chunk_ids + undeleted, extra)
+                    sources_indexed += 1
+            with lock:
+                progress.update(sources_indexed=sources_indexed, sources_failed=len(failed_sources))
+                if time.monotonic() - last_checkpoint >= INDEXER_CHECKPOINT_SECONDS:
+                    manifest_store.save(manifest.to_json())
+                    last_checkpoint = time.monotonic()
+
+        def download(blob_name):
+            nonlocal spooled_to_disk
+            blob = _download_blob(blob_name, budget)
+            if blob.on_disk:
+                with lock:
+                    spooled_to_disk += 1
+            return blob
+
+        def check_and_analyze(blob):
+            # The blob's memory, file and budget reservation are freed once it is analyzed
+            with blob:
+                blob_name = blob.name
+                if manifest.matches_content(blob_name, blob.sha256):
+                    # Re-uploaded with identical bytes: only the ETag changed
+                    with lock:
+                        manifest.touch(blob_name, listing[blob_name])
+                        unchanged_content.append(blob_name)
+                    return None
+                document = process_document_with_intelligence(blob_name, blob)
+            if document is None:
+                logger.warning("Failed to process document", blob_name=blob_name)
+                return None
+            return blob_name, listing[blob_name], blob.sha256, document, None
+
+        def chunk(item):
+            source, etag, digest, document, extra = item
+            chunks = splitter.split_documents([document])
+            for c in chunks:
+                c.metadata["source"] = source
+            to_upload, chunk_ids, stale = plan_chunks(manifest, source, chunks)
+            with lock:
+                stale = stale + legacy.pop(source, [])
+                pending[source] = (etag, digest, chunk_ids, stale, extra)
+                remaining[source] = len(to_upload)
+            logger.info(
+                "Chunked source",
+                source=source,
+                chunks=len(chunk_ids),
+                new_chunks=len(to_upload),
+                stale_chunks=len(stale),
+            )
+            if not to_upload:
+                finish_sources([source])
+            return to_upload
+
+        def upload(batch):
+            result = uploader.upload(batch)
+            done = []
+            failed = {id(c) for c in result.failed_chunks}
+            with lock:
+                _merge_indexing_results(indexing_result, result.as_dict())
+                failed_sources.update(c.metadata["source"] for c in result.failed_chunks)
+                uploaded_ids.extend(c.id for c in batch if id(c) not in failed)
+                for c in batch:
+                    source = c.metadata["source"]
+                    remaining[source] -= 1
+                    if remaining[source] == 0:
+                        done.append(source)
+            finish_sources(done)
+            return result
+
+        crawler = get_web_crawler(web_known)
+        # Pages the crawl reached, and those it found gone (or now duplicating another page)
+        web_reached = set()
+        web_gone = set()
+
+        def crawl_web_pages():
+            """Stream crawled pages that need (re-)chunking into the web pipeline."""
+            from backend.search_indexer.crawler import DUPLICATE, FETCHED, GONE, NOT_MODIFIED
+
+            if not INDEXER_WEB_PAGES:
+                return
+            logger.info("Crawling web pages", seeds=INDEXER_WEB_PAGES, known=len(web_known))
+            for page in crawler.iter_pages(stop_event):
+                if page.status in (GONE, DUPLICATE):
+                    web_gone.add(page.url)
+                    continue
+                web_reached.add(page.url)
+                if page.status == NOT_MODIFIED:
+                    with lock:
+                        manifest.touch(page.url, page.etag, page.validators())
+                        unchanged_content.append(page.url)
+                elif page.status == FETCHED:
+                    digest = content_hash(page.text.encode("utf-8"))
+                    if manifest.matches_content(page.url, digest):
+                        with lock:
+                            manifest.touch(page.url, page.etag, page.validators())
+                            unchanged_content.append(page.url)
+                    else:
+                        yield page.url, page.etag, digest, page.to_document(), page.validators()
+                elif page.error:
+                    # Failed, disallowed or not HTML: any previous entry is kept
+                    logger.warning("Web page not indexed", url=page.url, status=page.status, error=page.error)
+
+        progress.set_phase(
+            "indexing_blobs",
+            blobs_to_index=len(blob_diff.to_index),
+            blobs_unchanged=len(blob_diff.unchanged),
+            blobs_removed=len(blob_diff.removed),
+            sources_indexed=0,
         )
-        
-        logger.info("Vector store indexing completed")
+        # Verification waits for the index to reach this count plus the net change
+        count_before = _index_document_count()
+        rss = RssSampler().start()
+        blob_stats = run_pipeline(
+            blob_diff.to_index,
+            [
+                Stage("download", download, workers=INDEXER_DOWNLOAD_WORKERS),
+                Stage("analyze", check_and_analyze, workers=INDEXER_ANALYZE_WORKERS,
+                      discard=lambda blob: blob.close()),
+                Stage("chunk", chunk, fan_out=True),
+                # Groups of up to the largest upload batch; the uploader splits them adaptively
+                Stage("upload", upload, workers=INDEXER_UPLOAD_WORKERS,
+                      batch_size=INDEXER_UPLOAD_MAX_BATCH_SIZE),
+            ],
+            queue_size=INDEXER_QUEUE_SIZE,
+            stop_event=stop_event,
+            progress=progress,
+            name="blobs",
+        )
+        # Web pages skip download and analysis; the crawl streams them into the chunk stage
+        progress.set_phase("indexing_web_pages", web_seeds=len(INDEXER_WEB_PAGES))
+        web_stats = run_pipeline(
+            crawl_web_pages() if not (stop_event and stop_event.is_set()) else [],
+            [
+                Stage("chunk", chunk, fan_out=True),
+                Stage("upload", upload, batch_size=INDEXER_UPLOAD_MAX_BATCH_SIZE),
+            ],
+            queue_size=INDEXER_QUEUE_SIZE,
+            stop_event=stop_event,
+            progress=progress,
+            name="web_pages",
+        )
+        uploader.close()
+        rss.stop()
+        memory = {**budget.as_dict(), "spooled_to_disk": spooled_to_disk, **rss.as_dict()}
+        stopped = blob_stats["stopped"] or web_stats["stopped"]
+        web_crawl = crawler.as_dict()
+        # Without seeds every known page goes; otherwise a known page the crawl did not
+        # reach is only dropped once a full crawl missed it
+        drop_unreached = not INDEXER_WEB_PAGES or (crawler.complete and not (stopped or crawler.truncated))
+        web_removed = [
+            name for name in web_known
+            if name in web_gone or (drop_unreached and name not in web_reached)
+        ]
+
+        # Sources still pending were cut short by a cancel (or failed): they keep their
+        # previous entry. Removed sources are only purged by a run that finished.
+        progress.set_phase("finalizing")
+        if not stopped:
+            for source in blob_diff.removed + web_removed:
+                undeleted = _delete_chunks(vector_store, manifest.chunk_ids(source))
+                deleted_chunks += len(manifest.chunk_ids(source)) - len(undeleted)
+                if undeleted:
+                    manifest.entries[source]["chunk_ids"] = undeleted
+                else:
+                    manifest.remove(source)
+            # Sources left unchanged (indexed by an earlier run) still have their legacy
+            # documents; those of sources not indexed at all are their only copy and stay
+            legacy_left = False
+            for source, keys in legacy.items():
+                if source in manifest.entries:
+                    undeleted = _delete_chunks(vector_store, keys)
+                    deleted_chunks += len(keys) - len(undeleted)
+                    legacy_left = legacy_left or bool(undeleted)
+                elif source in listing or source in web_reached:
+                    legacy_left = True
+            manifest.legacy_keys_deleted = not (legacy_left or failed_sources)
+        manifest_store.save(manifest.to_json())
+
+        stages = blob_stats["stages"]
+        indexing_result["success_rate"] = (
+            indexing_result["successful"] / indexing_result["total_chunks"] * 100
+            if indexing_result["total_chunks"] > 0 else 0
+        )
+        indexing_result["upload_limits"] = uploader.limiter.as_dict()
+        documents_processed = stages["analyze"]["emitted"] + web_stats["stages"]["chunk"]["processed"]
+        chunks_created = stages["chunk"]["emitted"] + web_stats["stages"]["chunk"]["emitted"]
+        content_unchanged = set(unchanged_content) & set(blob_diff.changed)
+        changes = {
+            "added": len(blob_diff.added),
+            "changed": len(blob_diff.changed) - len(content_unchanged),
+            "unchanged": len(blob_diff.unchanged) + len(unchanged_content),
+            "removed": len(blob_diff.removed) + len(web_removed),
+            "failed_sources": sorted(failed_sources),
+            "deleted_chunks": deleted_chunks,
+        }
+        embedding_stats = embedding_cache().since(cache_before).as_dict() if embedding_cache else None
+        analysis_stats = (
+            analysis_cache.report(analysis_cache.snapshot().since(analysis_before)) if analysis_cache else None
+        )
+        logger.info(
+            "Document indexing pipeline completed",
+            documents_processed=documents_processed,
+            chunks_uploaded=chunks_created,
+            skipped_blobs=len(skipped),
+            elapsed_seconds=blob_stats["elapsed_seconds"] + web_stats["elapsed_seconds"],
+            pipeline=stages,
+            embedding_cache=embedding_stats,
+            analysis_cache=analysis_stats,
+            memory=memory,
+            web_crawl=web_crawl,
+            **changes,
+        )
+
+        if stopped:
+            return {
+                "message": "Indexing cancelled",
+                "cancelled": True,
+                "documents_processed": documents_processed,
+                "chunks_created": chunks_created,
+                "changes": changes,
+                "indexing_result": indexing_result,
+                "memory": memory,
+                "web_crawl": web_crawl,
+            }
 
         # Verify indexing
+        progress.set_phase("verifying")
         logger.info("Starting indexing verification")
-        verification_result = verify_indexing()
-        
+        verification_result = verify_indexing(
+            expected_keys=uploaded_ids,
+            expected_count=(
+                count_before + len(uploaded_ids) - deleted_chunks if count_before is not None else None
+            ),
+        )
+
         return {
             "message": "Indexing completed successfully",
-            "documents_processed": len(docs),
-            "chunks_created": len(chunks),
+            "documents_processed": documents_processed,
+            "chunks_created": chunks_created,
+            "changes": changes,
+            "embedding_cache": embedding_stats,
+            "analysis_cache": analysis_stats,
+            "memory": memory,
+            "web_crawl": web_crawl,
             "indexing_result": indexing_result,
+            "pipeline": {"blobs": blob_stats, "web": web_stats},
             "verification": verification_result
         }
 
@@ -521,18 +1163,15 @@ def index_single_file(blob_name: str, file_url: str = None):
     Returns:
         dict: Result of indexing operation
     """
+    from backend.search_indexer.manifest import IndexManifest, plan_chunks
+
     try:
         logger.info("Starting single file indexing", blob_name=blob_name, file_url=file_url)
         
-        # Get the blob data
-        blob_client = container_client.get_blob_client(blob_name)
-        blob_data = blob_client.download_blob().readall()
-        
-        logger.info("Successfully downloaded blob", blob_name=blob_name, size_bytes=len(blob_data))
-        
-        # Process with Document Intelligence
-        logger.info("Processing document with Document Intelligence", blob_name=blob_name)
-        document = process_document_with_intelligence(blob_name, blob_data)
+        # Stream the blob into a spooled temporary file, then process with Document Intelligence
+        with _download_blob(blob_name) as blob_data:
+            logger.info("Processing document with Document Intelligence", blob_name=blob_name)
+            document = process_document_with_intelligence(blob_name, blob_data)
         
         if not document:
             error_msg = f"Failed to process document: {blob_name}"
@@ -547,8 +1186,9 @@ def index_single_file(blob_name: str, file_url: str = None):
         
         # Split into chunks
         logger.info("Starting text splitting")
-        splitter = RecursiveCharacterTextSplitter(chunk_size=512, chunk_overlap=50)
-        chunks = splitter.split_documents([document])
+        chunks = get_text_splitter().split_documents([document])
+        # Stable keys, as in start_indexing: re-indexing the file replaces its chunks
+        chunks, chunk_ids, _ = plan_chunks(IndexManifest(SEARCH_INDEX_NAME), blob_name, chunks)
         logger.info("Text splitting completed", total_chunks=len(chunks))
         
         # Index chunks
@@ -565,17 +1205,11 @@ def index_single_file(blob_name: str, file_url: str = None):
         
         logger.info("Vector store indexing completed", indexing_result=indexing_result)
         
-        # Verify by searching
+        # Wait until the chunks are searchable, then search to verify
         logger.info("Verifying indexing by searching")
-        search_endpoint = os.getenv("AZURE_SEARCH_ENDPOINT")
-        search_key = os.getenv("AZURE_SEARCH_KEY") or os.getenv("AZURE_SEARCH_ADMIN_KEY")
         search_index_name = os.getenv("AZURE_SEARCH_INDEX_NAME", "bc-water-index")
-        
-        search_client = SearchClient(
-            endpoint=search_endpoint,
-            index_name=search_index_name,
-            credential=AzureKeyCredential(search_key)
-        )
+        keys_verification = verify_indexing(search_index_name, expected_keys=chunk_ids)
+        search_client = get_search_client(search_index_name)
         
         # Search for BCeID to verify
         results = search_client.search("BCeID", top=3)
@@ -590,6 +1224,8 @@ def index_single_file(blob_name: str, file_url: str = None):
             "chunks_created": len(chunks),
             "indexing_result": indexing_result,
             "verification": {
+                "keys_checked": keys_verification.get("keys_checked", 0),
+                "keys_missing": keys_verification.get("keys_missing"),
                 "search_query": "BCeID",
                 "results_found": len(found_results),
                 "sample_results": [
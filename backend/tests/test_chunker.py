@@ -0,0 +1,157 @@
+import random
+
+import pytest
+
+from backend.search_indexer.chunker import MarkdownChunker, count_tokens_batch, parse_blocks, TABLE
+
+WORDS = ["permit", "water", "licence", "applicant", "river", "volume", "intake", "season", "well", "stream"]
+
+
+def words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def paragraph(rng, sentences):
+    return " ".join(words(rng, rng.randint(3, 15)) + "." for _ in range(sentences))
+
+
+def html_table(rows, header=("Name", "Value")):
+    lines = ["<table>", "<tr>" + "".join(f"<th>{h}</th>" for h in header) + "</tr>"]
+    lines += ["<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>" for row in rows]
+    return "\n".join(lines + ["</table>"])
+
+
+def pipe_table(rows, header=("Name", "Value")):
+    lines = ["| " + " | ".join(header) + " |", "|" + "---|" * len(header)]
+    return "\n".join(lines + ["| " + " | ".join(row) + " |" for row in rows])
+
+
+def random_document(rng):
+    lines = [f"# {words(rng, 2)}"]
+    for section in range(rng.randint(1, 6)):
+        if section and rng.random() < 0.3:
+            lines.append("<!-- PageBreak -->")
+        lines.append("#" * rng.randint(2, 3) + f" {words(rng, 2)}")
+        for _ in range(rng.randint(0, 3)):
+            kind = rng.random()
+            if kind < 0.2:
+                rows = [(words(rng, 1), words(rng, rng.choice([2, 5, 60, 400]))) for _ in range(rng.randint(1, 8))]
+                lines.append(html_table(rows))
+            elif kind < 0.35:
+                rows = [(words(rng, 1), words(rng, rng.choice([2, 5, 60, 400]))) for _ in range(rng.randint(1, 8))]
+                lines.append(pipe_table(rows))
+            else:
+                lines.append(paragraph(rng, rng.randint(1, 30)))
+    return "\n\n".join(lines)
+
+
+def tokens(text):
+    return count_tokens_batch([text])[0]
+
+
+# --- Test chunk sizes ---
+@pytest.mark.parametrize("max_tokens,min_tokens,overlap_tokens", [(512, 128, 64), (128, 32, 16), (64, 16, 8)])
+def test_no_chunk_exceeds_max_tokens(max_tokens, min_tokens, overlap_tokens):
+    rng = random.Random(max_tokens)
+    chunker = MarkdownChunker(max_tokens, min_tokens, overlap_tokens)
+    for _ in range(200):
+        for chunk in chunker.split_text(random_document(rng)):
+            assert tokens(chunk.text) <= chunk.tokens <= max_tokens
+
+
+def test_a_lone_heading_longer_than_max_tokens_is_kept_whole():
+    heading = "# " + " ".join(WORDS * 4)
+    chunks = MarkdownChunker(16, 4, 2).split_text(heading)
+    assert [chunk.text for chunk in chunks] == [heading]
+
+
+def test_oversized_table_cell_is_split_within_max_tokens():
+    md = "# Fees\n\n" + html_table([("a", " ".join(["word"] * 600)), ("b", "small")])
+    chunks = MarkdownChunker().split_text(md)
+    assert len(chunks) > 1
+    assert all(tokens(chunk.text) <= 512 for chunk in chunks)
+    # Every window of the split cell stays in the table, under its header row
+    assert all(chunk.text.count("<th>Name</th>") == 1 for chunk in chunks)
+
+
+def test_oversized_paragraph_is_split_at_sentence_ends():
+    rng = random.Random(0)
+    text = paragraph(rng, 40)
+    chunks = MarkdownChunker(64, 16, 8).split_text(text)
+    assert len(chunks) > 1
+    assert all(chunk.text.endswith(".") for chunk in chunks)
+    assert " ".join(chunk.text for chunk in chunks) == text
+
+
+# --- Test tables ---
+@pytest.mark.parametrize("table", [html_table, pipe_table])
+def test_table_that_fits_is_kept_intact(table):
+    fees = table([("Licence", "$100"), ("Permit", "$50")])
+    md = "# Fees\n\nThe fees are listed below.\n\n" + fees
+    chunks = MarkdownChunker(max_tokens=128, min_tokens=8).split_text(md)
+    assert [chunk for chunk in chunks if "Licence" in chunk.text or "Permit" in chunk.text] == [chunks[-1]]
+    assert fees in chunks[-1].text
+
+
+@pytest.mark.parametrize("table,header", [
+    (html_table, "<tr><th>Name</th><th>Value</th></tr>"),
+    (pipe_table, "| Name | Value |\n|---|---|"),
+])
+def test_split_table_repeats_the_header_row(table, header):
+    rows = [(f"row{i}", words(random.Random(i), 6)) for i in range(60)]
+    chunks = MarkdownChunker(max_tokens=96, min_tokens=16, overlap_tokens=8).split_text(table(rows))
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert header in chunk.text
+    # Every row is in exactly one piece
+    for name, _ in rows:
+        assert sum(f"{name}<" in chunk.text or f"| {name} |" in chunk.text for chunk in chunks) == 1
+
+
+def test_parse_blocks_keeps_tables_whole():
+    md = "Intro.\n\n" + html_table([("a", "1"), ("b", "2")]) + "\n\nOutro."
+    blocks = parse_blocks(md)
+    assert [block.kind for block in blocks] == ["text", TABLE, "text"]
+
+
+# --- Test section and page metadata ---
+def test_chunks_record_section_and_page():
+    rng = random.Random(1)
+    md = "\n\n".join([
+        "# Guide",
+        "## Eligibility",
+        paragraph(rng, 3),
+        "<!-- PageFooter=\"Guide\" -->",
+        "<!-- PageBreak -->",
+        "## Fees",
+        paragraph(rng, 3),
+    ])
+    chunks = MarkdownChunker(max_tokens=128, min_tokens=16).split_text(md)
+    assert [(chunk.section, chunk.page) for chunk in chunks] == [("Guide > Eligibility", 1), ("Guide > Fees", 2)]
+    assert "PageFooter" not in " ".join(chunk.text for chunk in chunks)
+
+
+def test_continued_section_repeats_its_headings():
+    rng = random.Random(2)
+    md = "# Guide\n\n## Fees\n\n" + paragraph(rng, 60)
+    chunks = MarkdownChunker(max_tokens=96, min_tokens=16, overlap_tokens=8).split_text(md)
+    assert len(chunks) > 1
+    assert all(chunk.text.startswith("# Guide\n## Fees") or chunk.text.startswith("# Guide\n\n## Fees") for chunk in chunks)
+    assert {chunk.section for chunk in chunks} == {"Guide > Fees"}
+
+
+def test_short_section_does_not_end_with_the_next_heading():
+    rng = random.Random(3)
+    md = "# A\n\nshort\n\n## B\n\n" + paragraph(rng, 40)
+    chunks = MarkdownChunker(max_tokens=64, min_tokens=32, overlap_tokens=8).split_text(md)
+    assert not chunks[0].text.endswith("## B")
+    assert all("## B" in chunk.text for chunk in chunks[1:])
+
+
+def test_split_documents_adds_section_and_page():
+    from langchain.schema import Document
+
+    md = "# Guide\n\n## Fees\n\nA licence costs $100."
+    [document] = MarkdownChunker().split_documents([Document(page_content=md, metadata={"source": "guide.pdf"})])
+    assert document.metadata == {"source": "guide.pdf", "page": 1, "section": "Guide > Fees"}
+    assert document.page_content == md
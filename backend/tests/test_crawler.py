@@ -0,0 +1,141 @@
+import time
+from urllib.parse import urlsplit
+
+import pytest
+
+from backend.benchmarks.fake_website import FakeWebsite
+from backend.search_indexer.crawler import (
+    DISALLOWED,
+    DUPLICATE,
+    FETCHED,
+    NOT_MODIFIED,
+    AsyncCrawler,
+    SimHashIndex,
+    simhash,
+)
+
+
+@pytest.fixture
+def site():
+    with FakeWebsite(pages=12, links_per_page=3, duplicate_every=5, latency=0) as site:
+        yield site
+
+
+def make_crawler(site, **kwargs):
+    options = {"max_pages": 100, "max_depth": 20, "concurrency": 4, "host_rate": 0, "host_concurrency": 4}
+    return AsyncCrawler([site.url("/page/0")], **{**options, **kwargs})
+
+
+async def crawl(crawler):
+    return {page.url: page async for page in crawler.crawl()}
+
+
+# --- Test conditional requests ---
+@pytest.mark.asyncio
+async def test_recrawl_with_etags_gets_304s(site):
+    cold = await crawl(make_crawler(site))
+    known = {url: page.validators() for url, page in cold.items() if page.etag}
+    site.reset()
+
+    warm_crawler = make_crawler(site, known=known)
+    warm = await crawl(warm_crawler)
+    assert {url for url, page in warm.items() if page.status == NOT_MODIFIED} == set(known)
+    assert site.counts["not_modified"] == len(known)
+    # The links recorded last time keep the crawl going past the 304s
+    assert set(warm) == set(cold)
+    assert warm_crawler.stats["bytes"] == 0
+
+
+@pytest.mark.asyncio
+async def test_edited_page_is_fetched_again(site):
+    cold = await crawl(make_crawler(site))
+    known = {url: page.validators() for url, page in cold.items() if page.status == FETCHED}
+    site.edit(0)
+
+    warm = await crawl(make_crawler(site, known=known))
+    assert warm[site.url("/page/0")].status == FETCHED
+    assert "Version 1." in warm[site.url("/page/0")].text
+    assert all(page.status == NOT_MODIFIED for url, page in warm.items() if url != site.url("/page/0") and url in known)
+
+
+@pytest.mark.asyncio
+async def test_recrawl_with_last_modified_only_gets_304s(site):
+    cold = await crawl(make_crawler(site))
+    known = {
+        url: {**page.validators(), "etag": None}
+        for url, page in cold.items() if page.status == FETCHED
+    }
+    site.edit(0)
+    site.reset()
+
+    warm = await crawl(make_crawler(site, known=known))
+    assert warm[site.url("/page/0")].status == FETCHED
+    assert site.counts["not_modified"] == len(known) - 1
+
+
+# --- Test duplicates ---
+@pytest.mark.asyncio
+async def test_print_view_is_reported_as_duplicate(site):
+    pages = await crawl(make_crawler(site))
+    printed = pages[site.url("/page/0?print=1")]
+    assert printed.status == DUPLICATE
+    assert printed.duplicate_of == site.url("/page/0")
+    assert pages[site.url("/page/0")].status == FETCHED
+
+
+def test_simhash_distance():
+    text = " ".join(f"word{i}" for i in range(300))
+    index = SimHashIndex(distance=6)
+    index.add("original", simhash(text))
+    assert index.find(simhash(text + " printed copy")) == "original"
+    assert index.find(simhash(" ".join(f"other{i}" for i in range(300)))) is None
+
+
+# --- Test robots.txt ---
+@pytest.mark.asyncio
+async def test_robots_disallowed_paths_are_not_fetched(site):
+    crawler = make_crawler(site, allowed_prefixes=[site.url("/")])
+    pages = await crawl(crawler)
+    assert pages[site.url("/private/admin")].status == DISALLOWED
+    # Out-of-scope links (another host, a PDF) are never scheduled
+    assert not any("example.invalid" in url or url.endswith(".pdf") for url in pages)
+
+
+@pytest.mark.asyncio
+async def test_robots_crawl_delay_limits_the_host_rate():
+    # urllib.robotparser only reads whole seconds
+    with FakeWebsite(pages=3, links_per_page=2, duplicate_every=0, latency=0, crawl_delay=1) as site:
+        crawler = make_crawler(site, host_rate=100)
+        started = time.perf_counter()
+        pages = await crawl(crawler)
+        elapsed = time.perf_counter() - started
+
+        assert crawler._hosts[urlsplit(site.url()).netloc].limiter.rate == pytest.approx(1)
+        # robots.txt is fetched without the limiter; every page after the first waits a second
+        assert len(pages) >= 2
+        assert elapsed >= 0.9 * (len(pages) - 1)
+
+
+# --- Test max_pages ---
+@pytest.mark.asyncio
+async def test_max_pages_sets_truncated(site):
+    crawler = make_crawler(site, max_pages=3)
+    pages = await crawl(crawler)
+    assert len(pages) == 3
+    assert crawler.as_dict()["truncated"] is True
+    assert crawler.as_dict()["complete"] is True
+
+
+@pytest.mark.asyncio
+async def test_full_crawl_is_not_truncated(site):
+    crawler = make_crawler(site)
+    await crawl(crawler)
+    assert crawler.truncated is False
+    assert crawler.complete is True
+
+
+def test_iter_pages_yields_the_crawl(site):
+    crawler = make_crawler(site, max_pages=5)
+    pages = list(crawler.iter_pages())
+    assert len(pages) == 5
+    assert crawler.truncated is True
@@ -0,0 +1,160 @@
+import json
+
+from langchain.schema import Document
+
+from backend.search_indexer.manifest import (
+    MANIFEST_VERSION,
+    IndexManifest,
+    LocalManifestStore,
+    chunk_id,
+    content_hash,
+    plan_chunks,
+)
+
+CHUNKING = "markdown-v3:512:128:64"
+
+
+def indexed_manifest(chunking=CHUNKING):
+    manifest = IndexManifest("bc-water-index", chunking=chunking)
+    for name in ("a.pdf", "b.pdf", "c.pdf"):
+        manifest.record(name, f'"{name}-1"', content_hash(name.encode()), [chunk_id(name, "text")])
+    return manifest
+
+
+def chunks(*texts):
+    return [Document(page_content=text, metadata={}) for text in texts]
+
+
+# --- Test diff ---
+def test_diff_sorts_sources_into_added_changed_unchanged_and_removed():
+    manifest = indexed_manifest()
+    diff = manifest.diff({"a.pdf": '"a.pdf-1"', "b.pdf": '"b.pdf-2"', "d.pdf": '"d.pdf-1"'})
+    assert diff.unchanged == ["a.pdf"]
+    assert diff.changed == ["b.pdf"]
+    assert diff.added == ["d.pdf"]
+    assert diff.removed == ["c.pdf"]
+    assert diff.to_index == ["d.pdf", "b.pdf"]
+
+
+def test_sources_without_an_etag_are_always_checked():
+    manifest = indexed_manifest()
+    diff = manifest.diff({"a.pdf": None, "b.pdf": '"b.pdf-1"', "c.pdf": '"c.pdf-1"'})
+    assert diff.changed == ["a.pdf"]
+    assert diff.unchanged == ["b.pdf", "c.pdf"]
+
+
+def test_removed_is_limited_to_the_scope():
+    manifest = indexed_manifest()
+    manifest.record("https://example.com/page", None, "hash", [])
+    diff = manifest.diff({"a.pdf": '"a.pdf-1"'}, scope=lambda name: not name.startswith("https://"))
+    assert diff.removed == ["b.pdf", "c.pdf"]
+
+
+def test_report_counts_the_chunks_of_removed_sources():
+    manifest = indexed_manifest()
+    report = manifest.diff({"a.pdf": '"a.pdf-1"'}).report(manifest)
+    assert report["removed"] == ["b.pdf", "c.pdf"]
+    assert report["chunks_to_delete_if_removed"] == 2
+    assert report["unchanged_count"] == 1
+
+
+# --- Test the chunking fingerprint ---
+def test_new_chunking_forces_a_rechunk():
+    manifest = IndexManifest.from_json(indexed_manifest().to_json(), "bc-water-index", chunking="markdown-v4:512:128:64")
+    diff = manifest.diff({"a.pdf": '"a.pdf-1"', "b.pdf": '"b.pdf-1"', "c.pdf": '"c.pdf-1"'})
+    assert diff.changed == ["a.pdf", "b.pdf", "c.pdf"]
+    assert diff.unchanged == []
+    # The same content no longer counts as already indexed either
+    assert not manifest.matches_content("a.pdf", content_hash(b"a.pdf"))
+
+
+def test_matches_content():
+    manifest = indexed_manifest()
+    assert manifest.matches_content("a.pdf", content_hash(b"a.pdf"))
+    assert not manifest.matches_content("a.pdf", content_hash(b"edited"))
+    assert not manifest.matches_content("missing.pdf", content_hash(b"a.pdf"))
+
+
+def test_recorded_entry_takes_the_current_chunking():
+    manifest = IndexManifest("bc-water-index", chunking="markdown-v4:512:128:64")
+    manifest.record("a.pdf", '"a.pdf-1"', "hash", ["id"])
+    assert manifest.diff({"a.pdf": '"a.pdf-1"'}).unchanged == ["a.pdf"]
+
+
+# --- Test plan_chunks ---
+def test_first_index_uploads_every_chunk():
+    manifest = IndexManifest("bc-water-index", chunking=CHUNKING)
+    new = chunks("one", "two", "one")
+    to_upload, ids, stale = plan_chunks(manifest, "a.pdf", new)
+    assert ids == [chunk_id("a.pdf", "one"), chunk_id("a.pdf", "two")]
+    # Duplicate chunk text gets one document
+    assert [chunk.page_content for chunk in to_upload] == ["one", "two"]
+    assert [chunk.id for chunk in to_upload] == ids
+    assert stale == []
+
+
+def test_unchanged_chunks_are_not_uploaded_and_removed_ones_are_stale():
+    manifest = IndexManifest("bc-water-index", chunking=CHUNKING)
+    _, ids, _ = plan_chunks(manifest, "a.pdf", chunks("one", "two", "three"))
+    manifest.record("a.pdf", '"a.pdf-1"', "hash", ids)
+
+    to_upload, new_ids, stale = plan_chunks(manifest, "a.pdf", chunks("one", "three", "four"))
+    assert [chunk.page_content for chunk in to_upload] == ["four"]
+    assert new_ids == [chunk_id("a.pdf", text) for text in ("one", "three", "four")]
+    assert stale == [chunk_id("a.pdf", "two")]
+
+
+def test_chunk_ids_depend_on_the_source():
+    manifest = IndexManifest("bc-water-index")
+    manifest.record("a.pdf", None, "hash", [chunk_id("a.pdf", "one")])
+    to_upload, _, stale = plan_chunks(manifest, "b.pdf", chunks("one"))
+    assert len(to_upload) == 1
+    assert stale == []
+
+
+def test_removed_source_drops_its_entry():
+    manifest = indexed_manifest()
+    removed_ids = manifest.chunk_ids("c.pdf")
+    manifest.remove("c.pdf")
+    assert removed_ids == [chunk_id("c.pdf", "text")]
+    assert manifest.chunk_ids("c.pdf") == []
+    assert "c.pdf" not in manifest.diff({}).removed
+
+
+# --- Test serialization ---
+def test_json_round_trip():
+    manifest = indexed_manifest()
+    manifest.touch("a.pdf", '"a.pdf-2"', {"last_modified": "Tue, 01 Oct 2024 00:00:00 GMT"})
+    manifest.legacy_keys_deleted = True
+
+    loaded = IndexManifest.from_json(manifest.to_json(), "bc-water-index", chunking=CHUNKING)
+    assert loaded.entries == manifest.entries
+    assert loaded.legacy_keys_deleted is True
+    assert loaded.chunking == CHUNKING
+    assert loaded.entries["a.pdf"]["etag"] == '"a.pdf-2"'
+    assert loaded.to_json() == manifest.to_json()
+
+
+def test_manifest_of_another_index_or_version_is_ignored():
+    raw = indexed_manifest().to_json()
+    assert IndexManifest.from_json(raw, "other-index").entries == {}
+    old = json.dumps({**json.loads(raw), "version": MANIFEST_VERSION + 1})
+    assert IndexManifest.from_json(old, "bc-water-index").entries == {}
+    assert IndexManifest.from_json(None, "bc-water-index").entries == {}
+
+
+def test_manifest_without_the_legacy_flag_has_legacy_keys():
+    data = json.loads(indexed_manifest().to_json())
+    del data["legacy_keys_deleted"]
+    loaded = IndexManifest.from_json(json.dumps(data), "bc-water-index", chunking=CHUNKING)
+    assert loaded.legacy_keys_deleted is False
+    assert set(loaded.entries) == {"a.pdf", "b.pdf", "c.pdf"}
+
+
+def test_local_store_round_trip(tmp_path):
+    store = LocalManifestStore(str(tmp_path / "manifests" / "bc-water-index.json"))
+    assert store.load() is None
+    raw = indexed_manifest().to_json()
+    store.save(raw)
+    assert store.load() == raw
+    assert [path.name for path in (tmp_path / "manifests").iterdir()] == ["bc-water-index.json"]
@@ -0,0 +1,203 @@
+import itertools
+import threading
+import time
+
+from backend.search_indexer.pipeline import PipelineProgress, Stage, run_pipeline
+
+
+class Sink:
+    """Last stage that records what reaches it."""
+
+    def __init__(self):
+        self.items = []
+        self.lock = threading.Lock()
+
+    def __call__(self, item):
+        with self.lock:
+            self.items.append(item)
+
+
+# --- Test stages ---
+def test_items_flow_through_every_stage():
+    sink = Sink()
+    result = run_pipeline(
+        range(20),
+        [Stage("double", lambda x: x * 2, workers=3), Stage("square", lambda x: x * x, workers=2), Stage("sink", sink)],
+    )
+    assert sorted(sink.items) == sorted((x * 2) ** 2 for x in range(20))
+    assert result["stages"]["double"]["processed"] == 20
+    assert result["stages"]["square"]["emitted"] == 20
+    assert result["stopped"] is False
+
+
+def test_none_drops_the_item():
+    sink = Sink()
+    result = run_pipeline(range(10), [Stage("even", lambda x: x if x % 2 == 0 else None), Stage("sink", sink)])
+    assert sorted(sink.items) == [0, 2, 4, 6, 8]
+    assert result["stages"]["even"]["emitted"] == 5
+
+
+def test_fan_out_streams_each_output():
+    sink = Sink()
+    result = run_pipeline(
+        ["ab", "cde"],
+        [Stage("letters", lambda word: iter(word), fan_out=True), Stage("sink", sink)],
+    )
+    assert sorted(sink.items) == ["a", "b", "c", "d", "e"]
+    assert result["stages"]["letters"]["emitted"] == 5
+    assert result["stages"]["sink"]["processed"] == 5
+
+
+def test_batches_fill_up_to_batch_size():
+    sink = Sink()
+    result = run_pipeline(range(10), [Stage("batch", sink, batch_size=4, linger=5)])
+    assert [len(batch) for batch in sink.items] == [4, 4, 2]
+    assert sorted(itertools.chain.from_iterable(sink.items)) == list(range(10))
+    assert result["stages"]["batch"]["processed"] == 10
+
+
+def test_partial_batch_is_passed_on_after_linger():
+    sink = Sink()
+    passed_on = []
+
+    def slow_source():
+        for item in range(3):
+            yield item
+            time.sleep(0.15)
+            passed_on.append(len(sink.items))
+
+    run_pipeline(slow_source(), [Stage("batch", sink, batch_size=10, linger=0.02)])
+    # Each item was passed on alone before the next one arrived
+    assert [len(batch) for batch in sink.items] == [1, 1, 1]
+    assert passed_on == [1, 2, 3]
+
+
+# --- Test errors ---
+def test_stage_errors_are_counted_and_the_rest_continue():
+    sink = Sink()
+
+    def parse(x):
+        if x % 3 == 0:
+            raise ValueError(f"bad item {x}")
+        return x
+
+    result = run_pipeline(range(9), [Stage("parse", parse, workers=2), Stage("sink", sink)])
+    assert sorted(sink.items) == [1, 2, 4, 5, 7, 8]
+    assert result["stages"]["parse"]["failed"] == 3
+    assert result["stages"]["parse"]["processed"] == 9
+
+
+def test_failed_batch_counts_once():
+    def upload(batch):
+        raise ConnectionError("index unavailable")
+
+    result = run_pipeline(range(6), [Stage("upload", upload, batch_size=3, linger=5)])
+    assert result["stages"]["upload"]["failed"] == 2
+    assert result["stages"]["upload"]["processed"] == 6
+
+
+# --- Test bounded queues ---
+def test_queues_stay_within_queue_size():
+    sink = Sink()
+
+    def slow(item):
+        time.sleep(0.005)
+        return item
+
+    result = run_pipeline(range(40), [Stage("slow", slow), Stage("sink", sink)], queue_size=4)
+    assert sorted(sink.items) == list(range(40))
+    assert result["stages"]["slow"]["peak_queue"] <= 4
+
+
+def test_source_waits_for_the_first_stage():
+    started = threading.Event()
+    release = threading.Event()
+    produced = []
+
+    def source():
+        for item in range(100):
+            produced.append(item)
+            yield item
+
+    def blocked(item):
+        started.set()
+        release.wait()
+
+    runner = threading.Thread(target=run_pipeline, args=(source(), [Stage("blocked", blocked)]), kwargs={"queue_size": 3})
+    runner.start()
+    started.wait(5)
+    time.sleep(0.1)
+    # One item in the worker, queue_size in the queue, one blocked in put()
+    assert len(produced) <= 1 + 3 + 1
+    release.set()
+    runner.join(5)
+    assert len(produced) == 100
+
+
+# --- Test stop ---
+def test_stop_drains_and_discards_queued_items():
+    stop = threading.Event()
+    discarded = Sink()
+    sink = Sink()
+
+    def endless():
+        for item in itertools.count():
+            yield item
+
+    def work(item):
+        if item == 10:
+            stop.set()
+        time.sleep(0.001)
+        return item
+
+    result = run_pipeline(
+        endless(),
+        [Stage("work", work, workers=2, discard=discarded), Stage("sink", sink, discard=discarded)],
+        queue_size=4,
+        stop_event=stop,
+    )
+    assert result["stopped"] is True
+    assert discarded.items
+    handled = set(sink.items) | set(discarded.items)
+    assert not set(sink.items) & set(discarded.items)
+    assert len(handled) < 30
+
+
+def test_stop_discards_a_partial_batch():
+    stop = threading.Event()
+    discarded = Sink()
+    batches = Sink()
+
+    def source():
+        yield from range(3)
+        stop.set()
+        time.sleep(0.1)
+
+    result = run_pipeline(source(), [Stage("batch", batches, batch_size=10, linger=5, discard=discarded)], stop_event=stop)
+    assert result["stopped"] is True
+    assert batches.items == []
+    assert sorted(discarded.items) == [0, 1, 2]
+
+
+def test_failing_discard_does_not_stop_the_drain():
+    stop = threading.Event()
+    stop.set()
+
+    def discard(item):
+        raise RuntimeError("cannot free")
+
+    result = run_pipeline(range(5), [Stage("work", lambda x: x, discard=discard)], stop_event=stop)
+    assert result["stopped"] is True
+    assert result["stages"]["work"]["processed"] == 0
+
+
+# --- Test progress ---
+def test_progress_tracks_the_run():
+    progress = PipelineProgress()
+    progress.set_phase("indexing", sources=3)
+    run_pipeline(range(3), [Stage("work", lambda x: x)], progress=progress, name="blobs")
+    snapshot = progress.snapshot()
+    assert snapshot["phase"] == "indexing"
+    assert snapshot["totals"] == {"sources": 3}
+    assert snapshot["pipelines"]["blobs"]["finished"] is True
+    assert snapshot["pipelines"]["blobs"]["stages"]["work"]["processed"] == 3
@@ -0,0 +1,188 @@
+import threading
+import time
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import pytest
+from azure.core.exceptions import ServiceRequestError, ServiceResponseError
+
+from backend.search_indexer.uploader import (
+    AdaptiveLimiter,
+    AdaptiveUploader,
+    _retry_after_seconds,
+    _status_code,
+)
+
+
+class HttpError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.status_code = status
+        self.response = SimpleNamespace(status_code=status, headers=headers or {})
+
+
+class FlakyIndex:
+    """upload_fn that raises the queued errors in turn before accepting batches."""
+
+    def __init__(self, errors=(), fail=None):
+        self.errors = list(errors)
+        self.fail = fail
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, batch):
+        with self.lock:
+            error = self.errors.pop(0) if self.errors else (self.fail(batch) if self.fail else None)
+            if error is None:
+                self.batches.append(list(batch))
+        if error is not None:
+            raise error
+
+    def uploaded(self):
+        return sorted(chunk for batch in self.batches for chunk in batch)
+
+
+def make_uploader(upload_fn, **limits):
+    limiter = AdaptiveLimiter(**{"batch_size": 4, "concurrency": 2, "max_concurrency": 4, **limits})
+    return AdaptiveUploader(upload_fn, limiter, max_retries=3, base_delay=0.001, max_delay=0.01)
+
+
+# --- Test AdaptiveLimiter ---
+def test_success_increases_batch_size_additively_and_concurrency_every_window():
+    limiter = AdaptiveLimiter(batch_size=10, batch_step=5, concurrency=2, max_concurrency=3, max_batch_size=30)
+    limiter.on_success(limiter.epoch, 0.1)
+    assert (limiter.batch_size, limiter.concurrency) == (15, 2)
+    limiter.on_success(limiter.epoch, 0.1)
+    assert (limiter.batch_size, limiter.concurrency) == (20, 3)
+    for _ in range(6):
+        limiter.on_success(limiter.epoch, 0.1)
+    assert (limiter.batch_size, limiter.concurrency) == (30, 3)
+
+
+def test_congestion_halves_once_per_epoch():
+    limiter = AdaptiveLimiter(batch_size=40, concurrency=8, max_concurrency=8)
+    epoch = limiter.epoch
+    limiter.on_congestion(epoch, reason="http_429")
+    # Other batches in flight at the old limits report the same congestion
+    limiter.on_congestion(epoch, reason="http_429")
+    assert (limiter.batch_size, limiter.concurrency) == (20, 4)
+    limiter.on_congestion(limiter.epoch, reason="http_429")
+    assert (limiter.batch_size, limiter.concurrency) == (10, 2)
+
+
+def test_slow_success_counts_as_congestion():
+    limiter = AdaptiveLimiter(batch_size=40, concurrency=4, target_latency=1.0)
+    limiter.on_success(limiter.epoch, 2.0)
+    assert (limiter.batch_size, limiter.concurrency) == (20, 2)
+
+
+def test_limits_do_not_go_below_the_minimum():
+    limiter = AdaptiveLimiter(batch_size=2, min_batch_size=2, concurrency=1)
+    limiter.on_congestion(limiter.epoch, reason="slow")
+    assert (limiter.batch_size, limiter.concurrency) == (2, 1)
+
+
+def test_pause_holds_new_slots():
+    limiter = AdaptiveLimiter(concurrency=2)
+    limiter.on_congestion(limiter.epoch, reason="http_429", pause=0.2)
+    started = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - started >= 0.15
+
+
+# --- Test status and Retry-After parsing ---
+def test_retry_after_headers():
+    assert _retry_after_seconds(HttpError(429, {"retry-after-ms": "250"})) == pytest.approx(0.25)
+    assert _retry_after_seconds(HttpError(429, {"x-ms-retry-after-ms": "1500"})) == pytest.approx(1.5)
+    assert _retry_after_seconds(HttpError(429, {"Retry-After": "3"})) == 3.0
+    assert _retry_after_seconds(HttpError(429, {"Retry-After": formatdate(time.time() + 10, usegmt=True)})) == pytest.approx(10, abs=1.5)
+    assert _retry_after_seconds(HttpError(429, {"Retry-After": formatdate(time.time() - 10, usegmt=True)})) == 0.0
+    assert _retry_after_seconds(HttpError(429)) is None
+    assert _retry_after_seconds(ValueError("no response")) is None
+
+
+def test_status_of_partial_batch_failure():
+    results = [SimpleNamespace(succeeded=True, status_code=201), SimpleNamespace(succeeded=False, status_code=503)]
+    assert _status_code(Exception(results)) == 503
+    assert _status_code(HttpError(413)) == 413
+    assert _status_code(ConnectionResetError()) is None
+
+
+# --- Test AdaptiveUploader ---
+def test_upload_all_chunks():
+    index = FlakyIndex()
+    uploader = make_uploader(index)
+    result = uploader.upload(list(range(50)))
+    uploader.close()
+    assert index.uploaded() == list(range(50))
+    assert (result.successful, result.failed) == (50, 0)
+
+
+def test_413_halves_the_batch():
+    index = FlakyIndex(fail=lambda batch: HttpError(413) if len(batch) > 2 else None)
+    uploader = make_uploader(index, batch_size=8, max_batch_size=8)
+    result = uploader.upload(list(range(8)))
+    uploader.close()
+    assert index.uploaded() == list(range(8))
+    assert all(len(batch) <= 2 for batch in index.batches)
+    assert (result.successful, result.failed, result.retries) == (8, 0, 0)
+
+
+def test_throttled_batch_is_retried_and_decreases_limits():
+    index = FlakyIndex([HttpError(429, {"retry-after-ms": "50"})])
+    uploader = make_uploader(index, batch_size=4, max_batch_size=4, concurrency=1, max_concurrency=1)
+    started = time.monotonic()
+    result = uploader.upload(list(range(4)))
+    uploader.close()
+    assert index.uploaded() == list(range(4))
+    assert (result.retries, result.throttled) == (1, 1)
+    assert time.monotonic() - started >= 0.05
+    assert uploader.limiter.batch_size == 4  # halved to 2, then grown back by the success
+
+
+@pytest.mark.parametrize("error", [
+    ConnectionResetError("Connection reset by peer"),
+    ServiceRequestError("Failed to establish a new connection"),
+    ServiceResponseError("Connection aborted"),
+    HttpError(502),
+])
+def test_transient_error_is_retried(error):
+    index = FlakyIndex([error])
+    uploader = make_uploader(index)
+    result = uploader.upload(list(range(4)))
+    uploader.close()
+    assert index.uploaded() == list(range(4))
+    assert (result.successful, result.failed, result.retries, result.throttled) == (4, 0, 1, 0)
+
+
+def test_wrapped_transport_error_is_retried():
+    try:
+        try:
+            raise ConnectionResetError("Connection reset by peer")
+        except ConnectionResetError as e:
+            raise RuntimeError("add_documents failed") from e
+    except RuntimeError as e:
+        wrapped = e
+    index = FlakyIndex([wrapped])
+    uploader = make_uploader(index)
+    result = uploader.upload(list(range(4)))
+    uploader.close()
+    assert (result.successful, result.retries) == (4, 1)
+
+
+def test_non_retryable_error_fails_the_batch():
+    index = FlakyIndex([HttpError(400), ValueError("bad document")])
+    uploader = make_uploader(index, batch_size=2, max_batch_size=2, concurrency=1, max_concurrency=1)
+    result = uploader.upload(list(range(6)))
+    uploader.close()
+    assert (result.successful, result.failed, result.retries) == (2, 4, 0)
+    assert result.failed_batches == [1, 2]
+    assert sorted(result.failed_chunks) == [0, 1, 2, 3]
+
+
+def test_gives_up_after_max_retries():
+    index = FlakyIndex(fail=lambda batch: HttpError(503))
+    uploader = make_uploader(index)
+    result = uploader.upload(list(range(4)))
+    uploader.close()
+    assert (result.successful, result.failed, result.retries) == (0, 4, 3)